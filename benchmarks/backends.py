@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the per call latency of the khayyam algorithm backends.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/backends.py
+
+"""
+from __future__ import print_function
+import importlib
+import os
+import sys
+import timeit
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__author__ = 'vahid'
+
+
+CASES = [
+    ('get_jalali_date_from_day_number', (2445218, )),
+    ('get_day_number_from_jalali_date', (1361, 6, 15)),
+    ('get_jalali_date_from_julian_day', (2445218.5, )),
+    ('get_julian_day_from_jalali_date', (1361, 6, 15)),
+    ('get_jalali_date_from_gregorian_date', (1982, 9, 6)),
+    ('get_gregorian_date_from_jalali_date', (1361, 6, 15)),
+    ('is_jalali_leap_year', (1375, )),
+]
+
+
+def load_backends():
+    from khayyam import algorithms
+    modules = []
+    for name, module_name in algorithms.BACKENDS.items():
+        try:
+            modules.append((name, importlib.import_module(module_name)))
+        except ImportError:
+            print('Skipping the unavailable backend: %s' % name)
+    return modules
+
+
+def measure(func, args, number=100000, repeat=5):
+    return min(timeit.repeat(partial(func, *args), number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    backends = load_backends()
+    print('%-40s' % 'nanoseconds per call', *['%18s' % name for name, _ in backends])
+    for function_name, args in CASES:
+        results = [measure(getattr(module, function_name), args) for _, module in backends]
+        print('%-40s' % function_name, *['%18.1f' % r for r in results])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Measures rendering the month grids by the :py:mod:`khayyam.calendar`, with and without the cache, versus building
+them from the :py:class:`khayyam.JalaliDate` instances and their weekdays.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/calendars.py [MONTHS]
+
+"""
+from __future__ import print_function
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam import JalaliDate, calendar  # noqa: E402
+
+__author__ = 'vahid'
+
+
+def naive_monthcalendar(year, month):
+    first = JalaliDate(year, month, 1)
+    days = [0] * first.weekday() + [JalaliDate(year, month, d).day for d in range(1, first.daysinmonth + 1)]
+    days += [0] * (-len(days) % 7)
+    return [days[i:i + 7] for i in range(0, len(days), 7)]
+
+
+def uncached_monthcalendar(year, month):
+    calendar.cache_clear()
+    return calendar.monthcalendar(year, month)
+
+
+def measure(func, months, repeat=3):
+    return min(timeit.repeat(lambda: [func(y, m) for y, m in months], number=1, repeat=repeat)) / len(months) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    # A dashboard shows a few recent months over and over
+    months = [(1395 + i % 24 // 12, i % 12 + 1) for i in range(count)]
+    cases = [
+        ('JalaliDate + weekday()', naive_monthcalendar),
+        ('monthcalendar, uncached', uncached_monthcalendar),
+        ('monthcalendar, cached', calendar.monthcalendar),
+        ('monthdatescalendar, cached', calendar.monthdatescalendar),
+    ]
+    print('%-28s %14s' % ('%d grids' % count, 'us per grid'))
+    for name, func in cases:
+        print('%-28s %14.2f' % (name, measure(func, months)))
+
+
+if __name__ == '__main__':
+    main()
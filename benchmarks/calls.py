@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the per call latency of the C extension functions, mostly the calling convention, argument parsing and
+result building overhead, as the conversions themselves are a few dozen integer operations.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/calls.py
+
+"""
+from __future__ import print_function
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__author__ = 'vahid'
+
+
+CASES = [
+    ('get_jalali_date_from_gregorian_date', '1982, 9, 6'),
+    ('get_julian_day_from_jalali_date', '1361, 6, 15'),
+    ('get_gregorian_date_from_jalali_date', '1361, 6, 15'),
+    ('get_jalali_date_from_day_number', '2445218'),
+    ('get_day_number_from_jalali_date', '1361, 6, 15'),
+    ('get_days_in_jalali_month', '1361, 12'),
+    ('is_jalali_leap_year', '1375'),
+]
+
+
+def measure(function_name, arguments, number=500000, repeat=7):
+    timer = timeit.Timer(
+        'f(%s)' % arguments,
+        setup='from khayyam.algorithms_c import %s as f' % function_name
+    )
+    return min(timer.repeat(number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    print('%-40s %18s' % ('function', 'nanoseconds per call'))
+    for function_name, arguments in CASES:
+        print('%-40s %18.1f' % (function_name, measure(function_name, arguments)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the instance cache of the :py:class:`khayyam.JalaliDate`, by creating the same few dates over and over,
+the same as a request handler which creates today, yesterday and the first day of the month.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/instances.py [MAXSIZE]
+
+"""
+from __future__ import print_function
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam import JalaliDate, jalali_date  # noqa: E402
+
+__author__ = 'vahid'
+
+
+CASES = [
+    ('JalaliDate.interned(date)', lambda: JalaliDate.interned(date(2017, 3, 21))),
+    ('JalaliDate.interned(y, m, d)', lambda: JalaliDate.interned(1396, 1, 1)),
+    ('JalaliDate.interned(julian_day=n)', lambda: JalaliDate.interned(julian_day=2457834)),
+    ('JalaliDate.today()', JalaliDate.today),
+    ('JalaliDate.fromordinal(n)', lambda: JalaliDate.fromordinal(509515)),
+]
+
+
+def measure(func, number=200000, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    maxsize = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    print('%-35s %18s %18s' % ('nanoseconds per call', 'plain', 'cached'))
+    for name, func in CASES:
+        jalali_date.use_instance_cache(0)
+        plain = measure(func)
+        jalali_date.use_instance_cache(maxsize)
+        cached = measure(func)
+        print('%-35s %18.1f %18.1f' % (name, plain, cached))
+    jalali_date.use_instance_cache(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the memoization of the conversion functions, by converting the dates of a skewed workload: most of the
+calls are for the last 400 days, and the rest are spread over a century.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/memoization.py [MAXSIZE]
+
+"""
+from __future__ import print_function
+import os
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam import algorithms  # noqa: E402
+
+__author__ = 'vahid'
+
+
+def create_dates(count, recent_ratio=.99):
+    rnd = random.Random(1361)
+    today = date(2017, 3, 21)
+    return [
+        today - timedelta(days=rnd.randrange(400) if rnd.random() < recent_ratio else rnd.randrange(36500))
+        for _ in range(count)
+    ]
+
+
+def measure(dates, repeat=5):
+    gregorian_dates = [(d.year, d.month, d.day) for d in dates]
+    julian_days = [d.toordinal() + 1721424.5 for d in dates]
+
+    def run():
+        for args in gregorian_dates:
+            algorithms.get_jalali_date_from_gregorian_date(*args)
+        for julian_day in julian_days:
+            algorithms.get_gregorian_date_from_julian_day(julian_day)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat)) / (len(dates) * 2) * 1e9
+
+
+def main():
+    maxsize = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    dates = create_dates(100000)
+    print('%-10s %18s %18s' % ('backend', 'plain ns/call', 'memoized ns/call'))
+    for name in algorithms.available_backends():
+        algorithms.use_backend(name)
+        algorithms.use_memoization(0)
+        plain = measure(dates)
+        algorithms.use_memoization(maxsize)
+        memoized = measure(dates)
+        print('%-10s %18.1f %18.1f' % (name, plain, memoized))
+    algorithms.use_memoization(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Measures iterating over the days of a few years, by the :py:meth:`khayyam.JalaliDate.range` versus adding a
+:py:class:`datetime.timedelta` in a loop, with the :py:class:`datetime.date` as the baseline.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/ranges.py [YEARS]
+
+"""
+from __future__ import print_function
+import os
+import sys
+import timeit
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam import JalaliDate, JalaliDatetime  # noqa: E402
+
+__author__ = 'vahid'
+
+
+def iterate(start, stop, step):
+    while start < stop:
+        yield start
+        start += step
+
+
+def measure(func, repeat=3):
+    return min(timeit.repeat(lambda: sum(1 for _ in func()), number=1, repeat=repeat)) * 1e3
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    one_day = timedelta(days=1)
+    start, stop = JalaliDate(1300, 1, 1), JalaliDate(1300 + years, 1, 1)
+    start_time, stop_time = JalaliDatetime(start), JalaliDatetime(stop)
+    cases = [
+        ('date + timedelta', lambda: iterate(start.todate(), stop.todate(), one_day)),
+        ('JalaliDate + timedelta', lambda: iterate(start, stop, one_day)),
+        ('JalaliDate.range', lambda: JalaliDate.range(start, stop)),
+        ('JalaliDate.range months', lambda: JalaliDate.range(start, stop, unit='months')),
+        ('JalaliDatetime + timedelta', lambda: iterate(start_time, stop_time, one_day)),
+        ('JalaliDatetime.range', lambda: JalaliDatetime.range(start_time, stop_time)),
+    ]
+    print('%-28s %10s' % ('%d years' % years, 'ms'))
+    for name, func in cases:
+        print('%-28s %10.1f' % (name, measure(func)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the comparisons of the dates, by sorting and bisecting a shuffled list of the dates and the datetimes,
+with the :py:class:`datetime.date` and :py:class:`datetime.datetime` as the baseline.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/sorting.py [COUNT]
+
+"""
+from __future__ import print_function
+import os
+import random
+import sys
+import timeit
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam import JalaliDate, JalaliDatetime  # noqa: E402
+
+__author__ = 'vahid'
+
+
+def measure(items, repeat=3):
+    sorted_items = sorted(items)
+    sort = min(timeit.repeat(lambda: sorted(items), number=1, repeat=repeat))
+    search = min(timeit.repeat(
+        lambda: [bisect_left(sorted_items, i) for i in items[:10000]],
+        number=1,
+        repeat=repeat
+    ))
+    return sort * 1e3, search * 1e3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rnd = random.Random(1361)
+    first = datetime(2000, 1, 1)
+    moments = [first + timedelta(seconds=rnd.randrange(86400 * 3650)) for _ in range(count)]
+    cases = [
+        ('date', [m.date() for m in moments]),
+        ('JalaliDate', [JalaliDate(m.date()) for m in moments]),
+        ('datetime', moments),
+        ('JalaliDatetime', [JalaliDatetime(m) for m in moments]),
+    ]
+    print('%-16s %14s %20s' % ('%d items' % count, 'sorted() ms', '10000 bisect() ms'))
+    for name, items in cases:
+        print('%-16s %14.1f %20.1f' % ((name, ) + measure(items)))
+
+
+if __name__ == '__main__':
+    main()
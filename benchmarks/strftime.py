@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the native formatter of the C extension with the python directives, by formatting the same date with both
+formatters.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/strftime.py
+
+"""
+from __future__ import print_function, unicode_literals
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam.formatting import formatters  # noqa: E402
+
+__author__ = 'vahid'
+
+
+CASES = [
+    ('JalaliDate(1361, 6, 15)', '%Y-%m-%d'),
+    ('JalaliDate(1361, 6, 15)', '%N/%R/%D'),
+    ('JalaliDate(1361, 6, 15)', '%A %D %B %N'),
+    ('JalaliDatetime(1361, 6, 15, 19, 34, 2, 123456)', '%Y-%m-%d %H:%M:%S.%f'),
+    ('JalaliDatetime(1361, 6, 15, 19, 34, 2, 123456)', '%C'),
+]
+
+
+def measure(expression, format_string, number=20000, repeat=5):
+    timer = timeit.Timer(
+        'd.strftime(%r)' % format_string,
+        setup='from khayyam import JalaliDate, JalaliDatetime\nd = %s' % expression
+    )
+    return min(timer.repeat(number=number, repeat=repeat)) / number * 1e6
+
+
+def measure_python(expression, format_string):
+    native_functions = formatters.format_jalali_date, formatters.format_jalali_datetime
+    formatters.format_jalali_date = formatters.format_jalali_datetime = None
+    try:
+        return measure(expression, format_string)
+    finally:
+        formatters.format_jalali_date, formatters.format_jalali_datetime = native_functions
+
+
+def main():
+    print('%-48s %-22s %12s %12s' % ('value', 'format', 'python (us)', 'native (us)'))
+    for expression, format_string in CASES:
+        print('%-48s %-22s %12.2f %12.2f' % (
+            expression,
+            format_string,
+            measure_python(expression, format_string),
+            measure(expression, format_string),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Measures the scaling of the batch conversions of the C extension over 1, 2, 4 and 8 threads. The columns are split
+into a slice per thread, and each slice is converted by a thread of a ThreadPoolExecutor. The GIL is released while
+converting, so the wall time should drop with the number of threads, up to the number of the CPU cores.
+
+Usage::
+
+    $ python setup.py build_ext --inplace
+    $ python benchmarks/threads.py [ROWS]
+
+"""
+from __future__ import print_function
+import os
+import sys
+import timeit
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from khayyam.algorithms_c import get_jalali_dates_from_gregorian_dates  # noqa: E402
+
+__author__ = 'vahid'
+
+
+THREADS = [1, 2, 4, 8]
+
+
+def create_columns(rows):
+    first = date(1900, 1, 1).toordinal()
+    dates = [date.fromordinal(first + i % 73000) for i in range(rows)]
+    return [
+        array('i', [d.year for d in dates]),
+        array('i', [d.month for d in dates]),
+        array('i', [d.day for d in dates]),
+        array('i', [0]) * rows,
+        array('i', [0]) * rows,
+        array('i', [0]) * rows,
+    ]
+
+
+def measure(executor, columns, threads, repeat=5):
+    views = [memoryview(c) for c in columns]
+    rows = len(columns[0])
+    size = rows // threads + 1
+    slices = [[v[start:start + size] for v in views] for start in range(0, rows, size)]
+
+    def run():
+        for _ in executor.map(lambda s: get_jalali_dates_from_gregorian_dates(*s), slices):
+            pass
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4000000
+    columns = create_columns(rows)
+    print('Rows: %d, CPU cores: %s' % (rows, os.cpu_count()))
+    print('%8s %14s %14s %10s' % ('threads', 'seconds', 'rows/second', 'speedup'))
+    baseline = None
+    for threads in THREADS:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            elapsed = measure(executor, columns, threads)
+        baseline = baseline or elapsed
+        print('%8d %14.4f %14.0f %9.2fx' % (threads, elapsed, rows / elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,333 @@
 # -*- coding: utf-8 -*-
+import os
+import sys
 import warnings
+from collections import OrderedDict
+from array import array
+from importlib import import_module
+from khayyam.constants import MINYEAR, MAXYEAR
+from khayyam.leap_years import ASTRONOMICAL_LEAP_YEARS
+from khayyam import algorithms_pure
+from khayyam.helpers import lru_cache
 
 __author__ = 'vahid'
 
-try:
-    from .algorithms_c import \
-        is_jalali_leap_year, \
-        get_julian_day_from_gregorian_date, \
-        get_days_in_jalali_year, \
-        get_days_in_jalali_month, \
-        get_julian_day_from_jalali_date, \
-        get_jalali_date_from_julian_day, \
-        get_gregorian_date_from_julian_day, \
-        get_jalali_date_from_gregorian_date
-
-except ImportError:  # pragma: no cover
-    warnings.warn(
-        "The C extension is not available. Switching to fallback python pure algorithms,"
-        "so it's about 1000X slower than C implementation of the algorithms."
-    )
-    from .algorithms_pure import \
-        is_jalali_leap_year, \
-        get_julian_day_from_gregorian_date, \
-        get_days_in_jalali_year, \
-        get_days_in_jalali_month, \
-        get_julian_day_from_jalali_date, \
-        get_jalali_date_from_julian_day, \
-        get_gregorian_date_from_julian_day, \
-        get_jalali_date_from_gregorian_date
+
+#: The registered algorithm backends: name -> module, in the order of preference.
+BACKENDS = OrderedDict([
+    ('c', 'khayyam.algorithms_c'),
+    ('table', 'khayyam.algorithms_table'),
+    ('pure', 'khayyam.algorithms_pure'),
+])
+
+#: The environment variable to select the backend by name, when importing this module.
+BACKEND_ENVIRON = 'KHAYYAM_ALGORITHMS_BACKEND'
+
+#: The functions which should be provided by each backend.
+FUNCTIONS = (
+    'is_jalali_leap_year',
+    'get_julian_day_from_gregorian_date',
+    'get_days_in_jalali_year',
+    'get_days_in_jalali_month',
+    'get_julian_day_from_jalali_date',
+    'get_jalali_date_from_julian_day',
+    'get_gregorian_date_from_julian_day',
+    'get_jalali_date_from_gregorian_date',
+    'get_gregorian_date_from_jalali_date',
+    'get_day_number_from_gregorian_date',
+    'get_gregorian_date_from_day_number',
+    'get_day_number_from_jalali_date',
+    'get_jalali_date_from_day_number',
+    'get_jalali_dates_from_gregorian_dates',
+    'get_gregorian_dates_from_jalali_dates',
+)
+
+#: The functions which are provided natively by some backends, they are None while the other backends are active.
+OPTIONAL_FUNCTIONS = (
+    'format_jalali_date',
+    'format_jalali_datetime',
+)
+
+#: The name of the active backend.
+backend = None
+
+#: The leap rules: name -> the leap flags of the supported years, see :py:mod:`khayyam.leap_years`. The arithmetic
+#: rule is the 2820 years cycle, which is computed.
+LEAP_RULES = OrderedDict([
+    ('arithmetic', None),
+    ('astronomical', ASTRONOMICAL_LEAP_YEARS),
+])
+
+#: The environment variable to select the leap rule by name, when importing this module.
+LEAP_RULE_ENVIRON = 'KHAYYAM_LEAP_RULE'
+
+#: The name of the active leap rule.
+leap_rule = 'arithmetic'
+
+#: The functions which are memoized by the :py:func:`use_memoization`.
+MEMOIZED_FUNCTIONS = (
+    'get_jalali_date_from_gregorian_date',
+    'get_gregorian_date_from_julian_day',
+    'get_julian_day_from_jalali_date',
+)
+
+#: The environment variable to enable the memoization by the cache size, when importing this module.
+MEMOIZATION_ENVIRON = 'KHAYYAM_MEMOIZATION_SIZE'
+
+#: The maximum size of each memoization cache, 0 means disabled.
+memoization_size = 0
+
+
+def register_backend(name, module_name):
+    """
+    Registers a new backend, the module should provide all the :py:data:`FUNCTIONS`, and a `set_leap_years`
+    function, accepting the values of the :py:data:`LEAP_RULES`.
+
+    :param name: The backend name, to be used with :py:func:`use_backend`.
+    :param module_name: The full dotted name of the module.
+    """
+    BACKENDS[name] = module_name
+
+
+def available_backends():
+    """
+    :return: The name of the backends which could be imported on this interpreter.
+    :rtype: list
+    """
+    result = []
+    for name, module_name in BACKENDS.items():
+        try:
+            import_module(module_name)
+        except ImportError:
+            continue
+        result.append(name)
+    return result
+
+
+def use_backend(name):
+    """
+    Activates the given backend, all the module-level functions are replaced by the backend's ones.
+
+    Note: The names imported by `from khayyam.algorithms import ...` are not affected, so the library always
+    calls the functions through this module.
+
+    :param name: One of the :py:data:`BACKENDS`, i.e: `c`, `table` or `pure`.
+    :raises ValueError: If the backend is not registered.
+    :raises ImportError: If the backend is not available on this interpreter.
+    """
+    global backend
+    if name not in BACKENDS:
+        raise ValueError('Invalid algorithms backend: %s, it must be one of: %s' % (name, ', '.join(BACKENDS)))
+
+    module = import_module(BACKENDS[name])
+    module.set_leap_years(LEAP_RULES[leap_rule])
+    globals().update((f, getattr(module, f)) for f in FUNCTIONS)
+    globals().update((f, getattr(module, f, None)) for f in OPTIONAL_FUNCTIONS)
+    backend = name
+    _memoize(module)
+
+
+def use_leap_rule(name):
+    """
+    Selects the leap rule of all the backends.
+
+    The `astronomical` rule follows the official Iranian calendar, using the precomputed leap years of the
+    supported range, so it's as fast as the `arithmetic` rule. The years outside of the supported range are
+    computed by the `arithmetic` rule.
+
+    Note: The existing dates are not affected, so the rule should be selected once, at startup, before creating
+    any date, i.e: using the :py:data:`LEAP_RULE_ENVIRON` environment variable.
+
+    :param name: One of the :py:data:`LEAP_RULES`, i.e: `arithmetic` or `astronomical`.
+    :raises ValueError: If the rule is not defined.
+    """
+    global leap_rule
+    if name not in LEAP_RULES:
+        raise ValueError('Invalid leap rule: %s, it must be one of: %s' % (name, ', '.join(LEAP_RULES)))
+
+    # The backends which are not imported yet, will be set by the `use_backend`
+    for module_name in BACKENDS.values():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            module.set_leap_years(LEAP_RULES[name])
+    leap_rule = name
+    cache_clear()
+
+
+def _memoize(module):
+    for f in MEMOIZED_FUNCTIONS:
+        func = getattr(module, f)
+        globals()[f] = lru_cache(memoization_size)(func) if memoization_size else func
+
+
+def use_memoization(maxsize=1024):
+    """
+    Memoizes the :py:data:`MEMOIZED_FUNCTIONS` of the active backend, by a thread safe least recently used cache per
+    function, which holds the results of the last `maxsize` distinct arguments. It helps the applications which
+    convert a few recent dates over and over, mostly with the python backends.
+
+    Check the effectiveness by the :py:func:`cache_info`.
+
+    :param maxsize: The maximum size of each cache, 0 disables the memoization.
+    :raises ValueError: If the size is negative.
+    """
+    global memoization_size
+    if maxsize < 0:
+        raise ValueError('The memoization size must be a non-negative integer, but it is: %s' % maxsize)
+
+    memoization_size = maxsize
+    _memoize(import_module(BACKENDS[backend]))
+
+
+def cache_info():
+    """
+    :return: The hits, misses, maxsize and currsize of each memoized function, by the function name, or an empty
+             dict if the memoization is disabled.
+    :rtype: :py:class:`collections.OrderedDict`
+    """
+    if not memoization_size:
+        return OrderedDict()
+    return OrderedDict((f, globals()[f].cache_info()) for f in MEMOIZED_FUNCTIONS)
+
+
+def cache_clear():
+    """
+    Clears the memoization caches and their statistics.
+    """
+    if memoization_size:
+        for f in MEMOIZED_FUNCTIONS:
+            globals()[f].cache_clear()
+
+
+# The bridges between the ordinals and the epoch days, they are a constant offset of the day number, so they do not
+# depend on the backend or the leap rule.
+
+#: The day number of the day before the gregorian ordinal 1, so the day number of a date is:
+#: `date.toordinal() + GREGORIAN_ORDINAL_EPOCH`.
+GREGORIAN_ORDINAL_EPOCH = algorithms_pure.GREGORIAN_ORDINAL_EPOCH
+
+#: The day number of the day before the jalali ordinal 1, so the day number of a jalali date is:
+#: `jalali_date.toordinal() + JALALI_DAY_NUMBER_EPOCH`.
+JALALI_DAY_NUMBER_EPOCH = algorithms_pure.JALALI_DAY_NUMBER_EPOCH
+
+#: The offset of the :py:meth:`datetime.date.toordinal` from the :py:meth:`khayyam.JalaliDate.toordinal`.
+GREGORIAN_ORDINAL_OFFSET = GREGORIAN_ORDINAL_EPOCH - JALALI_DAY_NUMBER_EPOCH
+
+#: The offset of the days since 1970-01-01 from the :py:meth:`khayyam.JalaliDate.toordinal`.
+EPOCH_DAY_OFFSET = algorithms_pure.UNIX_EPOCH_DAY_NUMBER - JALALI_DAY_NUMBER_EPOCH
+
+
+def from_gregorian_ordinal(ordinal):
+    """
+    :param ordinal: The proleptic gregorian ordinal, as returned by the :py:meth:`datetime.date.toordinal`.
+    :return: The jalali ordinal of the same day, as accepted by the :py:meth:`khayyam.JalaliDate.fromordinal`.
+    :rtype: int
+    """
+    return ordinal + GREGORIAN_ORDINAL_OFFSET
+
+
+def to_gregorian_ordinal(ordinal):
+    """
+    :param ordinal: The jalali ordinal, as returned by the :py:meth:`khayyam.JalaliDate.toordinal`.
+    :return: The proleptic gregorian ordinal of the same day, as accepted by the :py:meth:`datetime.date.fromordinal`.
+    :rtype: int
+    """
+    return ordinal - GREGORIAN_ORDINAL_OFFSET
+
+
+def from_epoch_day(epoch_day):
+    """
+    :param epoch_day: The number of days since 1970-01-01, i.e: the unix timestamp // 86400.
+    :return: The jalali ordinal of the same day.
+    :rtype: int
+    """
+    return epoch_day + EPOCH_DAY_OFFSET
+
+
+def to_epoch_day(ordinal):
+    """
+    :param ordinal: The jalali ordinal, as returned by the :py:meth:`khayyam.JalaliDate.toordinal`.
+    :return: The number of days since 1970-01-01.
+    :rtype: int
+    """
+    return ordinal - EPOCH_DAY_OFFSET
+
+
+# The bulk API, over the cached month lengths table of the algorithms_pure, which follows the selected leap rule.
+
+def _get_month_lengths(start, stop):
+    if not MINYEAR <= start <= stop <= MAXYEAR + 1:
+        raise ValueError('The years must be in range(%s, %s), but they are: range(%s, %s)' % (
+            MINYEAR, MAXYEAR + 1, start, stop))
+    return algorithms_pure.get_month_lengths()[(start - MINYEAR) * 12:(stop - MINYEAR) * 12]
+
+
+def _to_numpy(values, columns=None):
+    import numpy
+    result = numpy.frombuffer(values, dtype=numpy.dtype(values.typecode))
+    return result if columns is None else result.reshape(-1, columns)
+
+
+def get_jalali_leap_years(start=MINYEAR, stop=MAXYEAR + 1, numpy=False):
+    """
+    :param start: The first year.
+    :param stop: The year after the last one, the same as the `range`.
+    :param numpy: Return a numpy array instead, requires the numpy to be installed.
+    :return: The leap flags of the years, 0 or 1 per year.
+    :rtype: array.array
+    :raises ValueError: If the years are not supported.
+    """
+    result = array('B', [days - 29 for days in _get_month_lengths(start, stop)[11::12]])
+    return _to_numpy(result) if numpy else result
+
+
+def get_days_in_jalali_years(start=MINYEAR, stop=MAXYEAR + 1, numpy=False):
+    """
+    :param start: The first year.
+    :param stop: The year after the last one, the same as the `range`.
+    :param numpy: Return a numpy array instead, requires the numpy to be installed.
+    :return: The number of days in each year, 365 or 366.
+    :rtype: array.array
+    :raises ValueError: If the years are not supported.
+    """
+    result = array('H', [days + 336 for days in _get_month_lengths(start, stop)[11::12]])
+    return _to_numpy(result) if numpy else result
+
+
+def get_days_in_jalali_months(start=MINYEAR, stop=MAXYEAR + 1, numpy=False):
+    """
+    :param start: The first year.
+    :param stop: The year after the last one, the same as the `range`.
+    :param numpy: Return a numpy array of the shape `(years, 12)` instead, requires the numpy to be installed.
+    :return: The number of days in the 12 months of each year, flattened, so the days in a month is the item:
+             `(year - start) * 12 + month - 1`.
+    :rtype: array.array
+    :raises ValueError: If the years are not supported.
+    """
+    result = _get_month_lengths(start, stop)
+    return _to_numpy(result, 12) if numpy else result
+
+
+def _use_default_backend():
+    name = os.environ.get(BACKEND_ENVIRON)
+    if name:
+        use_backend(name)
+        return
+
+    for name in BACKENDS:
+        try:
+            use_backend(name)
+        except ImportError:  # pragma: no cover
+            continue
+
+        if name != 'c':  # pragma: no cover
+            warnings.warn(
+                "The C extension is not available. Switching to fallback python %s algorithms, "
+                "so it's a few times slower than C implementation of the algorithms." % name
+            )
+        return
+
+
+_use_default_backend()
+use_leap_rule(os.environ.get(LEAP_RULE_ENVIRON) or leap_rule)
+use_memoization(int(os.environ.get(MEMOIZATION_ENVIRON) or memoization_size))
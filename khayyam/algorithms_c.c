@@ -1,5 +1,6 @@
 
 #include <Python.h>
+#include <datetime.h>
 #include <stdio.h>
 #include <math.h>
 
@@ -40,6 +41,286 @@ static int pythonLikeIntegerDivision(int a, int b){
 }
 
 
+/*
+Internal function, pythons integer floor division.
+*/
+static int floorDivision(int a, int b){
+    int q = a / b;
+    if ( (a % b != 0) && ((a < 0) != (b < 0)) ){
+        q--;
+    }
+    return q;
+}
+
+
+/*
+The integer day number of a date, is the floor of its julian day, so the
+day number of the jalali date 1361-06-15 is 2445218, exactly the value
+accepted by the `JalaliDate(julian_day=...)`.
+*/
+#define JALALI_DAY_NUMBER_EPOCH 1948319     /* floor(1948320.5 - 1) */
+#define JALALI_475_DAY_NUMBER 2121445       /* getDayNumberFromJalaliDate(475, 1, 1) */
+#define GREGORIAN_DAY_NUMBER_EPOCH 1721119  /* The day before 0000-03-01 */
+
+#define MINYEAR 1       /* khayyam.MINYEAR */
+#define MAXYEAR 3178    /* khayyam.MAXYEAR */
+
+/*
+The years and the day numbers accepted by the conversion functions, so the day number arithmetic does not overflow
+the C int. The day numbers of the years -5000000 and 5000000 are about -1.83e9 and 1.83e9.
+*/
+#define MAX_ABSOLUTE_YEAR 5000000
+#define MAX_ABSOLUTE_DAY_NUMBER 1800000000
+#define isYearInRange(year) (((year) >= -MAX_ABSOLUTE_YEAR) && ((year) <= MAX_ABSOLUTE_YEAR))
+
+
+/*
+The leap rule, selected by the set_leap_years. The arithmetic rule is computed, the others are given as the leap
+flags of the supported years, which are accumulated into the first day number of each year, from MINYEAR to
+MAXYEAR + 1. The days outside of the table are computed using the arithmetic rule. Both rules agree on the first and
+the last days of the table.
+
+The batch conversions run without the GIL, and the module does not need the GIL on the free-threaded builds, so the
+table of a rule is built in its own buffer and is never changed afterwards. Then it's published by an atomic pointer
+swap, NULL means the arithmetic rule, and each reader loads the pointer once per conversion. The published tables are
+kept for the lifetime of the process, as a reader may be still using the previous one, and are reused when the same
+rule is selected again, so there is at most one table per rule.
+*/
+#define YEAR_STARTS_SIZE (MAXYEAR - MINYEAR + 2)
+
+typedef struct YearStartsTable {
+    struct YearStartsTable *next;
+    int starts[YEAR_STARTS_SIZE];
+} YearStartsTable;
+
+static int *yearStarts = NULL;
+static YearStartsTable *yearStartsTables = NULL;    /* Changed only by the set_leap_years */
+
+#if PY_VERSION_HEX >= 0x030D0000
+  #define loadYearStarts() ((const int *)_Py_atomic_load_ptr_acquire(&yearStarts))
+  #define storeYearStarts(value) _Py_atomic_store_ptr_release(&yearStarts, (value))
+#elif defined(__GNUC__) || defined(__clang__)
+  #define loadYearStarts() ((const int *)__atomic_load_n(&yearStarts, __ATOMIC_ACQUIRE))
+  #define storeYearStarts(value) __atomic_store_n(&yearStarts, (value), __ATOMIC_RELEASE)
+#elif defined(_MSC_VER)
+  #include <intrin.h>
+  #define loadYearStarts() ((const int *)_InterlockedCompareExchangePointer((void * volatile *)&yearStarts, NULL, NULL))
+  #define storeYearStarts(value) _InterlockedExchangePointer((void * volatile *)&yearStarts, (value))
+#else
+  #define loadYearStarts() ((const int *)*(int * volatile *)&yearStarts)
+  #define storeYearStarts(value) (*(int * volatile *)&yearStarts = (value))
+#endif
+
+#define isYearInTable(starts, year) (((starts) != NULL) && ((year) >= MINYEAR) && ((year) <= MAXYEAR))
+#define isDayNumberInTable(starts, dayNumber) \
+        (((starts) != NULL) && ((dayNumber) >= (starts)[0]) && ((dayNumber) < (starts)[YEAR_STARTS_SIZE - 1]))
+
+
+/*
+The index of the year of the given day number in the table. The estimation by the julian year length is off by at
+most one year in the supported range, so it's corrected by a step.
+*/
+static int getYearStartsIndex(const int *starts, int dayNumber){
+    int index = (int)(((long long)(dayNumber - starts[0]) * 4) / 1461);
+
+    while ( (index > 0) && (starts[index] > dayNumber) ){
+        index--;
+    }
+    while ( (index < YEAR_STARTS_SIZE - 2) && (starts[index + 1] <= dayNumber) ){
+        index++;
+    }
+    return index;
+}
+
+
+static Boolean isGregorianLeapYear(int year){
+    return (mod(year, 4) == 0) && ( (mod(year, 100) != 0) || (mod(year, 400) == 0) );
+}
+
+
+static int getDaysBeforeJalaliMonth(int month){
+    return (month <= 7) ? (month - 1) * 31 : ((month - 1) * 30) + 6;
+}
+
+
+/*
+The conversions by a given table, so a conversion which needs the table more than once uses the same rule.
+*/
+static int getDayNumberFromJalaliDateBy(const int *starts, int year, int month, int day){
+    int base = year - (year >= 0 ? 474 : 473);
+    int julianYear = 474 + mod(base, 2820);
+
+    if ( isYearInTable(starts, year) ){
+        return starts[year - MINYEAR] + getDaysBeforeJalaliMonth(month) + day - 1;
+    }
+
+    return
+        day +
+        getDaysBeforeJalaliMonth(month) +
+        ((julianYear * 682) - 110) / 2816 +
+        (julianYear - 1) * 365 +
+        floorDivision(base, 2820) * 1029983 +
+        JALALI_DAY_NUMBER_EPOCH;
+}
+
+
+static void getJalaliDateFromDayNumberBy(const int *starts, int dayNumber, int *year, int *month, int *day){
+    int offset, cycle, remaining, yearCycle, a1, a2, dayOfYear, index;
+
+    if ( isDayNumberInTable(starts, dayNumber) ){
+        index = getYearStartsIndex(starts, dayNumber);
+        *year = index + MINYEAR;
+        dayOfYear = dayNumber - starts[index] + 1;
+        *month = (dayOfYear <= 186) ? (dayOfYear + 30) / 31 : (dayOfYear + 23) / 30;
+        *day = dayOfYear - getDaysBeforeJalaliMonth(*month);
+        return;
+    }
+
+    offset = dayNumber - JALALI_475_DAY_NUMBER;
+    cycle = floorDivision(offset, 1029983);
+    remaining = mod(offset, 1029983);
+
+    if ( remaining == 1029982 ){
+        yearCycle = 2820;
+    }
+    else{
+        a1 = remaining / 366;
+        a2 = remaining % 366;
+        yearCycle = (2134*a1 + 2816*a2 + 2815) / 1028522 + a1 + 1;
+    }
+
+    *year = yearCycle + 2820*cycle + 474;
+
+    if ( *year <= 0 ){
+        *year -= 1;
+    }
+
+    dayOfYear = dayNumber - getDayNumberFromJalaliDateBy(starts, *year, 1, 1) + 1;
+    *month = (dayOfYear <= 186) ? (dayOfYear + 30) / 31 : (dayOfYear + 23) / 30;
+    *day = dayOfYear - getDaysBeforeJalaliMonth(*month);
+}
+
+
+static Boolean isArithmeticLeapYear(int year){
+    int a = mod((year % 2820) - (year > 0 ? 474 : 473), 2820) + 474 + 38;
+    return mod(a * 682, 2816) < 682;
+}
+
+
+static Boolean isJalaliLeapYearBy(const int *starts, int year){
+    if ( isYearInTable(starts, year) ){
+        return starts[year - MINYEAR + 1] - starts[year - MINYEAR] == 366;
+    }
+    return isArithmeticLeapYear(year);
+}
+
+
+static int getDayNumberFromJalaliDate(int year, int month, int day){
+    return getDayNumberFromJalaliDateBy(loadYearStarts(), year, month, day);
+}
+
+
+static void getJalaliDateFromDayNumber(int dayNumber, int *year, int *month, int *day){
+    getJalaliDateFromDayNumberBy(loadYearStarts(), dayNumber, year, month, day);
+}
+
+
+static Boolean isJalaliLeapYear(int year){
+    return isJalaliLeapYearBy(loadYearStarts(), year);
+}
+
+
+/*
+All the derived fields of a jalali date, computed together from its day number.
+*/
+typedef struct {
+    int year;
+    int month;
+    int day;
+    int weekday;        /* Saturday is 0 and Friday is 6 */
+    int dayOfYear;      /* 1-366 */
+    Boolean isLeap;
+    int daysInMonth;
+} JalaliDateFacts;
+
+
+static void getJalaliDateFactsFromDayNumber(int dayNumber, JalaliDateFacts *facts){
+    const int *starts = loadYearStarts();
+
+    getJalaliDateFromDayNumberBy(starts, dayNumber, &facts->year, &facts->month, &facts->day);
+    facts->weekday = mod(dayNumber + 3, 7);
+    facts->dayOfYear = getDaysBeforeJalaliMonth(facts->month) + facts->day;
+    facts->isLeap = isJalaliLeapYearBy(starts, facts->year);
+    if ( facts->month <= 6 ){
+        facts->daysInMonth = 31;
+    }
+    else if ( facts->month < 12 ){
+        facts->daysInMonth = 30;
+    }
+    else{
+        facts->daysInMonth = facts->isLeap ? 30 : 29;
+    }
+}
+
+
+static int getDaysInGregorianFebruary(int year){
+    return isGregorianLeapYear(year) ? 29 : 28;
+}
+
+
+static int computeDayNumberFromGregorianDate(int year, int month, int day){
+    int era, yearOfEra, dayOfYear;
+
+    /*
+    Counting years from the March, so the leap day is the last day of the year
+    */
+    if ( month <= 2 ){
+        year -= 1;
+    }
+    era = floorDivision(year, 400);
+    yearOfEra = year - era * 400;
+    dayOfYear = (153 * (month > 2 ? month - 3 : month + 9) + 2) / 5 + day - 1;
+
+    return
+        era * 146097 +
+        yearOfEra * 365 + yearOfEra / 4 - yearOfEra / 100 +
+        dayOfYear +
+        GREGORIAN_DAY_NUMBER_EPOCH;
+}
+
+
+static Error getDayNumberFromGregorianDate(int year, int month, int day, int *dayNumber){
+    int maxDays;
+
+    if ( month == 2 ){
+        maxDays = getDaysInGregorianFebruary(year);
+        if ( day > maxDays ){
+            PyErr_Format(PyExc_ValueError, "Invalid day: %d, it must be <= %d", day, maxDays);
+            return -1;
+        }
+    }
+
+    *dayNumber = computeDayNumberFromGregorianDate(year, month, day);
+    return 0;
+}
+
+
+static void getGregorianDateFromDayNumber(int dayNumber, int *year, int *month, int *day){
+    int era, dayOfEra, yearOfEra, dayOfYear, monthFromMarch;
+
+    dayNumber -= GREGORIAN_DAY_NUMBER_EPOCH;
+    era = floorDivision(dayNumber, 146097);
+    dayOfEra = dayNumber - era * 146097;
+    yearOfEra = (dayOfEra - dayOfEra / 1460 + dayOfEra / 36524 - dayOfEra / 146096) / 365;
+    dayOfYear = dayOfEra - (365 * yearOfEra + yearOfEra / 4 - yearOfEra / 100);
+    monthFromMarch = (5 * dayOfYear + 2) / 153;
+
+    *day = dayOfYear - (153 * monthFromMarch + 2) / 5 + 1;
+    *month = monthFromMarch < 10 ? monthFromMarch + 3 : monthFromMarch - 9;
+    *year = yearOfEra + era * 400 + (*month <= 2 ? 1 : 0);
+}
+
+
 static Error getJulianDayFromGregorianDate(int year, int month, int day, double *julianDay){
     Boolean y4Cond, y100Cond, y400Cond, isLeap;
     double century, y4, y100, y400, yearDouble;
@@ -95,12 +376,6 @@ static Error getJulianDayFromGregorianDate(int year, int month, int day, double
 }
 
 
-static Boolean isJalaliLeapYear(int year){
-    int a = mod(year - (year > 0 ? 474 : 473), 2820) + 474 + 38;
-    return mod(a * 682, 2816) < 682;
-}
-
-
 static int getDaysInJalaliYear(int year){
 
     return isJalaliLeapYear(year) ? 366 : 365;
@@ -128,6 +403,12 @@ static Error getDaysInJalaliMonth(int year, int month, int *days){
 static double getJulianDayFromJalaliDate(int year, int month, int day){
     int base = year - (year >= 0 ? 474 : 473);
     int julianYear = 474 + mod(base, 2820);
+    const int *starts = loadYearStarts();
+
+    if ( isYearInTable(starts, year) ){
+        return getDayNumberFromJalaliDateBy(starts, year, month, day) + 0.5;
+    }
+
     return
         day +
         ( (month <= 7) ? (month - 1) * 31 : ((month - 1) * 30) + 6) +
@@ -141,6 +422,12 @@ static double getJulianDayFromJalaliDate(int year, int month, int day){
 static void getJalaliDateFromJulianDay(double julianDay, int *year, int *month, int *day){
     double offset, cycle, daysInYears;
     int remaining, yearCycle, a1, a2;
+    const int *starts = loadYearStarts();
+
+    if ( isDayNumberInTable(starts, floor(julianDay)) ){
+        getJalaliDateFromDayNumberBy(starts, (int)floor(julianDay), year, month, day);
+        return;
+    }
 
     julianDay = floor(julianDay) + 0.5;
 
@@ -215,38 +502,202 @@ static Error getGregorianDateFromJulianDay(double julianDay, int *year, int *mon
 /* ################################## Python ################################################### */
 
 
-static PyObject * createPythonDateTuple(int year, int month, int day){
-    PyObject *t = PyTuple_New(3);
+/*
+The functions are using the fast calling convention, METH_FASTCALL, where it's available (python 3.7 and above),
+so the arguments are passed as a C array, without packing them into a tuple and parsing a format string. On the
+older versions, a METH_VARARGS function passes the items of the arguments tuple to the same implementation.
+*/
+#if PY_VERSION_HEX >= 0x03070000
+  #define FASTCALL_FUNCTION(name) \
+          static PyObject * name(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+  #define FASTCALL_NAMED_METHOD(name, function) name, (PyCFunction)(void(*)(void))function, METH_FASTCALL
+#else
+  #define FASTCALL_FUNCTION(name) \
+          static PyObject * name##_fastcall(PyObject *self, PyObject *const *args, Py_ssize_t nargs); \
+          static PyObject * name(PyObject *self, PyObject *args){ \
+              return name##_fastcall(self, &PyTuple_GET_ITEM(args, 0), PyTuple_GET_SIZE(args)); \
+          } \
+          static PyObject * name##_fastcall(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+  #define FASTCALL_NAMED_METHOD(name, function) name, function, METH_VARARGS
+#endif
+
+#define FASTCALL_METHOD(name) FASTCALL_NAMED_METHOD(#name, name)
+
+
+#if PY_MAJOR_VERSION >= 3
+  #define longFromObject PyLong_AsLong
+  #define newLong PyLong_FromLong
+#else
+  #define longFromObject PyInt_AsLong
+  #define newLong PyInt_FromLong
+#endif
 
-    #if PY_MAJOR_VERSION >= 3
-        PyTuple_SetItem(t, 0, PyLong_FromLong(year));
-        PyTuple_SetItem(t, 1, PyLong_FromLong(month));
-        PyTuple_SetItem(t, 2, PyLong_FromLong(day));
-    #else
-        PyTuple_SetItem(t, 0, PyInt_FromLong(year));
-        PyTuple_SetItem(t, 1, PyInt_FromLong(month));
-        PyTuple_SetItem(t, 2, PyInt_FromLong(day));
-    #endif
 
-    return t;
+static Error checkArgumentsCount(const char *functionName, Py_ssize_t nargs, Py_ssize_t count){
+    if ( nargs != count ){
+        PyErr_Format(PyExc_TypeError, "%s() takes exactly %zd argument%s (%zd given)",
+                     functionName, count, count == 1 ? "" : "s", nargs);
+        return -1;
+    }
+    return 0;
 }
 
 
-static PyObject * get_julian_day_from_gregorian_date(PyObject *self, PyObject *args){
-    double julianDay;
-    int year, month, day;
-    Error err;
+/*
+Converts the positional arguments to C integers, the same as the "i" format unit of the PyArg_ParseTuple.
+*/
+static Error parseIntArguments(const char *functionName, PyObject *const *args, Py_ssize_t nargs,
+        Py_ssize_t count, int *values){
+    Py_ssize_t i;
+    long value;
+
+    if ( checkArgumentsCount(functionName, nargs, count) != 0 ){
+        return -1;
+    }
+
+    for (i = 0; i < count; i++){
+        if ( PyFloat_Check(args[i]) ){
+            PyErr_SetString(PyExc_TypeError, "integer argument expected, got float");
+            return -1;
+        }
+
+        value = longFromObject(args[i]);
+        if ( (value == -1) && PyErr_Occurred() ){
+            return -1;
+        }
+
+        if ( (value > INT_MAX) || (value < INT_MIN) ){
+            PyErr_SetString(PyExc_OverflowError, value > 0 ?
+                "signed integer is greater than maximum" : "signed integer is less than minimum");
+            return -1;
+        }
+        values[i] = (int)value;
+    }
+    return 0;
+}
+
+
+/*
+Checks the year and the day number arguments of the conversion functions against the ranges which the day number
+arithmetic does not overflow within.
+*/
+static Error checkYearArgument(int year){
+    if ( !isYearInRange(year) ){
+        PyErr_Format(PyExc_OverflowError, "Year must be between %d and %d, but it is: %d",
+                     -MAX_ABSOLUTE_YEAR, MAX_ABSOLUTE_YEAR, year);
+        return -1;
+    }
+    return 0;
+}
+
+
+static Error checkDayNumberArgument(double dayNumber){
+    if ( !((dayNumber >= -MAX_ABSOLUTE_DAY_NUMBER) && (dayNumber <= MAX_ABSOLUTE_DAY_NUMBER)) ){
+        PyErr_Format(PyExc_OverflowError, "Day number must be between %d and %d",
+                     -MAX_ABSOLUTE_DAY_NUMBER, MAX_ABSOLUTE_DAY_NUMBER);
+        return -1;
+    }
+    return 0;
+}
+
+
+/*
+Converts the positional argument to a C float, the same as the "f" format unit of the PyArg_ParseTuple.
+*/
+static Error parseFloatArgument(const char *functionName, PyObject *const *args, Py_ssize_t nargs, float *value){
+    double result;
+
+    if ( checkArgumentsCount(functionName, nargs, 1) != 0 ){
+        return -1;
+    }
+
+    result = PyFloat_AsDouble(args[0]);
+    if ( (result == -1.0) && PyErr_Occurred() ){
+        return -1;
+    }
+    *value = (float)result;
+    return 0;
+}
+
+
+/*
+The integers in [0, CACHED_INTEGERS) are created once, it covers the all supported years, months and days, so
+building a result does not allocate any integer object.
+*/
+#define CACHED_INTEGERS 4000
+
+static PyObject *cachedIntegers[CACHED_INTEGERS];
+
+
+static Error initializeCachedIntegers(void){
+    int i;
+
+    for (i = 0; i < CACHED_INTEGERS; i++){
+        if ( (cachedIntegers[i] = newLong(i)) == NULL ){
+            return -1;
+        }
+    }
+    return 0;
+}
+
 
-    if (!PyArg_ParseTuple(args, "iii", &year, &month, &day)){
+static PyObject * integerFromInt(int value){
+    PyObject *result;
+
+    if ( (value >= 0) && (value < CACHED_INTEGERS) ){
+        result = cachedIntegers[value];
+        Py_INCREF(result);
+        return result;
+    }
+    return newLong(value);
+}
+
+
+/*
+The results are plain tuples, the tuples are allocated from the interpreter's free list, which is measured faster
+than creating a struct sequence per call.
+*/
+static PyObject * createPythonTuple(int count, const int *values){
+    PyObject *result, *item;
+    int i;
+
+    if ( (result = PyTuple_New(count)) == NULL ){
         return NULL;
     }
 
-    err = getJulianDayFromGregorianDate(year, month, day, &julianDay);
+    for (i = 0; i < count; i++){
+        if ( (item = integerFromInt(values[i])) == NULL ){
+            Py_DECREF(result);
+            return NULL;
+        }
+        PyTuple_SET_ITEM(result, i, item);
+    }
+    return result;
+}
+
+
+static PyObject * createPythonDateTuple(int year, int month, int day){
+    int values[3];
+
+    values[0] = year;
+    values[1] = month;
+    values[2] = day;
+    return createPythonTuple(3, values);
+}
+
+
+FASTCALL_FUNCTION(get_julian_day_from_gregorian_date){
+    double julianDay;
+    int values[3];
+
+    if ( (parseIntArguments("get_julian_day_from_gregorian_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
+        return NULL;
+    }
 
     /*
     Catch exception if any
     */
-    if (err != 0){
+    if (getJulianDayFromGregorianDate(values[0], values[1], values[2], &julianDay) != 0){
         return NULL;
     }
 
@@ -254,10 +705,10 @@ static PyObject * get_julian_day_from_gregorian_date(PyObject *self, PyObject *a
 }
 
 
-static PyObject * is_jalali_leap_year(PyObject *self, PyObject *args){
+FASTCALL_FUNCTION(is_jalali_leap_year){
     int year;
 
-    if (!PyArg_ParseTuple(args, "i", &year)){
+    if (parseIntArguments("is_jalali_leap_year", args, nargs, 1, &year) != 0){
         return NULL;
     }
 
@@ -265,57 +716,51 @@ static PyObject * is_jalali_leap_year(PyObject *self, PyObject *args){
 }
 
 
-static PyObject * get_days_in_jalali_year(PyObject *self, PyObject *args){
+FASTCALL_FUNCTION(get_days_in_jalali_year){
     int year;
 
-    if (!PyArg_ParseTuple(args, "i", &year)){
+    if (parseIntArguments("get_days_in_jalali_year", args, nargs, 1, &year) != 0){
         return NULL;
     }
 
-    return PyLong_FromLong(getDaysInJalaliYear(year));
+    return integerFromInt(getDaysInJalaliYear(year));
 }
 
 
-static PyObject * get_days_in_jalali_month(PyObject *self, PyObject *args){
-    int year, month, result;
-    Error err;
+FASTCALL_FUNCTION(get_days_in_jalali_month){
+    int values[2], result;
 
-    if (!PyArg_ParseTuple(args, "ii", &year, &month)){
+    if (parseIntArguments("get_days_in_jalali_month", args, nargs, 2, values) != 0){
         return NULL;
     }
 
-    err = getDaysInJalaliMonth(year, month, &result);
-
     /*
     Catch exception if any
     */
-    if (err != 0){
+    if (getDaysInJalaliMonth(values[0], values[1], &result) != 0){
         return NULL;
     }
 
-    return PyLong_FromLong(result);
+    return integerFromInt(result);
 }
 
 
-static PyObject * get_julian_day_from_jalali_date(PyObject *self, PyObject *args){
-    double julianDay;
-    int year, month, day;
+FASTCALL_FUNCTION(get_julian_day_from_jalali_date){
+    int values[3];
 
-    if (!PyArg_ParseTuple(args, "iii", &year, &month, &day)){
+    if ( (parseIntArguments("get_julian_day_from_jalali_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
         return NULL;
     }
 
-    julianDay = getJulianDayFromJalaliDate(year, month, day);
-
-    return PyFloat_FromDouble(julianDay);
+    return PyFloat_FromDouble(getJulianDayFromJalaliDate(values[0], values[1], values[2]));
 }
 
 
-static PyObject * get_jalali_date_from_julian_day(PyObject *self, PyObject *args){
+FASTCALL_FUNCTION(get_jalali_date_from_julian_day){
     float julianDay;
     int year, month, day;
 
-    if (!PyArg_ParseTuple(args, "f", &julianDay)){
+    if ( (parseFloatArgument("get_jalali_date_from_julian_day", args, nargs, &julianDay) != 0) || (checkDayNumberArgument(julianDay) != 0) ){
         return NULL;
     }
 
@@ -325,20 +770,18 @@ static PyObject * get_jalali_date_from_julian_day(PyObject *self, PyObject *args
 }
 
 
-static PyObject * get_gregorian_date_from_julian_day(PyObject *self, PyObject *args){
+FASTCALL_FUNCTION(get_gregorian_date_from_julian_day){
     float julianDay;
     int year, month, day;
-    Error err;
 
-    if (!PyArg_ParseTuple(args, "f", &julianDay)){
+    if ( (parseFloatArgument("get_gregorian_date_from_julian_day", args, nargs, &julianDay) != 0) || (checkDayNumberArgument(julianDay) != 0) ){
         return NULL;
     }
 
-    err = getGregorianDateFromJulianDay(julianDay, &year, &month, &day);
     /*
     Catch exception if any
     */
-    if (err != 0){
+    if (getGregorianDateFromJulianDay(julianDay, &year, &month, &day) != 0){
         return NULL;
     }
 
@@ -346,115 +789,1626 @@ static PyObject * get_gregorian_date_from_julian_day(PyObject *self, PyObject *a
 }
 
 
-static PyObject *  get_jalali_date_from_gregorian_date(PyObject *self, PyObject *args){
-    int gYear, gMonth, gDay, jYear, jMonth, jDay;
-    double julianDay;
-    Error err;
+FASTCALL_FUNCTION(get_jalali_date_from_gregorian_date){
+    int values[3], dayNumber, year, month, day;
 
-    if (!PyArg_ParseTuple(args, "iii", &gYear, &gMonth, &gDay)){
+    if ( (parseIntArguments("get_jalali_date_from_gregorian_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
         return NULL;
     }
 
-    err = getJulianDayFromGregorianDate(gYear, gMonth, gDay, &julianDay);
-
-    if ( err != 0){
+    if (getDayNumberFromGregorianDate(values[0], values[1], values[2], &dayNumber) != 0){
         return NULL;
     }
 
-    getJalaliDateFromJulianDay(julianDay, &jYear, &jMonth, &jDay);
+    getJalaliDateFromDayNumber(dayNumber, &year, &month, &day);
 
-    return createPythonDateTuple(jYear, jMonth, jDay);
+    return createPythonDateTuple(year, month, day);
 }
 
 
-static PyMethodDef moduleFunctions[] = {
+FASTCALL_FUNCTION(get_day_number_from_gregorian_date){
+    int values[3], dayNumber;
 
-    {
-        "get_julian_day_from_gregorian_date",
-        get_julian_day_from_gregorian_date,
-        METH_VARARGS,
-        "Gets julian day from gregorian date."
-    },
+    if ( (parseIntArguments("get_day_number_from_gregorian_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
+        return NULL;
+    }
 
-    {
-        "is_jalali_leap_year",
-        is_jalali_leap_year,
-        METH_VARARGS,
-        "Determines the jalali year is leap or not."
-    },
+    if (getDayNumberFromGregorianDate(values[0], values[1], values[2], &dayNumber) != 0){
+        return NULL;
+    }
 
-    {
-        "get_days_in_jalali_year",
-        get_days_in_jalali_year,
-        METH_VARARGS,
-        "Determines the number of days in jalali year."
-    },
+    return newLong(dayNumber);
+}
 
-    {
-        "get_days_in_jalali_month",
-        get_days_in_jalali_month,
-        METH_VARARGS,
-        "Determines the number of days in jalali month."
-    },
 
-    {
-        "get_julian_day_from_jalali_date",
-        get_julian_day_from_jalali_date,
-        METH_VARARGS,
-        "Gets julian day from jalali date."
-    },
+FASTCALL_FUNCTION(get_gregorian_date_from_day_number){
+    int dayNumber, year, month, day;
 
-    {
-        "get_jalali_date_from_julian_day",
-        get_jalali_date_from_julian_day,
-        METH_VARARGS,
-        "Gets jalali date from julian day."
-    },
+    if ( (parseIntArguments("get_gregorian_date_from_day_number", args, nargs, 1, &dayNumber) != 0) || (checkDayNumberArgument(dayNumber) != 0) ){
+        return NULL;
+    }
 
-    {
-        "get_gregorian_date_from_julian_day",
-        get_gregorian_date_from_julian_day,
-        METH_VARARGS,
-        "Gets gregorian date from julian day."
-    },
+    getGregorianDateFromDayNumber(dayNumber, &year, &month, &day);
 
-    {
-        "get_jalali_date_from_gregorian_date",
-        get_jalali_date_from_gregorian_date,
-        METH_VARARGS,
-        "Gets jalali date from gregorian date."
-    },
+    return createPythonDateTuple(year, month, day);
+}
 
-    {NULL, NULL, 0, NULL}        /* Sentinel */
+
+FASTCALL_FUNCTION(get_day_number_from_jalali_date){
+    int values[3];
+
+    if ( (parseIntArguments("get_day_number_from_jalali_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
+        return NULL;
+    }
+
+    return newLong(getDayNumberFromJalaliDate(values[0], values[1], values[2]));
+}
+
+
+FASTCALL_FUNCTION(get_jalali_date_from_day_number){
+    int dayNumber, year, month, day;
+
+    if ( (parseIntArguments("get_jalali_date_from_day_number", args, nargs, 1, &dayNumber) != 0) || (checkDayNumberArgument(dayNumber) != 0) ){
+        return NULL;
+    }
+
+    getJalaliDateFromDayNumber(dayNumber, &year, &month, &day);
+
+    return createPythonDateTuple(year, month, day);
+}
+
+
+FASTCALL_FUNCTION(get_gregorian_date_from_jalali_date){
+    int values[3], year, month, day;
+
+    if ( (parseIntArguments("get_gregorian_date_from_jalali_date", args, nargs, 3, values) != 0) || (checkYearArgument(values[0]) != 0) ){
+        return NULL;
+    }
+
+    getGregorianDateFromDayNumber(getDayNumberFromJalaliDate(values[0], values[1], values[2]), &year, &month, &day);
+
+    return createPythonDateTuple(year, month, day);
+}
+
+
+/*
+set_leap_years(leap_years), the leap_years is a buffer of the leap flags of the supported years, one bit per year, the
+least significant bit of the first byte is the MINYEAR, or None for the arithmetic rule. The table is built in a new
+buffer, or an equal table which is published before is reused, then it's published atomically, see the yearStarts.
+The rule is supposed to be selected once, at startup, by the khayyam.algorithms.use_leap_rule.
+*/
+#ifdef Py_GIL_DISABLED
+static PyMutex yearStartsMutex;
+#endif
+
+FASTCALL_FUNCTION(set_leap_years){
+    Py_buffer view;
+    const unsigned char *flags;
+    int starts[YEAR_STARTS_SIZE], index;
+    YearStartsTable *table;
+
+    if ( checkArgumentsCount("set_leap_years", nargs, 1) != 0 ){
+        return NULL;
+    }
+
+    if ( args[0] == Py_None ){
+        storeYearStarts(NULL);
+        Py_RETURN_NONE;
+    }
+
+    if ( PyObject_GetBuffer(args[0], &view, PyBUF_SIMPLE) != 0 ){
+        return NULL;
+    }
+
+    if ( view.len < (YEAR_STARTS_SIZE - 1 + 7) / 8 ){
+        PyErr_Format(PyExc_ValueError, "The leap years must have at least %d bytes, one bit per year",
+                     (YEAR_STARTS_SIZE - 1 + 7) / 8);
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+
+    flags = (const unsigned char *)view.buf;
+    starts[0] = JALALI_DAY_NUMBER_EPOCH + 1;
+    for (index = 0; index < YEAR_STARTS_SIZE - 1; index++){
+        starts[index + 1] = starts[index] + (((flags[index >> 3] >> (index & 7)) & 1) ? 366 : 365);
+    }
+    PyBuffer_Release(&view);
+
+    /* The list of the tables is changed by the writers only, which are serialized by the GIL or the mutex */
+#ifdef Py_GIL_DISABLED
+    PyMutex_Lock(&yearStartsMutex);
+#endif
+    for (table = yearStartsTables; table != NULL; table = table->next){
+        if ( memcmp(table->starts, starts, sizeof(starts)) == 0 ){
+            break;
+        }
+    }
+
+    if ( table == NULL ){
+        if ( (table = (YearStartsTable *)malloc(sizeof(YearStartsTable))) == NULL ){
+#ifdef Py_GIL_DISABLED
+            PyMutex_Unlock(&yearStartsMutex);
+#endif
+            return PyErr_NoMemory();
+        }
+        memcpy(table->starts, starts, sizeof(starts));
+        table->next = yearStartsTables;
+        yearStartsTables = table;
+    }
+
+    storeYearStarts(table->starts);
+#ifdef Py_GIL_DISABLED
+    PyMutex_Unlock(&yearStartsMutex);
+#endif
+    Py_RETURN_NONE;
+}
+
+
+/*
+Acquires a C-contiguous buffer of int32 items, the buffer may be also a raw byte buffer, such as bytes or
+bytearray, which is interpreted as native int32 values.
+*/
+static Error getInt32Buffer(PyObject *object, Py_buffer *view, Boolean writable, Py_ssize_t *length){
+    const char *format;
+    char code;
+
+    if (PyObject_GetBuffer(object, view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT | (writable ? PyBUF_WRITABLE : 0)) != 0){
+        return -1;
+    }
+
+    format = view->format == NULL ? "B" : view->format;
+    if ( (*format == '@') || (*format == '=') || (*format == '<') || (*format == '>') || (*format == '!') ){
+        format++;
+    }
+    code = format[0];
+
+    if ( (format[1] == '\0') && (code == 'B' || code == 'b' || code == 'c') && (view->len % 4 == 0) ){
+        *length = view->len / 4;
+        return 0;
+    }
+
+    if ( (format[1] == '\0') && (code == 'i' || code == 'I' || code == 'l' || code == 'L') && (view->itemsize == 4) ){
+        *length = view->len / 4;
+        return 0;
+    }
+
+    PyErr_Format(PyExc_TypeError, "A buffer of int32 items is required, but the format is: '%s'", view->format);
+    PyBuffer_Release(view);
+    return -1;
+}
+
+
+typedef Error (*DateConverter)(int, int, int, int *, int *, int *, int *);
+
+
+/*
+The converters check the year, the month and the day of the row, the number of days in the month is given back by the
+`maxDays`, or zero if the month is invalid, or -1 if the year is out of range. They don't set the python error, so they
+could run without the GIL.
+*/
+static Error convertGregorianDateToJalaliDate(int year, int month, int day, int *jYear, int *jMonth, int *jDay,
+        int *maxDays){
+    static const int daysInGregorianMonth[] = {31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31};
+
+    if ( !isYearInRange(year) ){
+        *maxDays = -1;
+        return -1;
+    }
+    if ( (month < 1) || (month > 12) ){
+        *maxDays = 0;
+        return -1;
+    }
+    *maxDays = (month == 2) ? getDaysInGregorianFebruary(year) : daysInGregorianMonth[month - 1];
+    if ( (day < 1) || (day > *maxDays) ){
+        return -1;
+    }
+    getJalaliDateFromDayNumber(computeDayNumberFromGregorianDate(year, month, day), jYear, jMonth, jDay);
+    return 0;
+}
+
+
+static Error convertJalaliDateToGregorianDate(int year, int month, int day, int *gYear, int *gMonth, int *gDay,
+        int *maxDays){
+    const int *starts;
+
+    if ( !isYearInRange(year) ){
+        *maxDays = -1;
+        return -1;
+    }
+    if ( (month < 1) || (month > 12) ){
+        *maxDays = 0;
+        return -1;
+    }
+    starts = loadYearStarts();
+    *maxDays = (month <= 6) ? 31 : (month < 12) ? 30 : (isJalaliLeapYearBy(starts, year) ? 30 : 29);
+    if ( (day < 1) || (day > *maxDays) ){
+        return -1;
+    }
+    getGregorianDateFromDayNumber(getDayNumberFromJalaliDateBy(starts, year, month, day), gYear, gMonth, gDay);
+    return 0;
+}
+
+
+/*
+The batch conversions shorter than this number of rows are not worth releasing and re-acquiring the GIL.
+*/
+#define GIL_RELEASE_THRESHOLD 256
+
+
+/*
+Converts the rows of the columns, the loop does not touch any python object, so it may run without the GIL.
+Returns the index of the first invalid row, or -1.
+*/
+static Py_ssize_t convertRows(DateConverter converter, Py_ssize_t count, const int *years, const int *months,
+        const int *days, int *outYears, int *outMonths, int *outDays, int *maxDays){
+    Py_ssize_t i;
+
+    for (i = 0; i < count; i++){
+        if (converter(years[i], months[i], days[i], &outYears[i], &outMonths[i], &outDays[i], maxDays) != 0){
+            return i;
+        }
+    }
+    return -1;
+}
+
+
+/*
+Converts the year, month and day columns into the given output columns, row by row. The GIL is released while
+converting the large columns, so the threads may convert the slices of a column in parallel. The buffers are
+locked by the exporters meanwhile, so they could not be resized. The invalid row, if any, is reported after the loop.
+*/
+static PyObject * convertDateColumns(const char *functionName, PyObject *const *args, Py_ssize_t nargs,
+        DateConverter converter){
+    Py_buffer views[6];
+    Py_ssize_t lengths[6], i, count, invalidRow = -1;
+    int acquired = 0, maxDays = 0;
+    int *years, *months, *days, *outYears, *outMonths, *outDays;
+
+    if ( checkArgumentsCount(functionName, nargs, 6) != 0 ){
+        return NULL;
+    }
+
+    for (acquired = 0; acquired < 6; acquired++){
+        if (getInt32Buffer(args[acquired], &views[acquired], acquired >= 3, &lengths[acquired]) != 0){
+            goto error;
+        }
+    }
+
+    count = lengths[0];
+    for (i = 1; i < 6; i++){
+        if (lengths[i] != count){
+            PyErr_SetString(PyExc_ValueError, "All the input and output buffers must have the same length");
+            goto error;
+        }
+    }
+
+    years = (int *)views[0].buf;
+    months = (int *)views[1].buf;
+    days = (int *)views[2].buf;
+    outYears = (int *)views[3].buf;
+    outMonths = (int *)views[4].buf;
+    outDays = (int *)views[5].buf;
+
+    if (count >= GIL_RELEASE_THRESHOLD){
+        Py_BEGIN_ALLOW_THREADS
+        invalidRow = convertRows(converter, count, years, months, days, outYears, outMonths, outDays, &maxDays);
+        Py_END_ALLOW_THREADS
+    }
+    else {
+        invalidRow = convertRows(converter, count, years, months, days, outYears, outMonths, outDays, &maxDays);
+    }
+
+    if ( (invalidRow >= 0) && (maxDays < 0) ){
+        PyErr_Format(PyExc_OverflowError, "Year must be between %d and %d, but it is: %d, at row: %zd",
+                     -MAX_ABSOLUTE_YEAR, MAX_ABSOLUTE_YEAR, years[invalidRow], invalidRow);
+        goto error;
+    }
+    if ( (invalidRow >= 0) && (maxDays == 0) ){
+        PyErr_Format(PyExc_ValueError, "Invalid month: %d, it must be between 1 and 12, at row: %zd",
+                     months[invalidRow], invalidRow);
+        goto error;
+    }
+    if (invalidRow >= 0){
+        PyErr_Format(PyExc_ValueError, "Invalid day: %d, it must be between 1 and %d, at row: %zd",
+                     days[invalidRow], maxDays, invalidRow);
+        goto error;
+    }
+
+    for (i = 0; i < 6; i++){
+        PyBuffer_Release(&views[i]);
+    }
+    return PyLong_FromSsize_t(count);
+
+error:
+    for (i = 0; i < acquired; i++){
+        PyBuffer_Release(&views[i]);
+    }
+    return NULL;
+}
+
+
+FASTCALL_FUNCTION(get_jalali_dates_from_gregorian_dates){
+    return convertDateColumns("get_jalali_dates_from_gregorian_dates", args, nargs, convertGregorianDateToJalaliDate);
+}
+
+
+FASTCALL_FUNCTION(get_gregorian_dates_from_jalali_dates){
+    return convertDateColumns("get_gregorian_dates_from_jalali_dates", args, nargs, convertJalaliDateToGregorianDate);
+}
+
+
+/* ################################## JalaliDateBase ########################################### */
+
+
+/*
+The native base type of the khayyam.JalaliDate, it holds the fields of a date packed into a few bytes, and implements
+the validation, comparison, hashing, arithmetic with timedelta and ordinals, the other methods are implemented by the
+python subclass.
+*/
+#if PY_MAJOR_VERSION >= 3
+  #define getTimedeltaDays PyDateTime_DELTA_GET_DAYS
+#else
+  #define getTimedeltaDays(o) (((PyDateTime_Delta *)(o))->days)
+  typedef long Py_hash_t;
+#endif
+
+
+/*
+The fields of an instance are writable, so a setter updates the field and the day number within a critical section,
+to be consistent on the free-threaded builds. The critical sections are no-op on the other builds, and are not
+available before python 3.13.
+*/
+#ifndef Py_BEGIN_CRITICAL_SECTION
+  #define Py_BEGIN_CRITICAL_SECTION(o) {
+  #define Py_END_CRITICAL_SECTION() }
+#endif
+
+
+#ifndef Py_RETURN_NOTIMPLEMENTED
+  #define Py_RETURN_NOTIMPLEMENTED return Py_INCREF(Py_NotImplemented), Py_NotImplemented
+#endif
+
+
+typedef struct {
+    PyObject_HEAD
+    int dayNumber;
+    short year;
+    unsigned char month;
+    unsigned char day;
+    unsigned char readOnly;
+} JalaliDateObject;
+
+
+static PyTypeObject JalaliDateBaseType;
+
+
+/*
+The readers of the fields, within the critical section of the instance, as the fields are changed together by the
+setters. They do not hold the critical section while calling back into python.
+*/
+static int getDayNumber(JalaliDateObject *self){
+    int dayNumber;
+
+    Py_BEGIN_CRITICAL_SECTION(self);
+    dayNumber = self->dayNumber;
+    Py_END_CRITICAL_SECTION();
+    return dayNumber;
+}
+
+
+static void getFields(JalaliDateObject *self, int *year, int *month, int *day, int *dayNumber){
+    Py_BEGIN_CRITICAL_SECTION(self);
+    *year = self->year;
+    *month = self->month;
+    *day = self->day;
+    *dayNumber = self->dayNumber;
+    Py_END_CRITICAL_SECTION();
+}
+
+
+#define JalaliDate_Check(o) PyObject_TypeCheck(o, &JalaliDateBaseType)
+
+
+/*
+Coerces the given object to an integer, the same as int(o). The values out of the C long range are clipped, so they
+are rejected by the range checks.
+*/
+static Error coerceToLong(PyObject *object, long *value){
+    PyObject *integer;
+    int overflow;
+
+    if ( (integer = PyNumber_Long(object)) == NULL ){
+        return -1;
+    }
+
+    *value = PyLong_AsLongAndOverflow(integer, &overflow);
+    Py_DECREF(integer);
+    if ( (*value == -1) && PyErr_Occurred() ){
+        return -1;
+    }
+
+    if ( overflow != 0 ){
+        *value = overflow > 0 ? LONG_MAX : LONG_MIN;
+    }
+    return 0;
+}
+
+
+/*
+The julian day of the constructor is a whole day number, or a half day more, i.e: the julian days returned by the
+get_julian_day_from_* functions. Both are the same day. The other fractions are refused, instead of choosing a day.
+*/
+static Error coerceJulianDay(PyObject *object, long *dayNumber){
+    double value, whole;
+
+    if ( PyIndex_Check(object) ){
+        return coerceToLong(object, dayNumber);
+    }
+
+    value = PyFloat_AsDouble(object);
+    if ( (value == -1.0) && PyErr_Occurred() ){
+        return -1;
+    }
+
+    whole = floor(value);
+    if ( (value - whole != 0.0) && (value - whole != 0.5) ){
+        PyErr_SetString(PyExc_ValueError, "The julian day must be a whole day number, or a half day more");
+        return -1;
+    }
+
+    if ( (whole < (double)LONG_MIN) || (whole > (double)LONG_MAX) ){
+        *dayNumber = whole > 0 ? LONG_MAX : LONG_MIN;
+    }
+    else{
+        *dayNumber = (long)whole;
+    }
+    return 0;
+}
+
+
+static Error validateJalaliDate(PyObject *yearObject, PyObject *monthObject, PyObject *dayObject,
+        int *year, int *month, int *day){
+    long y, m, d;
+    int daysInMonth;
+
+    /*
+    The missing arguments are the first year, month or day
+    */
+    y = m = d = 1;
+    if ( ((yearObject != NULL) && (coerceToLong(yearObject, &y) != 0)) ||
+         ((monthObject != NULL) && (coerceToLong(monthObject, &m) != 0)) ||
+         ((dayObject != NULL) && (coerceToLong(dayObject, &d) != 0)) ){
+        return -1;
+    }
+
+    if ( (y < MINYEAR) || (y > MAXYEAR) ){
+        PyErr_Format(PyExc_ValueError, "Year must be between %d and %d, but it is: %ld", MINYEAR, MAXYEAR, y);
+        return -1;
+    }
+
+    if ( (m < 1) || (m > 12) ){
+        PyErr_Format(PyExc_ValueError, "Month must be between 1 and 12, but it is: %ld", m);
+        return -1;
+    }
+
+    getDaysInJalaliMonth((int)y, (int)m, &daysInMonth);
+    if ( (d < 1) || (d > daysInMonth) ){
+        PyErr_Format(PyExc_ValueError, "Day must be between 1 and %d, but it is: %ld", daysInMonth, d);
+        return -1;
+    }
+
+    *year = (int)y;
+    *month = (int)m;
+    *day = (int)d;
+    return 0;
+}
+
+
+static PyObject * createJalaliDate(PyTypeObject *type, int year, int month, int day, int dayNumber){
+    JalaliDateObject *self = (JalaliDateObject *)type->tp_alloc(type, 0);
+
+    if ( self != NULL ){
+        self->dayNumber = dayNumber;
+        self->year = (short)year;
+        self->month = (unsigned char)month;
+        self->day = (unsigned char)day;
+    }
+    return (PyObject *)self;
+}
+
+
+static PyObject * createJalaliDateFromDayNumber(PyTypeObject *type, long long dayNumber){
+    int year, month, day;
+
+    if ( (dayNumber < INT_MIN) || (dayNumber > INT_MAX) ){
+        PyErr_SetString(PyExc_OverflowError, "date value out of range");
+        return NULL;
+    }
+
+    getJalaliDateFromDayNumber((int)dayNumber, &year, &month, &day);
+    if ( (year < MINYEAR) || (year > MAXYEAR) ){
+        PyErr_Format(PyExc_ValueError, "Year must be between %d and %d, but it is: %d", MINYEAR, MAXYEAR, year);
+        return NULL;
+    }
+    return createJalaliDate(type, year, month, day, (int)dayNumber);
+}
+
+
+/*
+JalaliDateBase(year=1, month=1, day=1, julian_day=None), the year may be also a JalaliDate or datetime.date instance.
+*/
+static PyObject * JalaliDateBase_new(PyTypeObject *type, PyObject *args, PyObject *kwargs){
+    static char *keywords[] = {"year", "month", "day", "julian_day", NULL};
+    PyObject *yearObject = NULL, *monthObject = NULL, *dayObject = NULL, *julianDayObject = Py_None;
+    int dayNumberOfOther;
+    int year = 1, month = 1, day = 1;
+    long dayNumber;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|OOOO:JalaliDate", keywords,
+            &yearObject, &monthObject, &dayObject, &julianDayObject)){
+        return NULL;
+    }
+
+    if ( (yearObject != NULL) && PyDate_Check(yearObject) ){
+        return createJalaliDateFromDayNumber(type, computeDayNumberFromGregorianDate(
+            PyDateTime_GET_YEAR(yearObject), PyDateTime_GET_MONTH(yearObject), PyDateTime_GET_DAY(yearObject)));
+    }
+
+    if ( julianDayObject != Py_None ){
+        if ( coerceJulianDay(julianDayObject, &dayNumber) != 0 ){
+            return NULL;
+        }
+        return createJalaliDateFromDayNumber(type, dayNumber);
+    }
+
+    if ( (yearObject != NULL) && JalaliDate_Check(yearObject) ){
+        getFields((JalaliDateObject *)yearObject, &year, &month, &day, &dayNumberOfOther);
+        return createJalaliDate(type, year, month, day, dayNumberOfOther);
+    }
+
+    if ( validateJalaliDate(yearObject, monthObject, dayObject, &year, &month, &day) != 0 ){
+        return NULL;
+    }
+
+    return createJalaliDate(type, year, month, day, getDayNumberFromJalaliDate(year, month, day));
+}
+
+
+/*
+The instance is created by the tp_new, but the arguments are accepted, so the subclasses which override the __init__
+could still call the base one, as they did with the former python JalaliDate.__init__.
+*/
+static int JalaliDateBase_init(PyObject *self, PyObject *args, PyObject *kwargs){
+    return 0;
+}
+
+
+FASTCALL_FUNCTION(JalaliDateBase_validate){
+    int year, month, day;
+
+    if ( checkArgumentsCount("_validate", nargs, 3) != 0 ){
+        return NULL;
+    }
+
+    if ( validateJalaliDate(args[0], args[1], args[2], &year, &month, &day) != 0 ){
+        return NULL;
+    }
+
+    return createPythonDateTuple(year, month, day);
+}
+
+
+/*
+The trusted constructors of the internal arithmetic, the class methods _from_fields(year, month, day) and
+_from_day_number(day_number). The values are valid by construction, so the coercion and the days in the month check
+are skipped, just the ranges which keep the table lookups in bounds are checked.
+*/
+FASTCALL_FUNCTION(JalaliDateBase_from_fields){
+    int values[3];
+
+    if ( parseIntArguments("_from_fields", args, nargs, 3, values) != 0 ){
+        return NULL;
+    }
+
+    if ( (values[0] < MINYEAR) || (values[0] > MAXYEAR) || (values[1] < 1) || (values[1] > 12) ||
+         (values[2] < 1) || (values[2] > 31) ){
+        PyErr_Format(PyExc_ValueError, "Invalid jalali date: %d-%d-%d", values[0], values[1], values[2]);
+        return NULL;
+    }
+
+    return createJalaliDate((PyTypeObject *)self, values[0], values[1], values[2],
+                            getDayNumberFromJalaliDate(values[0], values[1], values[2]));
+}
+
+
+FASTCALL_FUNCTION(JalaliDateBase_from_day_number){
+    int dayNumber;
+
+    if ( parseIntArguments("_from_day_number", args, nargs, 1, &dayNumber) != 0 ){
+        return NULL;
+    }
+
+    return createJalaliDateFromDayNumber((PyTypeObject *)self, dayNumber);
+}
+
+
+static PyObject * JalaliDateBase_get_year(JalaliDateObject *self, void *closure){
+    int year;
+
+    Py_BEGIN_CRITICAL_SECTION(self);
+    year = self->year;
+    Py_END_CRITICAL_SECTION();
+    return integerFromInt(year);
+}
+
+
+static PyObject * JalaliDateBase_get_month(JalaliDateObject *self, void *closure){
+    int month;
+
+    Py_BEGIN_CRITICAL_SECTION(self);
+    month = self->month;
+    Py_END_CRITICAL_SECTION();
+    return integerFromInt(month);
+}
+
+
+static PyObject * JalaliDateBase_get_day(JalaliDateObject *self, void *closure){
+    int day;
+
+    Py_BEGIN_CRITICAL_SECTION(self);
+    day = self->day;
+    Py_END_CRITICAL_SECTION();
+    return integerFromInt(day);
+}
+
+
+/*
+The fields are writable, each one is checked against its own range, and the day against the days in the month of the
+new year and month, so the setters never make an invalid date, such as 1394/12/30. Then the day number is updated.
+*/
+static int setField(JalaliDateObject *self, PyObject *value, const char *name, long minimum, long maximum,
+        long *result){
+    if ( value == NULL ){
+        PyErr_Format(PyExc_AttributeError, "can't delete the %s attribute", name);
+        return -1;
+    }
+
+    if ( coerceToLong(value, result) != 0 ){
+        return -1;
+    }
+
+    if ( (*result < minimum) || (*result > maximum) ){
+        PyErr_Format(PyExc_ValueError, "%c%s must be between %ld and %ld, but it is: %ld",
+                     name[0] - 'a' + 'A', name + 1, minimum, maximum, *result);
+        return -1;
+    }
+    return 0;
+}
+
+
+/*
+Replaces one of the year, month and day, by its index: 0, 1 or 2, the value is already in the range of the field.
+The read-only instances, i.e: the interned ones, refuse it.
+*/
+static int replaceField(JalaliDateObject *self, int index, int value){
+    int fields[3], daysInMonth;
+    Boolean readOnly;
+    Error result = 0;
+    const int *starts = loadYearStarts();
+
+    Py_BEGIN_CRITICAL_SECTION(self);
+    readOnly = self->readOnly;
+    fields[0] = self->year;
+    fields[1] = self->month;
+    fields[2] = self->day;
+    fields[index] = value;
+    daysInMonth = (fields[1] <= 6) ? 31 : (fields[1] < 12) ? 30 : (isJalaliLeapYearBy(starts, fields[0]) ? 30 : 29);
+    if ( readOnly || (fields[2] > daysInMonth) ){
+        result = -1;
+    }
+    else{
+        self->year = (short)fields[0];
+        self->month = (unsigned char)fields[1];
+        self->day = (unsigned char)fields[2];
+        self->dayNumber = getDayNumberFromJalaliDateBy(starts, fields[0], fields[1], fields[2]);
+    }
+    Py_END_CRITICAL_SECTION();
+
+    if ( readOnly ){
+        PyErr_SetString(PyExc_AttributeError, "The interned instances are read-only");
+    }
+    else if ( result != 0 ){
+        PyErr_Format(PyExc_ValueError, "Day must be between 1 and %d, but it is: %d", daysInMonth, fields[2]);
+    }
+    return result;
+}
+
+
+static int JalaliDateBase_set_year(JalaliDateObject *self, PyObject *value, void *closure){
+    long year;
+
+    if ( setField(self, value, "year", MINYEAR, MAXYEAR, &year) != 0 ){
+        return -1;
+    }
+    return replaceField(self, 0, (int)year);
+}
+
+
+static int JalaliDateBase_set_month(JalaliDateObject *self, PyObject *value, void *closure){
+    long month;
+
+    if ( setField(self, value, "month", 1, 12, &month) != 0 ){
+        return -1;
+    }
+    return replaceField(self, 1, (int)month);
+}
+
+
+static int JalaliDateBase_set_day(JalaliDateObject *self, PyObject *value, void *closure){
+    long day;
+
+    if ( setField(self, value, "day", 1, 31, &day) != 0 ){
+        return -1;
+    }
+    return replaceField(self, 2, (int)day);
+}
+
+
+/*
+Makes the setters refuse to change the instance from now on, it's used for the interned instances, which are shared.
+*/
+static PyObject * JalaliDateBase_make_read_only(JalaliDateObject *self, PyObject *unused){
+    Py_BEGIN_CRITICAL_SECTION(self);
+    self->readOnly = 1;
+    Py_END_CRITICAL_SECTION();
+    Py_INCREF(self);
+    return (PyObject *)self;
+}
+
+
+static PyObject * JalaliDateBase_tojulianday(JalaliDateObject *self, PyObject *unused){
+    return newLong(getDayNumber(self));
+}
+
+
+static PyObject * JalaliDateBase_toordinal(JalaliDateObject *self, PyObject *unused){
+    return newLong(getDayNumber(self) - JALALI_DAY_NUMBER_EPOCH);
+}
+
+
+static PyObject * JalaliDateBase_reduce(JalaliDateObject *self, PyObject *unused){
+    int year, month, day, dayNumber;
+
+    getFields(self, &year, &month, &day, &dayNumber);
+    return Py_BuildValue("(O(iii))", Py_TYPE(self), year, month, day);
+}
+
+
+static Py_hash_t JalaliDateBase_hash(JalaliDateObject *self){
+    /* The day number is always positive, so it's never -1 */
+    return (Py_hash_t)getDayNumber(self);
+}
+
+
+static PyObject * compareDayNumbers(int a, int b, int op){
+    switch (op){
+        case Py_LT: return PyBool_FromLong(a < b);
+        case Py_LE: return PyBool_FromLong(a <= b);
+        case Py_EQ: return PyBool_FromLong(a == b);
+        case Py_NE: return PyBool_FromLong(a != b);
+        case Py_GT: return PyBool_FromLong(a > b);
+        default: return PyBool_FromLong(a >= b);
+    }
+}
+
+
+static PyObject * JalaliDateBase_richcompare(PyObject *self, PyObject *other, int op){
+    int dayNumber, isTrue;
+
+    if ( JalaliDate_Check(other) ){
+        return compareDayNumbers(getDayNumber((JalaliDateObject *)self), getDayNumber((JalaliDateObject *)other), op);
+    }
+
+    if ( (op != Py_EQ) && (op != Py_NE) ){
+        PyErr_SetString(PyExc_TypeError, "Comparison just allow with JalaliDate");
+        return NULL;
+    }
+
+    /*
+    The datetime is not equal to the date, the same as the datetime.date
+    */
+    if ( PyDateTime_Check(other) ){
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+
+    if ( PyDate_Check(other) ){
+        dayNumber = computeDayNumberFromGregorianDate(
+            PyDateTime_GET_YEAR(other), PyDateTime_GET_MONTH(other), PyDateTime_GET_DAY(other));
+        return compareDayNumbers(getDayNumber((JalaliDateObject *)self), dayNumber, op);
+    }
+
+    if ( (isTrue = PyObject_IsTrue(other)) < 0 ){
+        return NULL;
+    }
+
+    if ( !isTrue ){
+        return PyBool_FromLong(op == Py_NE);
+    }
+
+    PyErr_SetString(PyExc_TypeError,
+                    "JalaliDate object only can be compared by timedelta or JalaliDate object.");
+    return NULL;
+}
+
+
+static PyObject * JalaliDateBase_add(PyObject *left, PyObject *right){
+    JalaliDateObject *self;
+
+    if ( !JalaliDate_Check(left) ){
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+    self = (JalaliDateObject *)left;
+
+    if ( PyDelta_Check(right) ){
+        return createJalaliDateFromDayNumber(Py_TYPE(self), (long long)getDayNumber(self) + getTimedeltaDays(right));
+    }
+
+    PyErr_SetString(PyExc_TypeError, "JalaliDate object can added by timedelta or JalaliDate object");
+    return NULL;
+}
+
+
+static PyObject * JalaliDateBase_subtract(PyObject *left, PyObject *right){
+    JalaliDateObject *self;
+
+    if ( !JalaliDate_Check(left) ){
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+    self = (JalaliDateObject *)left;
+
+    if ( PyDelta_Check(right) ){
+        return createJalaliDateFromDayNumber(Py_TYPE(self), (long long)getDayNumber(self) - getTimedeltaDays(right));
+    }
+
+    if ( JalaliDate_Check(right) ){
+        return PyDelta_FromDSU(getDayNumber(self) - getDayNumber((JalaliDateObject *)right), 0, 0);
+    }
+
+    PyErr_SetString(PyExc_TypeError, "JalaliDate object can added by timedelta or JalaliDate object");
+    return NULL;
+}
+
+
+static PyGetSetDef JalaliDateBase_getset[] = {
+    {"year", (getter)JalaliDateBase_get_year, (setter)JalaliDateBase_set_year, "The jalali year", NULL},
+    {"month", (getter)JalaliDateBase_get_month, (setter)JalaliDateBase_set_month, "The month, 1-12", NULL},
+    {"day", (getter)JalaliDateBase_get_day, (setter)JalaliDateBase_set_day, "The day of the month", NULL},
+    {NULL}
+};
+
+
+static PyMethodDef JalaliDateBase_methods[] = {
+    {
+        FASTCALL_NAMED_METHOD("_validate", JalaliDateBase_validate) | METH_STATIC,
+        "_validate(year, month, day)\n\n"
+        "Coerces the given values to integers, and validates them as a jalali date. Returns the (year, month, day)."
+    },
+    {
+        FASTCALL_NAMED_METHOD("_from_fields", JalaliDateBase_from_fields) | METH_CLASS,
+        "_from_fields(year, month, day)\n\n"
+        "Creates an instance from the valid fields, without the coercion and the validation."
+    },
+    {
+        FASTCALL_NAMED_METHOD("_from_day_number", JalaliDateBase_from_day_number) | METH_CLASS,
+        "_from_day_number(day_number)\n\n"
+        "Creates an instance from the day number, only the range of the year is checked."
+    },
+    {"_make_read_only", (PyCFunction)JalaliDateBase_make_read_only, METH_NOARGS,
+     "Makes the setters of the year, month and day refuse to change the instance, returns the instance."},
+    {"tojulianday", (PyCFunction)JalaliDateBase_tojulianday, METH_NOARGS,
+     "Returns the julian day representing the date, as an integer day number."},
+    {"toordinal", (PyCFunction)JalaliDateBase_toordinal, METH_NOARGS,
+     "Returns the proleptic Shamsi ordinal, where Farvardin 1 of the year 1 has ordinal 1."},
+    {"__reduce__", (PyCFunction)JalaliDateBase_reduce, METH_NOARGS, "Return state information for pickling."},
+    {NULL}
+};
+
+
+static PyNumberMethods JalaliDateBase_as_number = {
+    JalaliDateBase_add,         /* nb_add */
+    JalaliDateBase_subtract,    /* nb_subtract */
 };
 
 
+static PyTypeObject JalaliDateBaseType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "khayyam.algorithms_c.JalaliDateBase",      /* tp_name */
+    sizeof(JalaliDateObject),                   /* tp_basicsize */
+    0,                                          /* tp_itemsize */
+    0,                                          /* tp_dealloc */
+    0,                                          /* tp_print */
+    0,                                          /* tp_getattr */
+    0,                                          /* tp_setattr */
+    0,                                          /* tp_compare */
+    0,                                          /* tp_repr */
+    &JalaliDateBase_as_number,                  /* tp_as_number */
+    0,                                          /* tp_as_sequence */
+    0,                                          /* tp_as_mapping */
+    (hashfunc)JalaliDateBase_hash,              /* tp_hash */
+    0,                                          /* tp_call */
+    0,                                          /* tp_str */
+    0,                                          /* tp_getattro */
+    0,                                          /* tp_setattro */
+    0,                                          /* tp_as_buffer */
 #if PY_MAJOR_VERSION >= 3
-  #define MOD_ERROR_VAL NULL
-  #define MOD_SUCCESS_VAL(val) val
-  #define MOD_INIT(name) PyMODINIT_FUNC PyInit_##name(void)
-  #define MOD_DEF(ob, name, doc, methods) \
-          static struct PyModuleDef moduledef = { \
-            PyModuleDef_HEAD_INIT, name, doc, -1, methods, }; \
-          ob = PyModule_Create(&moduledef);
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,   /* tp_flags */
 #else
-  #define MOD_ERROR_VAL
-  #define MOD_SUCCESS_VAL(val)
-  #define MOD_INIT(name) PyMODINIT_FUNC init##name(void)
-  #define MOD_DEF(ob, name, doc, methods) \
-          ob = Py_InitModule3(name, methods, doc);
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_CHECKTYPES | Py_TPFLAGS_HAVE_RICHCOMPARE,
 #endif
+    "The fields, comparison and arithmetic of the khayyam.JalaliDate.",  /* tp_doc */
+    0,                                          /* tp_traverse */
+    0,                                          /* tp_clear */
+    JalaliDateBase_richcompare,                 /* tp_richcompare */
+    0,                                          /* tp_weaklistoffset */
+    0,                                          /* tp_iter */
+    0,                                          /* tp_iternext */
+    JalaliDateBase_methods,                     /* tp_methods */
+    0,                                          /* tp_members */
+    JalaliDateBase_getset,                      /* tp_getset */
+    0,                                          /* tp_base */
+    0,                                          /* tp_dict */
+    0,                                          /* tp_descr_get */
+    0,                                          /* tp_descr_set */
+    0,                                          /* tp_dictoffset */
+    JalaliDateBase_init,                        /* tp_init */
+    0,                                          /* tp_alloc */
+    JalaliDateBase_new,                         /* tp_new */
+};
 
 
-MOD_INIT(algorithms_c)
-{
-    PyObject *m;
+/* ################################## Formatting ############################################### */
+
+
+/*
+The native formatter of the khayyam.formatting directives. The numeric directives, either with ASCII or persian digits,
+the names of the months, weekdays and AM/PM, and the composite directives are written into a UTF-8 buffer, the other
+directives, i.e: the timezone ones, are not supported here, so the caller falls back to the python directives.
+*/
+#define FORMAT_DONE 0
+#define FORMAT_UNKNOWN_DIRECTIVE 1
+#define FORMAT_UNSUPPORTED_DIRECTIVE 2
+
+#define FORMAT_BUFFER_SIZE 256
+
+
+static const char *PERSIAN_MONTH_NAMES[] = {
+    "\xd9\x81\xd8\xb1\xd9\x88\xd8\xb1\xd8\xaf\xdb\x8c\xd9\x86",         /* Farvardin */
+    "\xd8\xa7\xd8\xb1\xd8\xaf\xdb\x8c\xd8\xa8\xd9\x87\xd8\xb4\xd8\xaa", /* Ordibehesht */
+    "\xd8\xae\xd8\xb1\xd8\xaf\xd8\xa7\xd8\xaf",                         /* Khordad */
+    "\xd8\xaa\xdb\x8c\xd8\xb1",                                         /* Tir */
+    "\xd9\x85\xd8\xb1\xd8\xaf\xd8\xa7\xd8\xaf",                         /* Mordad */
+    "\xd8\xb4\xd9\x87\xd8\xb1\xdb\x8c\xd9\x88\xd8\xb1",                 /* Shahrivar */
+    "\xd9\x85\xd9\x87\xd8\xb1",                                         /* Mehr */
+    "\xd8\xa2\xd8\xa8\xd8\xa7\xd9\x86",                                 /* Aban */
+    "\xd8\xa2\xd8\xb0\xd8\xb1",                                         /* Azar */
+    "\xd8\xaf\xdb\x8c",                                                 /* Dey */
+    "\xd8\xa8\xd9\x87\xd9\x85\xd9\x86",                                 /* Bahman */
+    "\xd8\xa7\xd8\xb3\xd9\x81\xd9\x86\xd8\xaf",                         /* Esfand */
+};
+
+
+static const char *PERSIAN_MONTH_ABBRS[] = {
+    "\xd9\x81\xd8\xb1", "\xd8\xa7\xd8\xb1", "\xd8\xae\xd8\xb1", "\xd8\xaa\xdb\x8c",
+    "\xd9\x85\xd8\xb1", "\xd8\xb4\xd9\x87", "\xd9\x85\xd9\x87", "\xd8\xa2\xd8\xa8",
+    "\xd8\xa2\xd8\xb0", "\xd8\xaf\xdb\x8c", "\xd8\xa8\xd9\x87", "\xd8\xa7\xd8\xb3",
+};
+
+
+static const char *PERSIAN_MONTH_NAMES_ASCII[] = {
+    "Farvardin", "Ordibehesht", "Khordad", "Tir", "Mordad", "Shahrivar",
+    "Mehr", "Aban", "Azar", "Dey", "Bahman", "Esfand",
+};
+
+
+static const char *PERSIAN_MONTH_ABBRS_ASCII[] = {
+    "F", "O", "Kh", "T", "Mo", "Sh", "M", "Ab", "Az", "D", "B", "E",
+};
+
+
+static const char *PERSIAN_WEEKDAY_NAMES[] = {
+    "\xd8\xb4\xd9\x86\xd8\xa8\xd9\x87",                                 /* Shanbeh */
+    "\xdb\x8c\xda\xa9\xd8\xb4\xd9\x86\xd8\xa8\xd9\x87",                 /* Yekshanbeh */
+    "\xd8\xaf\xd9\x88\xd8\xb4\xd9\x86\xd8\xa8\xd9\x87",                 /* Doshanbeh */
+    "\xd8\xb3\xd9\x87 \xd8\xb4\xd9\x86\xd8\xa8\xd9\x87",                /* Seshanbeh */
+    "\xda\x86\xd9\x87\xd8\xa7\xd8\xb1\xd8\xb4\xd9\x86\xd8\xa8\xd9\x87", /* Chaharshanbeh */
+    "\xd9\xbe\xd9\x86\xd8\xac\xd8\xb4\xd9\x86\xd8\xa8\xd9\x87",         /* Panjshanbeh */
+    "\xd8\xac\xd9\x85\xd8\xb9\xd9\x87",                                 /* Jomeh */
+};
+
+
+static const char *PERSIAN_WEEKDAY_ABBRS[] = {
+    "\xd8\xb4", "\xdb\x8c", "\xd8\xaf", "\xd8\xb3", "\xda\x86", "\xd9\xbe", "\xd8\xac",
+};
+
+
+static const char *PERSIAN_WEEKDAY_NAMES_ASCII[] = {
+    "Shanbeh", "Yekshanbeh", "Doshanbeh", "Seshanbeh", "Chaharshanbeh", "Panjshanbeh", "Jomeh",
+};
+
+
+static const char *PERSIAN_WEEKDAY_ABBRS_ASCII[] = {
+    "Sh", "Y", "D", "Se", "Ch", "P", "J",
+};
+
+
+static const char *ENGLISH_WEEKDAY_NAMES_ASCII[] = {
+    "Saturday", "Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+};
+
+
+static const char *AM_PM[] = {
+    "\xd9\x82.\xd8\xb8",    /* AM */
+    "\xd8\xa8.\xd8\xb8",    /* PM */
+};
+
+
+static const char *AM_PM_ASCII[] = {
+    "AM", "PM",
+};
+
+
+typedef struct {
+    JalaliDateFacts facts;
+    int hour, minute, second, microsecond;
+    Boolean hasTime;
+} FormatValues;
+
+
+/*
+A growable UTF-8 buffer, the short results are written into the inline storage without any allocation.
+*/
+typedef struct {
+    char *data;
+    Py_ssize_t length, size;
+    char storage[FORMAT_BUFFER_SIZE];
+} FormatBuffer;
+
+
+static void initializeFormatBuffer(FormatBuffer *buffer){
+    buffer->data = buffer->storage;
+    buffer->length = 0;
+    buffer->size = FORMAT_BUFFER_SIZE;
+}
+
+
+static void releaseFormatBuffer(FormatBuffer *buffer){
+    if ( buffer->data != buffer->storage ){
+        PyMem_Free(buffer->data);
+    }
+}
+
+
+static Error appendBytes(FormatBuffer *buffer, const char *bytes, Py_ssize_t length){
+    Py_ssize_t size;
+    char *data;
+
+    if ( buffer->length + length > buffer->size ){
+        size = buffer->size;
+        while ( buffer->length + length > size ){
+            size *= 2;
+        }
+
+        if ( buffer->data == buffer->storage ){
+            if ( (data = PyMem_Malloc(size)) != NULL ){
+                memcpy(data, buffer->storage, buffer->length);
+            }
+        }
+        else {
+            data = PyMem_Realloc(buffer->data, size);
+        }
+
+        if ( data == NULL ){
+            PyErr_NoMemory();
+            return -1;
+        }
+        buffer->data = data;
+        buffer->size = size;
+    }
+
+    memcpy(buffer->data + buffer->length, bytes, length);
+    buffer->length += length;
+    return 0;
+}
+
+
+static Error appendString(FormatBuffer *buffer, const char *string){
+    return appendBytes(buffer, string, (Py_ssize_t)strlen(string));
+}
+
+
+/*
+Writes a non-negative integer, zero padded to the given width, the same as '%.<width>d'. The persian digits are
+U+06F0 - U+06F9, two bytes each in UTF-8.
+*/
+static Error appendNumber(FormatBuffer *buffer, int value, int width, Boolean persian){
+    char digits[16], result[32];
+    int count = 0, length = 0;
+
+    do {
+        digits[count++] = (char)(value % 10);
+        value /= 10;
+    } while ( value > 0 );
+
+    while ( count < width ){
+        digits[count++] = 0;
+    }
+
+    while ( count-- > 0 ){
+        if ( persian ){
+            result[length++] = '\xdb';
+            result[length++] = (char)(0xb0 + digits[count]);
+        }
+        else {
+            result[length++] = (char)('0' + digits[count]);
+        }
+    }
+    return appendBytes(buffer, result, length);
+}
+
+
+/*
+The same as the khayyam.JalaliDate.weekofyear method.
+*/
+static int getWeekOfYear(const JalaliDateFacts *facts, int firstDayOfWeek){
+    int days = facts->dayOfYear - 1,
+        offset = mod(firstDayOfWeek - facts->weekday + days, 7);
+
+    if ( days < offset ){
+        return 0;
+    }
+    return (days - offset) / 7 + 1;
+}
+
+
+static int getHour12(int hour){
+    if ( hour > 12 ){
+        return hour - 12;
+    }
+    return hour == 0 ? 12 : hour;
+}
+
+
+static int formatString(FormatBuffer *buffer, const char *format, Py_ssize_t length, const FormatValues *values);
+
+
+#define formatComposite(buffer, format, values) formatString(buffer, format, (Py_ssize_t)strlen(format), values)
+
+
+static int formatDateDirective(FormatBuffer *buffer, char key, const FormatValues *values){
+    const JalaliDateFacts *facts = &values->facts;
+
+    switch ( key ){
+        /* Year */
+        case 'Y': return appendNumber(buffer, facts->year, 4, FALSE);
+        case 'y': return appendNumber(buffer, facts->year % 100, 2, FALSE);
+        case 'N': return appendNumber(buffer, facts->year, 0, TRUE);
+        case 'O': return appendNumber(buffer, facts->year, 4, TRUE);
+        case 'n': return appendNumber(buffer, facts->year % 100, 0, TRUE);
+        case 'u': return appendNumber(buffer, facts->year % 100, 2, TRUE);
+
+        /* Month */
+        case 'R': return appendNumber(buffer, facts->month, 0, TRUE);
+        case 'P': return appendNumber(buffer, facts->month, 2, TRUE);
+        case 'm': return appendNumber(buffer, facts->month, 2, FALSE);
+        case 'b': return appendString(buffer, PERSIAN_MONTH_ABBRS[facts->month - 1]);
+        case 'B': return appendString(buffer, PERSIAN_MONTH_NAMES[facts->month - 1]);
+        case 'g': return appendString(buffer, PERSIAN_MONTH_ABBRS_ASCII[facts->month - 1]);
+        case 'G': return appendString(buffer, PERSIAN_MONTH_NAMES_ASCII[facts->month - 1]);
+
+        /* Day */
+        case 'd': return appendNumber(buffer, facts->day, 2, FALSE);
+        case 'D': return appendNumber(buffer, facts->day, 0, TRUE);
+        case 'K': return appendNumber(buffer, facts->day, 2, TRUE);
+        case 'j': return appendNumber(buffer, facts->dayOfYear, 3, FALSE);
+        case 'J': return appendNumber(buffer, facts->dayOfYear, 0, TRUE);
+        case 'V': return appendNumber(buffer, facts->dayOfYear, 3, TRUE);
+
+        /* Week, the first day of week is SATURDAY for %W and MONDAY for %U */
+        case 'w': return appendNumber(buffer, facts->weekday, 0, FALSE);
+        case 'W': return appendNumber(buffer, getWeekOfYear(facts, 0), 2, FALSE);
+        case 'U': return appendNumber(buffer, getWeekOfYear(facts, 2), 2, FALSE);
+        case 'a': return appendString(buffer, PERSIAN_WEEKDAY_ABBRS[facts->weekday]);
+        case 'A': return appendString(buffer, PERSIAN_WEEKDAY_NAMES[facts->weekday]);
+        case 'e': return appendString(buffer, PERSIAN_WEEKDAY_ABBRS_ASCII[facts->weekday]);
+        case 'E': return appendString(buffer, PERSIAN_WEEKDAY_NAMES_ASCII[facts->weekday]);
+        case 'T': return appendString(buffer, ENGLISH_WEEKDAY_NAMES_ASCII[facts->weekday]);
+
+        /* Composite */
+        case 'x': return formatComposite(buffer, "%A %D %B %N", values);
+
+        case '%': return appendBytes(buffer, "%", 1);
+    }
+    return FORMAT_UNKNOWN_DIRECTIVE;
+}
+
+
+static int formatTimeDirective(FormatBuffer *buffer, char key, const FormatValues *values){
+    int hour12 = getHour12(values->hour);
+
+    switch ( key ){
+        /* Hour */
+        case 'H': return appendNumber(buffer, values->hour, 2, FALSE);
+        case 'k': return appendNumber(buffer, values->hour, 0, TRUE);
+        case 'h': return appendNumber(buffer, values->hour, 2, TRUE);
+        case 'I': return appendNumber(buffer, hour12, 2, FALSE);
+        case 'l': return appendNumber(buffer, hour12, 0, TRUE);
+        case 'i': return appendNumber(buffer, hour12, 2, TRUE);
+
+        /* Minute */
+        case 'M': return appendNumber(buffer, values->minute, 2, FALSE);
+        case 'v': return appendNumber(buffer, values->minute, 0, TRUE);
+        case 'r': return appendNumber(buffer, values->minute, 2, TRUE);
+
+        /* Second */
+        case 'S': return appendNumber(buffer, values->second, 2, FALSE);
+        case 'L': return appendNumber(buffer, values->second, 0, TRUE);
+        case 's': return appendNumber(buffer, values->second, 2, TRUE);
+
+        /* Microsecond */
+        case 'f': return appendNumber(buffer, values->microsecond, 6, FALSE);
+        case 'F': return appendNumber(buffer, values->microsecond, 6, TRUE);
+
+        /* AM-PM */
+        case 'p': return appendString(buffer, AM_PM[values->hour < 12 ? 0 : 1]);
+        case 't': return appendString(buffer, AM_PM_ASCII[values->hour < 12 ? 0 : 1]);
+
+        /* Timezone, the tzinfo is only available in python */
+        case 'z':
+        case 'Z':
+        case 'o':
+            return FORMAT_UNSUPPORTED_DIRECTIVE;
+
+        /* Composite */
+        case 'c': return formatComposite(buffer, "%a %D %b %n %k:%v", values);
+        case 'C': return formatComposite(buffer, "%A %D %B %N %i:%r:%s %p", values);
+        case 'q': return formatComposite(buffer, "%e %d %g %y %H:%M", values);
+        case 'Q': return formatComposite(buffer, "%E %d %G %Y %I:%M:%S %t", values);
+        case 'X': return formatComposite(buffer, "%i:%r:%s %p", values);
+    }
+    return FORMAT_UNKNOWN_DIRECTIVE;
+}
+
+
+#define isDirectiveKey(c) ( (((c) >= 'a') && ((c) <= 'z')) || (((c) >= 'A') && ((c) <= 'Z')) || ((c) == '%') )
+
+
+/*
+Scans the format string the same as the khayyam.JalaliDateFormatter.format, the unknown directives are kept as is.
+Returns FORMAT_DONE, FORMAT_UNSUPPORTED_DIRECTIVE or -1 on error.
+*/
+static int formatString(FormatBuffer *buffer, const char *format, Py_ssize_t length, const FormatValues *values){
+    Py_ssize_t i = 0, start = 0;
+    int status;
+
+    while ( i < length - 1 ){
+        if ( (format[i] != '%') || !isDirectiveKey(format[i + 1]) ){
+            i++;
+            continue;
+        }
+
+        if ( appendBytes(buffer, format + start, i - start) != 0 ){
+            return -1;
+        }
+
+        status = formatDateDirective(buffer, format[i + 1], values);
+        if ( (status == FORMAT_UNKNOWN_DIRECTIVE) && values->hasTime ){
+            status = formatTimeDirective(buffer, format[i + 1], values);
+        }
+
+        if ( status == FORMAT_UNKNOWN_DIRECTIVE ){
+            status = appendBytes(buffer, format + i, 2);
+        }
+
+        if ( status != FORMAT_DONE ){
+            return status;
+        }
+
+        i += 2;
+        start = i;
+    }
+    return appendBytes(buffer, format + start, length - start);
+}
+
+
+/*
+The common part of the format_jalali_date and format_jalali_datetime, the integer arguments are
+(year, month, day[, hour, minute, second, microsecond]). Returns None if the format string is not a unicode string,
+contains a directive which is not supported natively, or the values are not a valid date and time, i.e: the fields
+which are set out of the month, or by another leap rule. So the python directives format them, as they did before.
+It does not read the instances, the fields are given as integers.
+*/
+static PyObject * formatJalaliDate(const char *functionName, PyObject *const *args, Py_ssize_t nargs,
+        Py_ssize_t count){
+    int fields[7] = {0, 0, 0, 0, 0, 0, 0}, status;
+    const char *format;
+    Py_ssize_t length;
+    FormatValues values;
+    FormatBuffer buffer;
+    PyObject *result = NULL;
+#if PY_MAJOR_VERSION < 3
+    PyObject *encoded;
+#endif
+
+    if ( checkArgumentsCount(functionName, nargs, count + 1) != 0 ){
+        return NULL;
+    }
+
+    if ( parseIntArguments(functionName, args + 1, count, count, fields) != 0 ){
+        return NULL;
+    }
+
+    if ( !PyUnicode_Check(args[0]) ){
+        Py_RETURN_NONE;
+    }
+
+    /* An invalid day overflows into the next month, so it does not survive the round trip */
+    if ( (fields[0] >= MINYEAR) && (fields[0] <= MAXYEAR) && (fields[1] >= 1) && (fields[1] <= 12) ){
+        getJalaliDateFactsFromDayNumber(getDayNumberFromJalaliDate(fields[0], fields[1], fields[2]), &values.facts);
+    }
+
+    if ( (fields[0] < MINYEAR) || (fields[0] > MAXYEAR) || (fields[1] < 1) || (fields[1] > 12) ||
+            (values.facts.year != fields[0]) || (values.facts.month != fields[1]) || (values.facts.day != fields[2]) ||
+            (fields[3] < 0) || (fields[3] > 23) || (fields[4] < 0) || (fields[4] > 59) || (fields[5] < 0) ||
+            (fields[5] > 59) || (fields[6] < 0) || (fields[6] > 999999) ){
+        Py_RETURN_NONE;
+    }
+
+    values.hour = fields[3];
+    values.minute = fields[4];
+    values.second = fields[5];
+    values.microsecond = fields[6];
+    values.hasTime = count > 3;
+
+#if PY_MAJOR_VERSION >= 3
+    if ( (format = PyUnicode_AsUTF8AndSize(args[0], &length)) == NULL ){
+        return NULL;
+    }
+#else
+    if ( (encoded = PyUnicode_AsUTF8String(args[0])) == NULL ){
+        return NULL;
+    }
+    format = PyString_AS_STRING(encoded);
+    length = PyString_GET_SIZE(encoded);
+#endif
+
+    initializeFormatBuffer(&buffer);
+    status = formatString(&buffer, format, length, &values);
+    if ( status == FORMAT_DONE ){
+        result = PyUnicode_DecodeUTF8(buffer.data, buffer.length, NULL);
+    }
+    else if ( status == FORMAT_UNSUPPORTED_DIRECTIVE ){
+        result = Py_None;
+        Py_INCREF(result);
+    }
+    releaseFormatBuffer(&buffer);
+
+#if PY_MAJOR_VERSION < 3
+    Py_DECREF(encoded);
+#endif
+    return result;
+}
+
+
+FASTCALL_FUNCTION(format_jalali_date){
+    return formatJalaliDate("format_jalali_date", args, nargs, 3);
+}
+
+
+FASTCALL_FUNCTION(format_jalali_datetime){
+    return formatJalaliDate("format_jalali_datetime", args, nargs, 7);
+}
+
+
+static PyMethodDef moduleFunctions[] = {
+
+    {
+        FASTCALL_METHOD(get_julian_day_from_gregorian_date),
+        "Gets julian day from gregorian date."
+    },
+
+    {
+        FASTCALL_METHOD(is_jalali_leap_year),
+        "Determines the jalali year is leap or not."
+    },
+
+    {
+        FASTCALL_METHOD(get_days_in_jalali_year),
+        "Determines the number of days in jalali year."
+    },
+
+    {
+        FASTCALL_METHOD(get_days_in_jalali_month),
+        "Determines the number of days in jalali month."
+    },
+
+    {
+        FASTCALL_METHOD(get_julian_day_from_jalali_date),
+        "Gets julian day from jalali date."
+    },
+
+    {
+        FASTCALL_METHOD(get_jalali_date_from_julian_day),
+        "Gets jalali date from julian day."
+    },
+
+    {
+        FASTCALL_METHOD(get_gregorian_date_from_julian_day),
+        "Gets gregorian date from julian day."
+    },
+
+    {
+        FASTCALL_METHOD(get_jalali_date_from_gregorian_date),
+        "Gets jalali date from gregorian date."
+    },
+
+    {
+        FASTCALL_METHOD(get_day_number_from_gregorian_date),
+        "Gets the integer day number from gregorian date."
+    },
+
+    {
+        FASTCALL_METHOD(get_gregorian_date_from_day_number),
+        "Gets gregorian date from the integer day number."
+    },
+
+    {
+        FASTCALL_METHOD(get_day_number_from_jalali_date),
+        "Gets the integer day number from jalali date."
+    },
+
+    {
+        FASTCALL_METHOD(get_jalali_date_from_day_number),
+        "Gets jalali date from the integer day number."
+    },
 
-    MOD_DEF(m, "algorithms_c", "Khayyam algorithms C implementation.", moduleFunctions);
+    {
+        FASTCALL_METHOD(get_gregorian_date_from_jalali_date),
+        "Gets gregorian date from jalali date."
+    },
+
+    {
+        FASTCALL_METHOD(get_jalali_dates_from_gregorian_dates),
+        "get_jalali_dates_from_gregorian_dates(years, months, days, out_years, out_months, out_days)\n\n"
+        "Converts the int32 gregorian date columns into the caller-supplied jalali date buffers. "
+        "Returns the number of converted rows."
+    },
+
+    {
+        FASTCALL_METHOD(get_gregorian_dates_from_jalali_dates),
+        "get_gregorian_dates_from_jalali_dates(years, months, days, out_years, out_months, out_days)\n\n"
+        "Converts the int32 jalali date columns into the caller-supplied gregorian date buffers. "
+        "Returns the number of converted rows."
+    },
+
+    {
+        FASTCALL_METHOD(set_leap_years),
+        "set_leap_years(leap_years)\n\n"
+        "Selects the leap rule by the leap flags of the supported years, one bit per year, or None for the "
+        "arithmetic rule. Use the khayyam.algorithms.use_leap_rule instead."
+    },
+
+    {
+        FASTCALL_METHOD(format_jalali_date),
+        "format_jalali_date(format_string, year, month, day)\n\n"
+        "Formats the jalali date using the khayyam.JalaliDate directives. "
+        "Returns None if the format string needs the python directives."
+    },
+
+    {
+        FASTCALL_METHOD(format_jalali_datetime),
+        "format_jalali_datetime(format_string, year, month, day, hour, minute, second, microsecond)\n\n"
+        "Formats the jalali datetime using the khayyam.JalaliDatetime directives. "
+        "Returns None if the format string needs the python directives, i.e: the timezone ones."
+    },
+
+    {NULL, NULL, 0, NULL}        /* Sentinel */
+};
+
+
+/*
+The shared state of the module is safe to be used without the GIL: the name tables are constant, the cached integers
+are created once per process and are never changed, the JalaliDateBase type is static, the table of the leap rule is
+immutable and is swapped atomically by the set_leap_years, and the fields of the instances are read and written within
+their critical sections. So the module is initialized using the multi-phase initialization (PEP 489) on python 3.5
+and above, and is declared to not need the GIL on the free-threaded builds (PEP 703). On the older versions, the same
+function initializes the single-phase module.
+
+But this state is shared by the whole process, the cached integers and the type are not immortal objects and the
+PyDateTimeAPI is the capsule of the first interpreter, so the module must not be imported by the sub-interpreters
+which have their own GIL (PEP 684), they would race on the reference counts. It's declared so on python 3.12 and above.
+*/
+static int executeModule(PyObject *module){
+    if ( (cachedIntegers[0] == NULL) && (initializeCachedIntegers() != 0) ){
+        return -1;
+    }
+
+    PyDateTime_IMPORT;
+    if ( (PyDateTimeAPI == NULL) || (PyType_Ready(&JalaliDateBaseType) != 0) ){
+        return -1;
+    }
+
+    Py_INCREF(&JalaliDateBaseType);
+    if ( PyModule_AddObject(module, "JalaliDateBase", (PyObject *)&JalaliDateBaseType) != 0 ){
+        Py_DECREF(&JalaliDateBaseType);
+        return -1;
+    }
+    return 0;
+}
+
+
+#define MODULE_DOC "Khayyam algorithms C implementation."
+
+
+#if PY_VERSION_HEX >= 0x03050000
+
+static PyModuleDef_Slot moduleSlots[] = {
+    {Py_mod_exec, executeModule},
+#ifdef Py_mod_multiple_interpreters
+    {Py_mod_multiple_interpreters, Py_MOD_MULTIPLE_INTERPRETERS_NOT_SUPPORTED},
+#endif
+#ifdef Py_mod_gil
+    {Py_mod_gil, Py_MOD_GIL_NOT_USED},
+#endif
+    {0, NULL}
+};
+
+
+static struct PyModuleDef moduleDefinition = {
+    PyModuleDef_HEAD_INIT,
+    "algorithms_c",     /* m_name */
+    MODULE_DOC,         /* m_doc */
+    0,                  /* m_size */
+    moduleFunctions,    /* m_methods */
+    moduleSlots,        /* m_slots */
+    NULL,               /* m_traverse */
+    NULL,               /* m_clear */
+    NULL,               /* m_free */
+};
+
+
+PyMODINIT_FUNC PyInit_algorithms_c(void){
+    return PyModuleDef_Init(&moduleDefinition);
+}
 
-    if (m == NULL)
-        return MOD_ERROR_VAL;
+#elif PY_MAJOR_VERSION >= 3
 
-    return MOD_SUCCESS_VAL(m);
+static struct PyModuleDef moduleDefinition = {
+    PyModuleDef_HEAD_INIT, "algorithms_c", MODULE_DOC, -1, moduleFunctions,
+};
+
+
+PyMODINIT_FUNC PyInit_algorithms_c(void){
+    PyObject *module;
+
+    if ( (module = PyModule_Create(&moduleDefinition)) == NULL ){
+        return NULL;
+    }
+
+    if ( executeModule(module) != 0 ){
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
+
+#else
 
+PyMODINIT_FUNC initalgorithms_c(void){
+    PyObject *module;
+
+    if ( (module = Py_InitModule3("algorithms_c", moduleFunctions, MODULE_DOC)) != NULL ){
+        executeModule(module);
+    }
 }
+
+#endif
@@ -1,42 +1,127 @@
 # -*- coding: utf-8 -*-
-from math import floor, ceil
+import datetime
+import operator
+from array import array
+from bisect import bisect_right
+from khayyam.constants import MINYEAR, MAXYEAR
 
 __author__ = 'vahid'
 
 
-def get_julian_day_from_gregorian_date(year, month, day):
-    is_leap = False
-    if year / 4.0 == round(year / 4.0):
-        if year / 100.0 == round(year / 100.0):
-            if year / 400.0 == round(year / 400.0):
-                is_leap = True
-        else:
-            is_leap = True
+# All the algorithms are implemented using integer arithmetic over the day number, and the lookup tables below.
+# The integer day number of a date is the floor of its julian day, so it's exactly the value accepted by
+# `JalaliDate(julian_day=...)`, and there is no half day offset to carry around.
+JALALI_DAY_NUMBER_EPOCH = 1948319  # floor(1948320.5 - 1)
+JALALI_475_DAY_NUMBER = 2121445  # get_day_number_from_jalali_date(475, 1, 1)
+GREGORIAN_DAY_NUMBER_EPOCH = 1721119  # The day before 0000-03-01
+GREGORIAN_ORDINAL_EPOCH = 1721424  # The day before 0001-01-01, so it's the day number of the ordinal 0
+UNIX_EPOCH_DAY_NUMBER = 2440587  # 1970-01-01
+
+# Indexed by month, the index 0 is not used.
+DAYS_BEFORE_JALALI_MONTH = (0, 0, 31, 62, 93, 124, 155, 186, 216, 246, 276, 306, 336)
+DAYS_IN_JALALI_MONTH = (0, 31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 29)
+
+# Indexed by the zero based day of the year, to find the month without division.
+_JALALI_MONTH_OF_DAY = tuple(
+    month for month in range(1, 13) for _ in range(DAYS_IN_JALALI_MONTH[month] + (1 if month == 12 else 0))
+)
+
+# Indexed by the month counted from March, the gregorian year is also counted from March, so the leap day is the
+# last day of the year.
+_DAYS_BEFORE_MONTH_FROM_MARCH = (0, 31, 61, 92, 122, 153, 184, 214, 245, 275, 306, 337)
+
+# Indexed by month, the index 0 is not used.
+_DAYS_IN_GREGORIAN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
 
+def is_gregorian_leap_year(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _get_days_in_gregorian_month(year, month):
     if month == 2:
-        max_days = 29 if is_leap else 28
-        if day > max_days:
-            raise ValueError('Invalid day: %s, it must be <= %s' % (day, max_days))
+        return 29 if is_gregorian_leap_year(year) else 28
+    return _DAYS_IN_GREGORIAN_MONTH[month]
 
-    year = float(year)
-    month = float(month)
-    day = float(day)
 
-    # Determine JD
-    if month <= 2:
-        year -= 1
-        month += 12
+def get_days_before_jalali_month(month):
+    return DAYS_BEFORE_JALALI_MONTH[month]
+
+
+# The first day number of each year, from MINYEAR to MAXYEAR + 1, by the leap rule selected using the
+# `set_leap_years`. It's None for the arithmetic rule, which is computed.
+_year_starts = None
+
+
+def create_year_starts(leap_years=None):
+    """
+    :param leap_years: The leap flags of the supported years, one bit per year, see
+                       :py:data:`khayyam.leap_years.ASTRONOMICAL_LEAP_YEARS`. None means the arithmetic rule.
+    :return: The first day number of each year, from :py:data:`khayyam.MINYEAR` to :py:data:`khayyam.MAXYEAR` + 1.
+    :rtype: array.array
+    """
+    result = array('i', [JALALI_DAY_NUMBER_EPOCH + 1])
+    if leap_years is not None:
+        leap_years = bytearray(leap_years)
+    for index in range(MAXYEAR - MINYEAR + 1):
+        if leap_years is None:
+            leap = _is_arithmetic_leap_year(index + MINYEAR)
+        else:
+            leap = leap_years[index >> 3] >> (index & 7) & 1
+        result.append(result[-1] + (366 if leap else 365))
+    return result
+
+
+def set_leap_years(leap_years):
+    """
+    Selects the leap rule of this backend, use :py:func:`khayyam.algorithms.use_leap_rule` instead.
+
+    :param leap_years: The leap flags of the supported years, or None for the arithmetic rule.
+    """
+    global _year_starts, _month_lengths
+    _year_starts = None if leap_years is None else create_year_starts(leap_years)
+    _month_lengths = None
+
+
+# The number of days in the months of the supported years, by the selected leap rule, built on the first use.
+_month_lengths = None
+
+
+def get_month_lengths():
+    """
+    The cached table of the month lengths, the days in the month of a supported year is the item:
+    `(year - MINYEAR) * 12 + month - 1`.
+
+    :return: The number of days in the 12 months of each year, from :py:data:`khayyam.MINYEAR` to
+             :py:data:`khayyam.MAXYEAR`. It's shared, so it must not be modified.
+    :rtype: array.array
+    """
+    global _month_lengths
+    if _month_lengths is None:
+        year_starts = _year_starts or create_year_starts()
+        result = array('B', DAYS_IN_JALALI_MONTH[1:]) * (MAXYEAR - MINYEAR + 1)
+        for index in range(MAXYEAR - MINYEAR + 1):
+            if year_starts[index + 1] - year_starts[index] == 366:
+                result[index * 12 + 11] = 30
+        _month_lengths = result
+    return _month_lengths
+
 
-    century = floor(year / 100)
-    return floor(365.25 * (year + 4716)) + \
-        floor(30.6001 * (month + 1)) + \
-        day + \
-        (2 - century + floor(century / 4)) - \
-        1524.5
+def _get_year_index(day_number):
+    # A year has 365 or 366 days, so the bisect is narrowed to a few items
+    offset = day_number - _year_starts[0]
+    return bisect_right(_year_starts, day_number, offset // 366, min(offset // 365 + 1, len(_year_starts))) - 1
+
+
+def _is_arithmetic_leap_year(year):
+    # The 2820 years cycle, it's the fallback of the is_jalali_leap_year out of the table, or without a table.
+    return ((year - (474 if year > 0 else 473)) % 2820 + 512) * 682 % 2816 < 682
 
 
 def is_jalali_leap_year(year):
-    return ((((((year - [473, 474][year > 0]) % 2820) + 474) + 38) * 682) % 2816) < 682
+    if _year_starts is not None and MINYEAR <= year <= MAXYEAR:
+        return _year_starts[year - MINYEAR + 1] - _year_starts[year - MINYEAR] == 366
+    return _is_arithmetic_leap_year(year)
 
 
 def get_days_in_jalali_year(year):
@@ -44,77 +129,342 @@ def get_days_in_jalali_year(year):
 
 
 def get_days_in_jalali_month(year, month):
-    if 1 <= month <= 6:
-        return 31
-    elif 7 <= month < 12:
-        return 30
+    if month == 12:
+        # Esfand(اسفند)
+        return 30 if is_jalali_leap_year(year) else 29
 
-    assert month == 12, 'Month must be between 1 and 12'
+    assert 1 <= month <= 11, 'Month must be between 1 and 12'
+    return DAYS_IN_JALALI_MONTH[month]
 
-    # Esfand(اسفند)
-    if is_jalali_leap_year(year):
-        return 30
-    else:
-        return 29
 
+def get_day_number_from_jalali_date(year, month, day):
+    if _year_starts is not None and MINYEAR <= year <= MAXYEAR:
+        return _year_starts[year - MINYEAR] + DAYS_BEFORE_JALALI_MONTH[month] + day - 1
 
-def get_julian_day_from_jalali_date(year, month, day):
-    base = year - ([473, 474][year >= 0])
-    julian_year = 474 + (base % 2820)
-    return day + ([((month - 1) * 30) + 6, (month - 1) * 31][month <= 7]) + floor(
-        ((julian_year * 682) - 110) / 2816) + (julian_year - 1) * 365 + floor(base / 2820) * 1029983 + (1948320.5 - 1)
+    base = year - (474 if year >= 0 else 473)
+    julian_year = base % 2820 + 474
+    return day + \
+        DAYS_BEFORE_JALALI_MONTH[month] + \
+        (julian_year * 682 - 110) // 2816 + \
+        (julian_year - 1) * 365 + \
+        base // 2820 * 1029983 + \
+        JALALI_DAY_NUMBER_EPOCH
 
 
-def get_jalali_date_from_julian_day(julian_day):
-    julian_day = floor(julian_day) + 0.5
-    offset = julian_day - 2121445.5  # julian_day_from_jalali(475, 1, 1) replaced by its static value
-    cycle = floor(offset / 1029983)
-    remaining = offset % 1029983
+def get_jalali_date_from_day_number(day_number):
+    if _year_starts is not None and _year_starts[0] <= day_number < _year_starts[-1]:
+        index = _get_year_index(day_number)
+        day_of_year = day_number - _year_starts[index]
+        month = _JALALI_MONTH_OF_DAY[day_of_year]
+        return index + MINYEAR, month, day_of_year - DAYS_BEFORE_JALALI_MONTH[month] + 1
+
+    offset = day_number - JALALI_475_DAY_NUMBER
+    cycle = offset // 1029983
+    remaining = offset - cycle * 1029983
     if remaining == 1029982:
         year_cycle = 2820
     else:
-        a1 = floor(remaining / 366)
-        a2 = remaining % 366
-        year_cycle = floor(((2134 * a1) + (2816 * a2) + 2815) / 1028522) + a1 + 1
-    y = year_cycle + (2820 * cycle) + 474
-    if y <= 0:
-        y -= 1
-    days_in_years = (julian_day - get_julian_day_from_jalali_date(y, 1, 1)) + 1
-    m = ceil([(days_in_years - 6) / 30, days_in_years / 31][days_in_years <= 186])
-    day = (julian_day - get_julian_day_from_jalali_date(y, m, 1)) + 1
-    return y, m, day
-
-
-def get_gregorian_date_from_julian_day(jd):
-    y = 0
-    m = 0
-
-    if jd <= 0.0:
-        raise ValueError('Invalid Date')
+        a1 = remaining // 366
+        year_cycle = (2134 * a1 + 2816 * (remaining - a1 * 366) + 2815) // 1028522 + a1 + 1
+    year = year_cycle + 2820 * cycle + 474
+    if year <= 0:
+        year -= 1
+
+    # The first day of the year, inlined get_day_number_from_jalali_date(year, 1, 1)
+    base = year - (474 if year >= 0 else 473)
+    julian_year = base % 2820 + 474
+    day_of_year = day_number - \
+        (julian_year * 682 - 110) // 2816 - \
+        (julian_year - 1) * 365 - \
+        base // 2820 * 1029983 - \
+        JALALI_DAY_NUMBER_EPOCH - 1
 
-    jdm = jd + 0.5
-    z = floor(jdm)
-    f = jdm - z
+    month = _JALALI_MONTH_OF_DAY[day_of_year]
+    return year, month, day_of_year - DAYS_BEFORE_JALALI_MONTH[month] + 1
 
-    alpha = floor((z - 1867216.25) / 36524.25)
-    b = (z + 1 + alpha - floor(alpha / 4)) + 1524
-    c = floor((b - 122.1) / 365.25)
-    d = floor(365.25 * c)
-    e = floor((b - d) / 30.6001)
-    day = b - d - floor(30.6001 * e) + f
 
-    if e < 14:
-        m = e - 1
-    elif e == 14 or e == 15:
-        m = e - 13
+def get_day_number_from_gregorian_date(year, month, day):
+    if month == 2 and day > 28:
+        max_days = 29 if is_gregorian_leap_year(year) else 28
+        if day > max_days:
+            raise ValueError('Invalid day: %s, it must be <= %s' % (day, max_days))
 
-    if m > 2:
-        y = c - 4716
-    elif m == 1 or m == 2:
-        y = c - 4715
+    if month <= 2:
+        year -= 1
+        month += 9
+    else:
+        month -= 3
 
-    return int(y), int(m), int(day)
+    era = year // 400
+    year_of_era = year - era * 400
+    return era * 146097 + \
+        year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + \
+        _DAYS_BEFORE_MONTH_FROM_MARCH[month] + day - 1 + \
+        GREGORIAN_DAY_NUMBER_EPOCH
+
+
+def get_gregorian_date_from_day_number(day_number):
+    day_number -= GREGORIAN_DAY_NUMBER_EPOCH
+    era = day_number // 146097
+    day_of_era = day_number - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_from_march = (5 * day_of_year + 2) // 153
+    day = day_of_year - _DAYS_BEFORE_MONTH_FROM_MARCH[month_from_march] + 1
+    if month_from_march < 10:
+        return year_of_era + era * 400, month_from_march + 3, day
+    return year_of_era + era * 400 + 1, month_from_march - 9, day
 
 
 def get_jalali_date_from_gregorian_date(year, month, day):
-    return get_jalali_date_from_julian_day(get_julian_day_from_gregorian_date(year, month, day))
+    return get_jalali_date_from_day_number(get_day_number_from_gregorian_date(year, month, day))
+
+
+def get_gregorian_date_from_jalali_date(year, month, day):
+    return get_gregorian_date_from_day_number(get_day_number_from_jalali_date(year, month, day))
+
+
+# The julian day based API, the julian day of a date is its day number plus a half day.
+
+def get_julian_day_from_gregorian_date(year, month, day):
+    return get_day_number_from_gregorian_date(year, month, day) + .5
+
+
+def get_julian_day_from_jalali_date(year, month, day):
+    return get_day_number_from_jalali_date(year, month, day) + .5
+
+
+def get_jalali_date_from_julian_day(julian_day):
+    return get_jalali_date_from_day_number(int(julian_day // 1))
+
+
+def get_gregorian_date_from_julian_day(julian_day):
+    if julian_day <= 0:
+        raise ValueError('Invalid Date')
+    return get_gregorian_date_from_day_number(int((julian_day - .5) // 1))
+
+
+def _as_int32_column(buffer_):
+    column = memoryview(buffer_)
+    format_ = column.format.lstrip('@=<>!')
+    if format_ in ('B', 'b', 'c'):
+        return column.cast('B').cast('i')
+    if format_ in ('i', 'I', 'l', 'L') and column.itemsize == 4:
+        return column
+    raise TypeError("A buffer of int32 items is required, but the format is: '%s'" % column.format)
+
+
+def _convert_date_columns(converter, get_days_in_month, years, months, days, out_years, out_months, out_days):
+    # The rows are checked the same as the C extension does, before converting them.
+    columns = [_as_int32_column(c) for c in (years, months, days, out_years, out_months, out_days)]
+    count = len(columns[0])
+    if any(len(c) != count for c in columns):
+        raise ValueError('All the input and output buffers must have the same length')
+
+    years, months, days, out_years, out_months, out_days = columns
+    for i in range(count):
+        year, month, day = years[i], months[i], days[i]
+        if month < 1 or month > 12:
+            raise ValueError('Invalid month: %s, it must be between 1 and 12, at row: %s' % (month, i))
+        max_days = get_days_in_month(year, month)
+        if day < 1 or day > max_days:
+            raise ValueError('Invalid day: %s, it must be between 1 and %s, at row: %s' % (day, max_days, i))
+        out_years[i], out_months[i], out_days[i] = converter(year, month, day)
+    return count
+
+
+def get_jalali_dates_from_gregorian_dates(years, months, days, out_years, out_months, out_days):
+    return _convert_date_columns(
+        get_jalali_date_from_gregorian_date, _get_days_in_gregorian_month,
+        years, months, days, out_years, out_months, out_days
+    )
+
+
+def get_gregorian_dates_from_jalali_dates(years, months, days, out_years, out_months, out_days):
+    return _convert_date_columns(
+        get_gregorian_date_from_jalali_date, get_days_in_jalali_month,
+        years, months, days, out_years, out_months, out_days
+    )
+
+
+def _get_day_number_from_julian_day(julian_day):
+    # The julian day of the constructor is a whole day number, or a half day more, i.e: the julian days returned by
+    # the get_julian_day_from_* functions. Both are the same day. The other fractions are refused.
+    try:
+        return operator.index(julian_day)
+    except TypeError:
+        pass
+
+    day_number = int(julian_day // 1)
+    if julian_day - day_number not in (0, .5):
+        raise ValueError('The julian day must be a whole day number, or a half day more')
+    return day_number
+
+
+class JalaliDateBase(object):
+    """
+    The fields, comparison and arithmetic of the :py:class:`khayyam.JalaliDate`, it's used when the C extension is
+    not available, the same as the `khayyam.algorithms_c.JalaliDateBase`.
+    """
+
+    __slots__ = ('_year', '_month', '_day', '_day_number', '_read_only')
+
+    def __new__(cls, year=1, month=1, day=1, julian_day=None):
+        if isinstance(year, datetime.date):
+            return cls._create_from_day_number(year.toordinal() + GREGORIAN_ORDINAL_EPOCH)
+
+        if julian_day is not None:
+            return cls._create_from_day_number(_get_day_number_from_julian_day(julian_day))
+
+        if isinstance(year, JalaliDateBase):
+            return cls._create(year._year, year._month, year._day, year._day_number)
+
+        year, month, day = cls._validate(year, month, day)
+        return cls._create(year, month, day, get_day_number_from_jalali_date(year, month, day))
+
+    def __init__(self, *args, **kwargs):
+        # The instance is created by the __new__, the arguments are accepted for the subclasses calling this one.
+        pass
+
+    @classmethod
+    def _create(cls, year, month, day, day_number):
+        self = object.__new__(cls)
+        self._year = year
+        self._month = month
+        self._day = day
+        self._day_number = day_number
+        return self
+
+    @classmethod
+    def _create_from_day_number(cls, day_number):
+        year, month, day = get_jalali_date_from_day_number(day_number)
+        if year < MINYEAR or year > MAXYEAR:
+            raise ValueError('Year must be between %s and %s, but it is: %s' % (MINYEAR, MAXYEAR, year))
+        return cls._create(year, month, day, day_number)
+
+    @classmethod
+    def _from_fields(cls, year, month, day):
+        # The trusted constructors of the internal arithmetic, the values are valid by construction.
+        return cls._create(year, month, day, get_day_number_from_jalali_date(year, month, day))
+
+    @classmethod
+    def _from_day_number(cls, day_number):
+        return cls._create_from_day_number(day_number)
+
+    @staticmethod
+    def _validate(year, month, day):
+        year = year if isinstance(year, int) else int(year)
+        month = month if isinstance(month, int) else int(month)
+        day = day if isinstance(day, int) else int(day)
+
+        if year < MINYEAR or year > MAXYEAR:
+            raise ValueError('Year must be between %s and %s, but it is: %s' % (MINYEAR, MAXYEAR, year))
+        if month < 1 or month > 12:
+            raise ValueError('Month must be between 1 and 12, but it is: %s' % month)
+        _days_in_month = (_month_lengths or get_month_lengths())[(year - MINYEAR) * 12 + month - 1]
+        if day < 1 or day > _days_in_month:
+            raise ValueError('Day must be between 1 and %s, but it is: %s' % (_days_in_month, day))
+        return year, month, day
+
+    def _set_field(self, name, value, minimum, maximum):
+        # The fields are writable, each one is checked against its own range, and the day against the days in the
+        # month of the new year and month, so an invalid date is never made. Then the day number is updated.
+        value = value if isinstance(value, int) else int(value)
+        if value < minimum or value > maximum:
+            raise ValueError('%s must be between %s and %s, but it is: %s' % (name.title(), minimum, maximum, value))
+        if getattr(self, '_read_only', False):
+            raise AttributeError('The interned instances are read-only')
+        fields = dict(year=self._year, month=self._month, day=self._day)
+        fields[name] = value
+        self._year, self._month, self._day = self._validate(fields['year'], fields['month'], fields['day'])
+        self._day_number = get_day_number_from_jalali_date(self._year, self._month, self._day)
+
+    def _make_read_only(self):
+        # The setters refuse to change the interned instances, which are shared.
+        self._read_only = True
+        return self
+
+    @property
+    def year(self):
+        return self._year
+
+    @year.setter
+    def year(self, value):
+        self._set_field('year', value, MINYEAR, MAXYEAR)
+
+    @property
+    def month(self):
+        return self._month
+
+    @month.setter
+    def month(self, value):
+        self._set_field('month', value, 1, 12)
+
+    @property
+    def day(self):
+        return self._day
+
+    @day.setter
+    def day(self, value):
+        self._set_field('day', value, 1, 31)
+
+    def tojulianday(self):
+        return self._day_number
+
+    def toordinal(self):
+        return self._day_number - JALALI_DAY_NUMBER_EPOCH
+
+    def __reduce__(self):
+        return type(self), (self._year, self._month, self._day)
+
+    def __hash__(self):
+        return self._day_number
+
+    def __add__(self, x):
+        if isinstance(x, datetime.timedelta):
+            return self._create_from_day_number(self._day_number + x.days)
+
+        raise TypeError('JalaliDate object can added by timedelta or JalaliDate object')
+
+    def __sub__(self, x):
+        if isinstance(x, datetime.timedelta):
+            return self._create_from_day_number(self._day_number - x.days)
+        elif isinstance(x, JalaliDateBase):
+            return datetime.timedelta(days=self._day_number - x._day_number)
+
+        raise TypeError('JalaliDate object can added by timedelta or JalaliDate object')
+
+    def __eq__(self, x):
+        if isinstance(x, JalaliDateBase):
+            return self._day_number == x._day_number
+        elif isinstance(x, datetime.datetime):
+            # The datetime is not equal to the date, the same as the datetime.date
+            return NotImplemented
+        elif isinstance(x, datetime.date):
+            return self._day_number == x.toordinal() + GREGORIAN_ORDINAL_EPOCH
+        elif not x:
+            return False
+
+        raise TypeError('JalaliDate object only can be compared by timedelta or JalaliDate object.')
+
+    def __ne__(self, x):
+        result = self.__eq__(x)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, x):
+        return self._day_number < self._ensure_jalali_date(x)._day_number
+
+    def __le__(self, x):
+        return self._day_number <= self._ensure_jalali_date(x)._day_number
+
+    def __gt__(self, x):
+        return self._day_number > self._ensure_jalali_date(x)._day_number
+
+    def __ge__(self, x):
+        return self._day_number >= self._ensure_jalali_date(x)._day_number
+
+    @staticmethod
+    def _ensure_jalali_date(x):
+        if not isinstance(x, JalaliDateBase):
+            raise TypeError('Comparison just allow with JalaliDate')
+        return x
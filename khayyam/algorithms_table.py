@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_right
+from khayyam.constants import MINYEAR, MAXYEAR
+from .algorithms_pure import \
+    get_julian_day_from_gregorian_date, \
+    get_gregorian_date_from_julian_day, \
+    get_day_number_from_gregorian_date, \
+    get_gregorian_date_from_day_number, \
+    DAYS_BEFORE_JALALI_MONTH, \
+    DAYS_IN_JALALI_MONTH, \
+    _JALALI_MONTH_OF_DAY, \
+    is_jalali_leap_year as _is_jalali_leap_year, \
+    get_day_number_from_jalali_date as _get_day_number_from_jalali_date, \
+    get_jalali_date_from_day_number as _get_jalali_date_from_day_number, \
+    create_year_starts, \
+    _get_days_in_gregorian_month, \
+    _convert_date_columns
+
+__author__ = 'vahid'
+
+
+# The first day number of each jalali year in the supported range is precomputed into an int32 array (about 13 KB),
+# so converting a day number to a jalali date is a bisect plus two subtractions, instead of the 2820 years cycle
+# arithmetic. Days outside of the table are delegated to the arithmetic functions of the `algorithms_pure`.
+# The table is built by the selected leap rule, both rules agree on the first and the last days of the table.
+#: The first day number of each year, from MINYEAR to MAXYEAR + 1
+YEAR_STARTS = create_year_starts()
+
+_FIRST_DAY_NUMBER = YEAR_STARTS[0]
+_LAST_DAY_NUMBER = YEAR_STARTS[-1] - 1
+_TABLE_SIZE = len(YEAR_STARTS)
+
+
+def set_leap_years(leap_years):
+    """
+    Rebuilds the :py:data:`YEAR_STARTS` in place, use :py:func:`khayyam.algorithms.use_leap_rule` instead.
+
+    :param leap_years: The leap flags of the supported years, or None for the arithmetic rule.
+    """
+    YEAR_STARTS[:] = create_year_starts(leap_years)
+
+
+def is_jalali_leap_year(year):
+    if MINYEAR <= year <= MAXYEAR:
+        index = year - MINYEAR
+        return YEAR_STARTS[index + 1] - YEAR_STARTS[index] == 366
+    return _is_jalali_leap_year(year)
+
+
+def get_days_in_jalali_year(year):
+    return 366 if is_jalali_leap_year(year) else 365
+
+
+def get_days_in_jalali_month(year, month):
+    if month == 12:
+        # Esfand(اسفند)
+        return 30 if is_jalali_leap_year(year) else 29
+
+    assert 1 <= month <= 11, 'Month must be between 1 and 12'
+    return DAYS_IN_JALALI_MONTH[month]
+
+
+def get_day_number_from_jalali_date(year, month, day):
+    if MINYEAR <= year <= MAXYEAR:
+        return YEAR_STARTS[year - MINYEAR] + DAYS_BEFORE_JALALI_MONTH[month] + day - 1
+    return _get_day_number_from_jalali_date(year, month, day)
+
+
+def get_jalali_date_from_day_number(day_number):
+    if not _FIRST_DAY_NUMBER <= day_number <= _LAST_DAY_NUMBER:
+        return _get_jalali_date_from_day_number(day_number)
+
+    # A year has 365 or 366 days, so the bisect is narrowed to a few items
+    offset = day_number - _FIRST_DAY_NUMBER
+    index = bisect_right(YEAR_STARTS, day_number, offset // 366, min(offset // 365 + 1, _TABLE_SIZE)) - 1
+    day_of_year = day_number - YEAR_STARTS[index]
+    month = _JALALI_MONTH_OF_DAY[day_of_year]
+    return index + MINYEAR, month, day_of_year - DAYS_BEFORE_JALALI_MONTH[month] + 1
+
+
+def get_julian_day_from_jalali_date(year, month, day):
+    return get_day_number_from_jalali_date(year, month, day) + .5
+
+
+def get_jalali_date_from_julian_day(julian_day):
+    return get_jalali_date_from_day_number(int(julian_day // 1))
+
+
+def get_jalali_date_from_gregorian_date(year, month, day):
+    return get_jalali_date_from_day_number(get_day_number_from_gregorian_date(year, month, day))
+
+
+def get_gregorian_date_from_jalali_date(year, month, day):
+    return get_gregorian_date_from_day_number(get_day_number_from_jalali_date(year, month, day))
+
+
+def get_jalali_dates_from_gregorian_dates(years, months, days, out_years, out_months, out_days):
+    return _convert_date_columns(
+        get_jalali_date_from_gregorian_date, _get_days_in_gregorian_month,
+        years, months, days, out_years, out_months, out_days
+    )
+
+
+def get_gregorian_dates_from_jalali_dates(years, months, days, out_years, out_months, out_days):
+    return _convert_date_columns(
+        get_gregorian_date_from_jalali_date, get_days_in_jalali_month,
+        years, months, days, out_years, out_months, out_days
+    )
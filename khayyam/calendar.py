@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+The month calendars of the :doc:`/persiancalendar`, along the lines of the standard :py:mod:`calendar` module, but the
+weeks start on Saturday by default::
+
+    >>> from khayyam import calendar
+    >>> calendar.monthrange(1395, 12)
+    (1, 30)
+    >>> for week in calendar.monthcalendar(1395, 12):
+    ...     print(week)
+    (0, 1, 2, 3, 4, 5, 6)
+    (7, 8, 9, 10, 11, 12, 13)
+    (14, 15, 16, 17, 18, 19, 20)
+    (21, 22, 23, 24, 25, 26, 27)
+    (28, 29, 30, 0, 0, 0, 0)
+
+The grids are computed from the weekday of the first day and the length of the month, and the recently used ones are
+kept by a least recently used cache, so rendering the same months over and over costs a cache lookup.
+"""
+from itertools import chain
+from khayyam import algorithms
+from khayyam.compat import xrange
+from khayyam.constants import SATURDAY, FRIDAY
+from khayyam.helpers import lru_cache
+from khayyam.jalali_date import JalaliDate, _iterate_dates
+
+__author__ = 'vahid'
+
+
+#: The maximum number of the cached month grids.
+GRID_CACHE_SIZE = 512
+
+
+def _create_month_grid(year, month, firstweekday, leap_rule):
+    # The leap rule is a part of the cache key, as the weekday of the first day and the length of Esfand depend on it.
+    year, month, _ = JalaliDate._validate(year, month, 1)
+    if not SATURDAY <= firstweekday <= FRIDAY:
+        raise ValueError(
+            'The first weekday must be between %s and %s, but it is: %s' % (SATURDAY, FRIDAY, firstweekday))
+
+    day_number = algorithms.get_day_number_from_jalali_date(year, month, 1)
+    days = algorithms.get_days_in_jalali_month(year, month)
+    offset = (day_number + 3 - firstweekday) % 7
+    weeks = tuple(
+        tuple(day if 1 <= day <= days else 0 for day in xrange(week - offset + 1, week - offset + 8))
+        for week in xrange(0, offset + days, 7)
+    )
+    return day_number - offset, weeks
+
+
+_month_grids = lru_cache(GRID_CACHE_SIZE)(_create_month_grid)
+
+
+def _get_month_grid(year, month, firstweekday):
+    return _month_grids(year, month, firstweekday, algorithms.leap_rule)
+
+
+def _get_day_number_range(first_day_number, count):
+    # The start and the stop day numbers, the days of the adjacent months out of the supported range are skipped.
+    return \
+        max(first_day_number, JalaliDate.min.tojulianday()), \
+        min(first_day_number + count, JalaliDate.max.tojulianday() + 1)
+
+
+def iterweekdays(firstweekday=SATURDAY):
+    """
+    :param firstweekday: The first day of the week, :py:data:`khayyam.SATURDAY` ... :py:data:`khayyam.FRIDAY`.
+    :return: An iterator of the 7 weekdays, starting from the `firstweekday`.
+    """
+    return ((firstweekday + i) % 7 for i in xrange(7))
+
+
+def monthrange(year, month):
+    """
+    :return: The weekday of the first day of the month, and the number of days in the month.
+    :rtype: tuple
+    :raises ValueError: If the year or month is not valid.
+    """
+    year, month, _ = JalaliDate._validate(year, month, 1)
+    return \
+        (algorithms.get_day_number_from_jalali_date(year, month, 1) + 3) % 7, \
+        algorithms.get_days_in_jalali_month(year, month)
+
+
+def monthcalendar(year, month, firstweekday=SATURDAY):
+    """
+    The grid of the month, the days outside of the month are zeros.
+
+    The result is shared by the cache, so it's made of tuples.
+
+    :param year: The jalali year.
+    :param month: 1-12
+    :param firstweekday: The first day of the week, :py:data:`khayyam.SATURDAY` ... :py:data:`khayyam.FRIDAY`.
+    :return: The weeks of the month, each one is a tuple of 7 days of the month.
+    :rtype: tuple
+    :raises ValueError: If the year, month or first weekday is not valid.
+    """
+    return _get_month_grid(year, month, firstweekday)[1]
+
+
+def itermonthdays(year, month, firstweekday=SATURDAY):
+    """
+    The same as the :py:func:`monthcalendar`, flattened.
+
+    :return: An iterator of the days of the month in the complete weeks, the days outside of the month are zeros.
+    """
+    return chain.from_iterable(monthcalendar(year, month, firstweekday))
+
+
+def itermonthdates(year, month, firstweekday=SATURDAY):
+    """
+    :return: An iterator of the :py:class:`khayyam.JalaliDate` of the complete weeks of the month, including the days
+             of the previous and the next months, except those out of the supported range.
+    :raises ValueError: If the year, month or first weekday is not valid.
+    """
+    first_day_number, weeks = _get_month_grid(year, month, firstweekday)
+    return _iterate_dates(*_get_day_number_range(first_day_number, len(weeks) * 7))
+
+
+def monthdatescalendar(year, month, firstweekday=SATURDAY):
+    """
+    The same as the :py:func:`monthcalendar`, but the days are :py:class:`khayyam.JalaliDate`, including the days of
+    the previous and the next months. The days out of the supported range are `None`. The dates are created on each
+    call, so they could be modified.
+
+    :return: The weeks of the month, each one is a list of 7 dates.
+    :rtype: list
+    :raises ValueError: If the year, month or first weekday is not valid.
+    """
+    first_day_number, weeks = _get_month_grid(year, month, firstweekday)
+    start, stop = _get_day_number_range(first_day_number, len(weeks) * 7)
+    dates = \
+        [None] * (start - first_day_number) + \
+        list(_iterate_dates(start, stop)) + \
+        [None] * (first_day_number + len(weeks) * 7 - stop)
+    return [dates[i:i + 7] for i in xrange(0, len(dates), 7)]
+
+
+def cache_info():
+    """
+    :return: The hits, misses, maxsize and currsize of the month grids cache.
+    :rtype: :py:class:`khayyam.helpers.CacheInfo`
+    """
+    return _month_grids.cache_info()
+
+
+def cache_clear():
+    """
+    Clears the month grids cache and its statistics.
+    """
+    _month_grids.cache_clear()
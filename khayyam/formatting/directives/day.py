@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from .base import Directive
 from .persian import PersianNumberDirective
-from khayyam.algorithms import get_days_in_jalali_year
+from khayyam import algorithms
 from datetime import timedelta
 __author__ = 'vahid'
 
@@ -37,7 +37,7 @@ class DayOfYearDirective(Directive):
         if 'day' in ctx:
             del ctx['day']
 
-        max_days = get_days_in_jalali_year(ctx['year'])
+        max_days = algorithms.get_days_in_jalali_year(ctx['year'])
         if _dayofyear > max_days:
             raise ValueError(
                 'Invalid dayofyear: %.3d for year %.4d. Valid values are: 1-%s' % (
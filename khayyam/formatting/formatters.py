@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import re
+from khayyam import algorithms
 from khayyam.formatting import constants as consts
-from .directives import DATE_FORMAT_DIRECTIVES
+from .directives import DATE_FORMAT_DIRECTIVES, DATETIME_FORMAT_DIRECTIVES
+
 __author__ = 'vahid'
 
 
@@ -36,13 +38,27 @@ class JalaliDateFormatter(BaseFormatter):
     ]
 
     def __init__(self, format_string, directive_db=None):
+        # The native formatter of the active backend, if any, knows only the builtin directives
+        self.native = not directive_db
         if not directive_db:
             directive_db = DATE_FORMAT_DIRECTIVES
         self.format_string = format_string
         self.directives = directive_db
-        self.directives_by_key = {d.key: d for d in self.directives}
-        self.directives_by_name = {d.name: d for d in self.directives}
-        self._parser_regex = self._create_parser_regex()
+        self._directives_by_key = None
+        self._directives_by_name = None
+        self._parser_regex = None
+
+    @property
+    def directives_by_key(self):
+        if self._directives_by_key is None:
+            self._directives_by_key = {d.key: d for d in self.directives}
+        return self._directives_by_key
+
+    @property
+    def directives_by_name(self):
+        if self._directives_by_name is None:
+            self._directives_by_name = {d.name: d for d in self.directives}
+        return self._directives_by_name
 
     def _create_parser_regex(self):
         regex = u'^'
@@ -68,6 +84,8 @@ class JalaliDateFormatter(BaseFormatter):
 
     @property
     def parser_regex(self):
+        if self._parser_regex is None:
+            self._parser_regex = self._create_parser_regex()
         return self._parser_regex
 
     def iter_format_directives(self):
@@ -76,7 +94,17 @@ class JalaliDateFormatter(BaseFormatter):
             if key in self.directives_by_key:
                 yield m, self.directives_by_key[key]
 
+    def _format_native(self, jalali_date):
+        if algorithms.format_jalali_date is None:
+            return None
+        return algorithms.format_jalali_date(self.format_string, jalali_date.year, jalali_date.month, jalali_date.day)
+
     def format(self, jalali_date):
+        if self.native:
+            result = self._format_native(jalali_date)
+            if result is not None:
+                return result
+
         result = ''
         index = 0
         for match, directive in self.iter_format_directives():
@@ -164,7 +192,22 @@ class JalaliDatetimeFormatter(JalaliDateFormatter):
     ]
 
     def __init__(self, format_string, directive_db=None):
+        native = not directive_db
         if not directive_db:
-            from .directives import DATETIME_FORMAT_DIRECTIVES
             directive_db = DATETIME_FORMAT_DIRECTIVES
         super(JalaliDatetimeFormatter, self).__init__(format_string, directive_db=directive_db)
+        self.native = native
+
+    def _format_native(self, jalali_datetime):
+        if algorithms.format_jalali_datetime is None:
+            return None
+        return algorithms.format_jalali_datetime(
+            self.format_string,
+            jalali_datetime.year,
+            jalali_datetime.month,
+            jalali_datetime.day,
+            jalali_datetime.hour,
+            jalali_datetime.minute,
+            jalali_datetime.second,
+            jalali_datetime.microsecond
+        )
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import sys
+import threading
 import warnings
+from collections import namedtuple, OrderedDict
 __author__ = 'vahid'
 
 
@@ -28,3 +30,57 @@ def deprecated(func):  # pragma: no cover
     return new_func
 
 
+#: The statistics of a :py:func:`lru_cache`, the same as the :py:func:`functools.lru_cache`.
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _lru_cache(maxsize=128):  # pragma: no cover
+    """
+    A thread safe, bounded, least recently used cache decorator, for the interpreters without the
+    :py:func:`functools.lru_cache`. The wrapper provides the `cache_info` and `cache_clear` functions, too.
+    """
+    def decorator(func):
+        items = OrderedDict()
+        lock = threading.Lock()
+        stats = [0, 0]
+
+        def wrapper(*args):
+            with lock:
+                try:
+                    result = items.pop(args)
+                except KeyError:
+                    stats[1] += 1
+                else:
+                    stats[0] += 1
+                    items[args] = result
+                    return result
+
+            result = func(*args)
+            with lock:
+                items[args] = result
+                if len(items) > maxsize:
+                    items.popitem(last=False)
+            return result
+
+        def cache_info():
+            with lock:
+                return CacheInfo(stats[0], stats[1], maxsize, len(items))
+
+        def cache_clear():
+            with lock:
+                items.clear()
+                stats[:] = [0, 0]
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+try:
+    from functools import lru_cache
+except ImportError:  # pragma: no cover
+    lru_cache = _lru_cache
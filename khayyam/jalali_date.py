@@ -1,15 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import datetime
+import os
 import time
-from khayyam.helpers import force_encoded_string_output
-from khayyam.algorithms import get_days_in_jalali_month, \
-    is_jalali_leap_year, \
-    get_julian_day_from_gregorian_date, \
-    get_jalali_date_from_julian_day, \
-    get_julian_day_from_jalali_date, \
-    get_gregorian_date_from_julian_day
+from khayyam.helpers import force_encoded_string_output, lru_cache
+from khayyam.compat import xrange, imap
+from khayyam import algorithms
 from khayyam import MAXYEAR, MINYEAR, SATURDAY
+from khayyam.algorithms_pure import DAYS_BEFORE_JALALI_MONTH, _get_day_number_from_julian_day
 from khayyam.formatting import \
     JalaliDateFormatter, \
     PERSIAN_MONTH_ABBRS, \
@@ -25,13 +23,25 @@ from khayyam.formatting import \
 __author__ = 'vahid'
 
 
-class JalaliDate(object):
+# The fields, comparison and arithmetic are implemented natively by the C extension, unless it's not available or
+# another algorithms backend is selected.
+if algorithms.backend == 'c':
+    from khayyam.algorithms_c import JalaliDateBase
+else:  # pragma: no cover
+    from khayyam.algorithms_pure import JalaliDateBase
+
+# The native constructor from the day number is faster than advancing the fields in python, see the JalaliDate.range.
+_native_day_numbers = JalaliDateBase.__module__ == 'khayyam.algorithms_c'
+
+
+class JalaliDate(JalaliDateBase):
     """
     Represent a day in :doc:`/persiancalendar`.
 
     The first parameter can be an integer, :py:class:`datetime.date` or :py:class:`khayyam.JalaliDate`.
 
-    You may create this object by passing `julian_day` parameter.
+    You may create this object by passing `julian_day` parameter, a whole day number or a half day more, e.g: the
+    `2445218.5` is the same day as `2445218`. The other fractions raise :py:class:`ValueError`.
 
 
     .. doctest::
@@ -56,7 +66,7 @@ class JalaliDate(object):
     :type year: :py:class:`int` | :py:class:`datetime.date` | :py:class:`khayyam.JalaliDate`
     :type month: int
     :type day: int
-    :type julian_day: int
+    :type julian_day: int | float
 
     :return: A :py:class:`khayyam.JalaliDate` instance.
     :rtype: :py:class:`khayyam.JalaliDate`
@@ -70,20 +80,9 @@ class JalaliDate(object):
 
     resolution = datetime.timedelta(days=1)
 
-    def __init__(self, year=1, month=1, day=1, julian_day=None):
-        if isinstance(year, JalaliDate):
-            jd = year
-            year = jd.year
-            month = jd.month
-            day = jd.day
-
-        elif isinstance(year, datetime.date):
-            julian_day = get_julian_day_from_gregorian_date(year.year, year.month, year.day)
-
-        if julian_day is not None:
-            year, month, day = get_jalali_date_from_julian_day(julian_day)
-
-        self.year, self.month, self.day = self._validate(year, month, day)
+    # The day number and the fields are stored by the base, so the instances have no __dict__. The other fields are
+    # derived from them, without any conversion.
+    __slots__ = ()
 
     @property
     def isleap(self):
@@ -92,7 +91,7 @@ class JalaliDate(object):
 
         :type: bool
         """
-        return is_jalali_leap_year(self.year)
+        return algorithms.is_jalali_leap_year(self.year)
 
     @property
     def daysinmonth(self):
@@ -101,7 +100,7 @@ class JalaliDate(object):
 
         :type: int
         """
-        return get_days_in_jalali_month(self.year, self.month)
+        return algorithms.get_days_in_jalali_month(self.year, self.month)
 
     @staticmethod
     def formatterfactory(fmt):
@@ -119,10 +118,11 @@ class JalaliDate(object):
     @classmethod
     def today(cls):
         """
-        :return: The current local date.
+        :return: The current local date, it's interned while the instance cache is enabled, see the
+                 :py:meth:`interned`.
         :rtype: :py:class:`khayyam.JalaiDate`
         """
-        return cls(datetime.date.today())
+        return cls.interned(datetime.date.today())
 
     @classmethod
     def fromtimestamp(cls, timestamp):
@@ -133,11 +133,12 @@ class JalaliDate(object):
         Note that on non-POSIX systems that include leap seconds in their notion of a
         timestamp, leap seconds are ignored by fromtimestamp().
 
-        :return: Local date corresponding to the POSIX timestamp
+        :return: Local date corresponding to the POSIX timestamp, it's interned while the instance cache is
+                 enabled, see the :py:meth:`interned`.
         :rtype: :py:class:`khayyam.JalaiDate`
 
         """
-        return cls(datetime.date.fromtimestamp(timestamp))
+        return cls.interned(datetime.date.fromtimestamp(timestamp))
 
     @classmethod
     def fromordinal(cls, ordinal):
@@ -146,10 +147,146 @@ class JalaliDate(object):
 
         ValueError is raised unless 1 <= ordinal <= `khayyam.jalaliDate(khayyam.MAXYEAR).toordinal()`.
 
-        :return: The date corresponding to the proleptic Shamsi ordinal.
+        :return: The date corresponding to the proleptic Shamsi ordinal, it's interned while the instance cache is
+                 enabled, see the :py:meth:`interned`.
         :rtype: :py:class:`khayyam.JalaiDate`
         """
-        return cls.min + datetime.timedelta(days=ordinal - 1)
+        day_number = ordinal + algorithms.JALALI_DAY_NUMBER_EPOCH
+        if _instances is not None and cls is JalaliDate:
+            return _instances(day_number, algorithms.leap_rule)
+        return cls._from_day_number(day_number)
+
+    @classmethod
+    def interned(cls, year=1, month=1, day=1, julian_day=None):
+        """interned(year=1, month=1, day=1, julian_day=None)
+
+        The same as the constructor, but returns the shared instance of the day, while the instance cache is enabled
+        by the :py:func:`khayyam.jalali_date.use_instance_cache`. The shared instances are read-only, so setting
+        their year, month or day raises :py:class:`AttributeError`. The subclasses are not interned.
+
+        :return: The interned instance, or a new one if the cache is disabled.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        if _instances is None or cls is not JalaliDate:
+            return cls(year, month, day, julian_day=julian_day)
+
+        if isinstance(year, datetime.date):
+            day_number = year.toordinal() + algorithms.GREGORIAN_ORDINAL_EPOCH
+        elif julian_day is not None:
+            day_number = _get_day_number_from_julian_day(julian_day)
+        elif isinstance(year, JalaliDateBase):
+            day_number = year.tojulianday()
+        else:
+            return _instances_by_fields(year, month, day, algorithms.leap_rule)
+        return _instances(day_number, algorithms.leap_rule)
+
+    @classmethod
+    def range(cls, start, stop, step=1, unit='days'):
+        """range(start, stop, step=1, unit='days')
+
+        A lazy iterator over the days from `start` up to, but not including, the `stop`, the same as the `range`:
+
+            >>> list(JalaliDate.range(JalaliDate(1394, 12, 28), JalaliDate(1395, 1, 2)))
+            [khayyam.JalaliDate(1394, 12, 28, Jomeh), khayyam.JalaliDate(1394, 12, 29, Shanbeh), \
+khayyam.JalaliDate(1395, 1, 1, Yekshanbeh)]
+
+        The fields are advanced incrementally by the month lengths, so it's much faster than adding a
+        :py:class:`datetime.timedelta` in a loop. By the `months` and `years` units, the day is clamped to the last
+        day of each month, see the :py:meth:`add_months`. The :py:class:`khayyam.JalaliDatetime` items keep the time
+        of the `start`.
+
+        :param start: The first date, a :py:class:`khayyam.JalaliDate` or anything accepted by the constructor.
+        :param stop: The date to stop at, it's not included.
+        :param step: The integer step in the unit, which may be negative, or a :py:class:`datetime.timedelta` of
+                     whole days.
+        :param unit: One of the `days`, `weeks`, `months` or `years`.
+        :return: A generator of the instances of this class.
+        :raises ValueError: If the step is zero, or the unit is not valid.
+        """
+        if isinstance(step, datetime.timedelta):
+            if step.seconds or step.microseconds or unit != 'days':
+                raise ValueError('The timedelta step must be whole days, but it is: %s' % step)
+            step = step.days
+
+        if not step:
+            raise ValueError('The step must not be zero')
+
+        if unit not in ('days', 'weeks', 'months', 'years'):
+            raise ValueError('Invalid unit: %s, it must be one of: days, weeks, months, years' % unit)
+
+        if type(start) is not cls:
+            start = cls(start)
+
+        limit = start._get_range_limit(stop, step > 0)
+        if unit in ('months', 'years'):
+            return start._iterate_months(limit, step * 12 if unit == 'years' else step)
+        return start._iterate_days(limit, step * 7 if unit == 'weeks' else step)
+
+    def _get_range_limit(self, stop, forward):
+        # The day number which the items of the range should be before, or after if going backward. The items keep
+        # the time of a JalaliDatetime start, so the day of the stop is included if its item is still before the stop.
+        if type(stop) is not type(self):
+            stop = type(self)(stop)
+        day_number = stop.tojulianday()
+        item = self._with_day_number(day_number)
+        if forward:
+            return day_number + 1 if item < stop else day_number
+        return day_number - 1 if item > stop else day_number
+
+    def _iterate_days(self, limit, step):
+        if _native_day_numbers:
+            return imap(self._from_day_number, xrange(self.tojulianday(), limit, step))
+        return self._advance_days(limit, step)
+
+    def _advance_days(self, limit, step):
+        # The items are before the limit going forward, or after it going backward, which is: (limit - x) * step > 0
+        year, month, day = self.year, self.month, self.day
+        day_number = self.tojulianday()
+        days_in_month = algorithms.get_days_in_jalali_month(year, month)
+
+        while (limit - day_number) * step > 0:
+            yield self._with_fields(year, month, day)
+            day_number += step
+            if (limit - day_number) * step <= 0:
+                return
+
+            # The rolling is just needed on the month ends, and the limit keeps it in the supported years. The
+            # steps longer than a month are converted from the day number instead.
+            if step > 28 or step < -28:
+                year, month, day = algorithms.get_jalali_date_from_day_number(day_number)
+                days_in_month = algorithms.get_days_in_jalali_month(year, month)
+                continue
+
+            day += step
+            while day > days_in_month:
+                day -= days_in_month
+                month += 1
+                if month > 12:
+                    year, month = year + 1, 1
+                days_in_month = algorithms.get_days_in_jalali_month(year, month)
+
+            while day < 1:
+                month -= 1
+                if month < 1:
+                    year, month = year - 1, 12
+                days_in_month = algorithms.get_days_in_jalali_month(year, month)
+                day += days_in_month
+
+    def _iterate_months(self, limit, step):
+        months = self.year * 12 + self.month - 1
+
+        while True:
+            year, month = divmod(months, 12)
+            if year < MINYEAR or year > MAXYEAR:
+                return
+
+            month += 1
+            day = min(self.day, algorithms.get_days_in_jalali_month(year, month))
+            if (limit - algorithms.get_day_number_from_jalali_date(year, month, day)) * step <= 0:
+                return
+
+            yield self._with_fields(year, month, day)
+            months += step
 
     @classmethod
     def strptime(cls, date_string, fmt):
@@ -172,27 +309,8 @@ class JalaliDate(object):
         result = {k: v for k, v in result.items() if k in ('year', 'month', 'day')}
         return cls(**result)
 
-    @staticmethod
-    def _validate(year, month, day):
-        year = year if isinstance(year, int) else int(year)
-        month = month if isinstance(month, int) else int(month)
-        day = day if isinstance(day, int) else int(day)
-
-        if year < MINYEAR or year > MAXYEAR:
-            raise ValueError('Year must be between %s and %s, but it is: %s' % (MINYEAR, MAXYEAR, year))
-        if month < 1 or month > 12:
-            raise ValueError('Month must be between 1 and 12, but it is: %s' % month)
-        _days_in_month = get_days_in_jalali_month(year, month)
-        if day < 1 or day > _days_in_month:
-            raise ValueError('Day must be between 1 and %s, but it is: %s' % (_days_in_month, day))
-        return year, month, day
-
-    def tojulianday(self):
-        """
-        :return: Julian day representing the current instance.
-        :rtype: int
-        """
-        return get_julian_day_from_jalali_date(self.year, self.month, self.day)
+    #: Julian day representing the current instance, as an integer day number.
+    tojulianday = JalaliDateBase.tojulianday
 
     def copy(self):
         """
@@ -205,7 +323,7 @@ class JalaliDate(object):
         :return: A Copy of the current instance.
         :rtype: :py:class:`khayyam.JalaiDate`
         """
-        return JalaliDate(self.year, self.month, self.day)
+        return JalaliDate._from_fields(self.year, self.month, self.day)
 
     def replace(self, year=None, month=None, day=None):
         """
@@ -217,6 +335,8 @@ class JalaliDate(object):
         :return: A :py:class:`khayyam.JalaliDate` with the same attributes, except for those
             attributes given new values by which keyword arguments are specified.
         """
+        if not (year or month or day):
+            return self.copy()
 
         return JalaliDate(
             year if year else self.year,
@@ -231,28 +351,10 @@ class JalaliDate(object):
         :return: Corresponding date in gregorian calendar.
         :rtype: :py:class:`datetime.date`
         """
-        arr = get_gregorian_date_from_julian_day(self.tojulianday())
-        return datetime.date(int(arr[0]), int(arr[1]), int(arr[2]))
-
-    def toordinal(self):
-        """
-        It's equivalent to:
-
-        .. testsetup:: api-date-toordinal
+        return datetime.date.fromordinal(self.toordinal() - algorithms.GREGORIAN_ORDINAL_OFFSET)
 
-            import khayyam
-            from khayyam import JalaliDate
-
-        .. doctest:: api-date-toordinal
-
-            >>> d = JalaliDate(1361, 6, 15)
-            >>> (d - JalaliDate(khayyam.MINYEAR)).days + 1
-            496899
-
-        :return: The corresponding proleptic Shamsi ordinal days.
-        :rtype: int
-        """
-        return (self - self.min).days + 1
+    #: The corresponding proleptic Shamsi ordinal days, where Farvardin 1 of the year 1 has ordinal 1.
+    toordinal = JalaliDateBase.toordinal
 
     def timetuple(self):
         """
@@ -270,15 +372,16 @@ class JalaliDate(object):
         :return: A :py:class:`time.struct_time` such as returned by time.localtime().
         :rtype: :py:class:`time.struct_time`
         """
+        month, day = self.month, self.day
         return time.struct_time((
             self.year,
-            self.month,
-            self.day,
+            month,
+            day,
             0,
             0,
             0,
-            self.weekday(),
-            self.dayofyear(),
+            (self.tojulianday() + 3) % 7,
+            DAYS_BEFORE_JALALI_MONTH[month] + day,
             -1
         ))
 
@@ -287,7 +390,8 @@ class JalaliDate(object):
         :rtype: int
         :return: The day of the week as an integer, where Saturday is 0 and Friday is 6.
         """
-        return (self.todate().weekday() + 2) % 7
+        # The day number 0 is a Monday
+        return (self.tojulianday() + 3) % 7
 
     def isoweekday(self):
         """
@@ -435,14 +539,14 @@ class JalaliDate(object):
         :return: First day of corresponding year.
         :rtype: :py:class:`JalaliDate`
         """
-        return JalaliDate(self.year, 1, 1)
+        return JalaliDate._from_fields(self.year, 1, 1)
 
     def dayofyear(self):
         """
         :return: Day of year az integer: 1-35[5,6]
         :rtype: int
         """
-        return (self - self.firstdayofyear()).days + 1
+        return DAYS_BEFORE_JALALI_MONTH[self.month] + self.day
 
     def weekofyear(self, first_day_of_week=SATURDAY):
         """weekofyear(first_day_of_week=SATURDAY)
@@ -458,16 +562,97 @@ class JalaliDate(object):
         :return: The week number of the year.
         :rtype: int
         """
-        first_day_of_year = self.firstdayofyear()
-        days = (self - first_day_of_year).days
-        offset = first_day_of_week - first_day_of_year.weekday()
-        if offset < 0:
-            offset += 7
+        days = DAYS_BEFORE_JALALI_MONTH[self.month] + self.day - 1
+        offset = (first_day_of_week - (self.tojulianday() + 3) % 7 + days) % 7
 
         if days < offset:
             return 0
 
-        return int((days - offset) / 7 + 1)
+        return (days - offset) // 7 + 1
+
+    # The navigation methods are computed from the day number and the month lengths, the
+    # :py:class:`khayyam.JalaliDatetime` overrides these two constructors to keep the time.
+    def _with_fields(self, year, month, day):
+        return self._from_fields(year, month, day)
+
+    def _with_day_number(self, day_number):
+        return self._from_day_number(day_number)
+
+    def add_months(self, months):
+        """
+        Moves the current instance by the given months, the day is clamped to the last day of the target month:
+
+            >>> JalaliDate(1394, 6, 31).add_months(1)
+            khayyam.JalaliDate(1394, 7, 30, Panjshanbeh)
+
+        :param months: The number of months, which may be negative.
+        :return: A new instance of the same type.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        :raises ValueError: If the result is out of the supported years.
+        """
+        year, month = divmod(self.year * 12 + self.month - 1 + months, 12)
+        if year < MINYEAR or year > MAXYEAR:
+            raise ValueError('Year must be between %s and %s, but it is: %s' % (MINYEAR, MAXYEAR, year))
+
+        month += 1
+        return self._with_fields(year, month, min(self.day, algorithms.get_days_in_jalali_month(year, month)))
+
+    def add_years(self, years):
+        """
+        Moves the current instance by the given years, the 30th of Esfand is clamped to the 29th on non-leap years:
+
+            >>> JalaliDate(1395, 12, 30).add_years(1)
+            khayyam.JalaliDate(1396, 12, 29, Seshanbeh)
+
+        :param years: The number of years, which may be negative.
+        :return: A new instance of the same type.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        :raises ValueError: If the result is out of the supported years.
+        """
+        return self.add_months(years * 12)
+
+    def next(self, weekday):
+        """next(weekday)
+
+        :param weekday: One of the :py:data:`khayyam.SATURDAY` ... :py:data:`khayyam.FRIDAY`.
+        :return: The first day after the current instance, which is the given weekday, i.e:
+                 `JalaliDate(1394, 3, 24).next(SATURDAY)` is the `1394/3/30`.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        return self._with_day_number(self.tojulianday() + (weekday - self.weekday() - 1) % 7 + 1)
+
+    def previous(self, weekday):
+        """previous(weekday)
+
+        :param weekday: One of the :py:data:`khayyam.SATURDAY` ... :py:data:`khayyam.FRIDAY`.
+        :return: The last day before the current instance, which is the given weekday, i.e:
+                 `JalaliDate(1394, 3, 24).previous(WEDNESDAY)` is the `1394/3/20`.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        return self._with_day_number(self.tojulianday() - (self.weekday() - weekday - 1) % 7 - 1)
+
+    def startofmonth(self):
+        """
+        :return: The first day of the current instance's month.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        return self._with_fields(self.year, self.month, 1)
+
+    def endofmonth(self):
+        """
+        :return: The last day of the current instance's month.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        return self._with_fields(self.year, self.month, self.daysinmonth)
+
+    def startofweek(self, first_day_of_week=SATURDAY):
+        """startofweek(first_day_of_week=SATURDAY)
+
+        :param first_day_of_week: One of the :py:data:`khayyam.SATURDAY` ... :py:data:`khayyam.FRIDAY`.
+        :return: The first day of the current instance's week, which may be the current day itself.
+        :rtype: :py:class:`khayyam.JalaliDate`
+        """
+        return self._with_day_number(self.tojulianday() - (self.weekday() - first_day_of_week) % 7)
 
     ###################
     # Special Members #
@@ -483,60 +668,68 @@ class JalaliDate(object):
         return 'khayyam.JalaliDate(%s, %s, %s, %s)' % \
                (self.year, self.month, self.day, self.weekdaynameascii())
 
-    def __add__(self, x):
-        if isinstance(x, datetime.timedelta):
-            days = self.tojulianday() + x.days
-            return JalaliDate(julian_day=days)
-
-        raise TypeError('JalaliDate object can added by timedelta or JalaliDate object')
-
-    def __sub__(self, x):
-        if isinstance(x, datetime.timedelta):
-            days = self.tojulianday() - x.days
-            return JalaliDate(julian_day=days)
-        elif isinstance(x, JalaliDate):
-            days = self.tojulianday() - x.tojulianday()
-            return datetime.timedelta(days=days)
-
-        raise TypeError('JalaliDate object can added by timedelta or JalaliDate object')
-
-    def __lt__(self, x):
-        self._ensure_jalali_date(x)
-        return self.tojulianday() < x.tojulianday()
-
-    def __le__(self, x):
-        self._ensure_jalali_date(x)
-        return self.tojulianday() <= x.tojulianday()
-
-    def __hash__(self):
-            return hash((self.year, self.month, self.day))
-
-    def __eq__(self, x):
-        if not x:
-            return False
-        if isinstance(x, datetime.date):
-            return self.todate().__eq__(x)
-        elif isinstance(x, JalaliDate):
-            return hash(self) == hash(x)
-        else:
-            raise TypeError('JalaliDate object only can be compared by timedelta or JalaliDate object.')
+# Class attributes
+JalaliDate.min = JalaliDate._from_fields(*JalaliDate.min)
+JalaliDate.max = JalaliDate._from_fields(*JalaliDate.max)
 
-    def __ne__(self, x):
-        return not self.__eq__(x)
 
-    def __gt__(self, x):
-        self._ensure_jalali_date(x)
-        return self.tojulianday() > x.tojulianday()
+def _iterate_dates(start, stop):
+    # The dates of the day numbers from the start up to the stop, the same as the JalaliDate.range, for the calendar.
+    return JalaliDate._from_day_number(start)._iterate_days(stop, 1)
 
-    def __ge__(self, x):
-        self._ensure_jalali_date(x)
-        return self.tojulianday() >= x.tojulianday()
 
-    @staticmethod
-    def _ensure_jalali_date(x):
-        if not isinstance(x, JalaliDate):
-            raise TypeError('Comparison just allow with JalaliDate')
+#: The environment variable to enable the instance cache by its size, when importing this module.
+INSTANCE_CACHE_ENVIRON = 'KHAYYAM_INSTANCE_CACHE_SIZE'
 
-# Class attributes
-JalaliDate.min = JalaliDate(*JalaliDate.min)
-JalaliDate.max = JalaliDate(*JalaliDate.max)
+# The interned instances by the day number, and by the fields, see the use_instance_cache.
+_instances = None
+_instances_by_fields = None
+
+
+def _create_interned(day_number, leap_rule):
+    # The leap rule is a part of the cache key, as the fields of a day number depend on it.
+    return JalaliDate._from_day_number(day_number)._make_read_only()
+
+
+def _find_interned(year, month, day, leap_rule):
+    # The fields are mapped to the interned instance of their day number, so they are validated once.
+    year, month, day = JalaliDateBase._validate(year, month, day)
+    return _instances(algorithms.get_day_number_from_jalali_date(year, month, day), leap_rule)
+
+
+def use_instance_cache(maxsize=1024):
+    """
+    Interns the :py:class:`khayyam.JalaliDate` instances by their day numbers, so the
+    :py:meth:`khayyam.JalaliDate.interned`, :py:meth:`khayyam.JalaliDate.today`,
+    :py:meth:`khayyam.JalaliDate.fromordinal` and :py:meth:`khayyam.JalaliDate.fromtimestamp` return the same instance
+    for the same day, while it's one of the `maxsize` recently used days. It's a thread safe least recently used cache.
+
+    The interned instances are shared, so they are read-only. The constructor always returns a new instance, and the
+    :py:class:`khayyam.JalaliDatetime` is not interned. It's disabled by default.
+
+    It's a few times faster with the python algorithm backends. The native constructor of the C extension is as
+    fast as a cache lookup, so it just saves the memory of the duplicated instances there.
+
+    :param maxsize: The maximum number of the interned instances, 0 disables the cache.
+    :raises ValueError: If the size is negative.
+    """
+    global _instances, _instances_by_fields
+    if maxsize < 0:
+        raise ValueError('The instance cache size must be a non-negative integer, but it is: %s' % maxsize)
+
+    if maxsize:
+        _instances = lru_cache(maxsize)(_create_interned)
+        _instances_by_fields = lru_cache(maxsize)(_find_interned)
+    else:
+        _instances = _instances_by_fields = None
+
+
+def instance_cache_info():
+    """
+    :return: The hits, misses, maxsize and currsize of the instance cache, or None if it's disabled.
+    :rtype: :py:class:`khayyam.helpers.CacheInfo`
+    """
+    return None if _instances is None else _instances.cache_info()
+
+
+use_instance_cache(int(os.environ.get(INSTANCE_CACHE_ENVIRON) or 0))
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
-from datetime import timedelta, time, datetime
-from khayyam.algorithms import get_gregorian_date_from_julian_day
+from datetime import timedelta, time, date, datetime
+from itertools import repeat
 import khayyam
+from khayyam import algorithms, jalali_date
+from khayyam.compat import xrange, imap
 from khayyam.formatting import JalaliDatetimeFormatter, AM_PM, AM_PM_ASCII
 from khayyam.helpers import force_encoded_string_output
 
@@ -57,8 +59,11 @@ class JalaliDatetime(khayyam.JalaliDate):
 
     resolution = timedelta(microseconds=1)
 
-    def __init__(self, year=1, month=1, day=1, hour=0, minute=0, second=0,
-                 microsecond=0, tzinfo=None, julian_day=None):
+    # The time of the day, including the tzinfo, the date is kept by the :py:class:`khayyam.JalaliDate`.
+    __slots__ = ('_time', )
+
+    def __new__(cls, year=1, month=1, day=1, hour=0, minute=0, second=0,
+                microsecond=0, tzinfo=None, julian_day=None):
 
         if callable(tzinfo):
             tzinfo = tzinfo()
@@ -72,8 +77,38 @@ class JalaliDatetime(khayyam.JalaliDate):
             if not tzinfo:
                 tzinfo = year.tzinfo
 
-        khayyam.JalaliDate.__init__(self, year=year, month=month, day=day, julian_day=julian_day)
+        self = khayyam.JalaliDate.__new__(cls, year, month, day, julian_day)
         self._time = time(hour, minute, second, microsecond, tzinfo)
+        return self
+
+    @classmethod
+    def _from_fields(cls, year, month, day, _time):
+        # The trusted constructors of the internal arithmetic, the values are valid by construction, and the time
+        # includes the tzinfo.
+        self = super(JalaliDatetime, cls)._from_fields(year, month, day)
+        self._time = _time
+        return self
+
+    @classmethod
+    def _from_day_number(cls, day_number, _time):
+        self = super(JalaliDatetime, cls)._from_day_number(day_number)
+        self._time = _time
+        return self
+
+    def _with_fields(self, year, month, day):
+        return self._from_fields(year, month, day, self._time)
+
+    def _with_day_number(self, day_number):
+        return self._from_day_number(day_number, self._time)
+
+    def _iterate_days(self, limit, step):
+        if jalali_date._native_day_numbers:
+            return imap(self._from_day_number, xrange(self.tojulianday(), limit, step), repeat(self._time))
+        return self._advance_days(limit, step)
+
+    @classmethod
+    def _from_datetime(cls, value):
+        return cls._from_day_number(value.toordinal() + algorithms.GREGORIAN_ORDINAL_EPOCH, value.timetz())
 
     ##############
     # Properties #
@@ -221,7 +256,7 @@ class JalaliDatetime(khayyam.JalaliDate):
         raised unless 1 <= ordinal <= JalaliDatetime.max.toordinal(). The hour, minute, second
         and microsecond of the result are all 0, and tzinfo is None.
         """
-        return cls.min + timedelta(days=ordinal - 1)
+        return cls._from_day_number(ordinal + algorithms.JALALI_DAY_NUMBER_EPOCH, time())
 
     @classmethod
     def combine(cls, date, _time):
@@ -269,9 +304,7 @@ class JalaliDatetime(khayyam.JalaliDate):
         :return: the new :py:class:`datetime.datetime` instance representing the current date and time in gregorian calendar.
         :rtype: :py:class:`datetime.datetime`
         """
-        arr = get_gregorian_date_from_julian_day(self.tojulianday())
-        return datetime(int(arr[0]), int(arr[1]), int(arr[2]), self.hour, self.minute, self.second, self.microsecond,
-                        self.tzinfo)
+        return datetime.combine(date.fromordinal(self.toordinal() - algorithms.GREGORIAN_ORDINAL_OFFSET), self._time)
 
     def date(self):
         """
@@ -279,7 +312,7 @@ class JalaliDatetime(khayyam.JalaliDate):
 
         :rtype: :py:class:`khayyam.JalaliDate`
         """
-        return khayyam.JalaliDate(self.year, self.month, self.day)
+        return khayyam.JalaliDate._from_fields(self.year, self.month, self.day)
 
     def time(self):
         """
@@ -323,17 +356,16 @@ class JalaliDatetime(khayyam.JalaliDate):
             day if day else self.day
         )
 
-        result = JalaliDatetime(
-            year,
-            month,
-            day,
+        if callable(tzinfo):
+            tzinfo = tzinfo()
+
+        return JalaliDatetime._from_fields(year, month, day, time(
             self.hour if hour is None else hour,
             self.minute if minute is None else minute,
             self.second if second is None else second,
             self.microsecond if microsecond is None else microsecond,
-            tzinfo if tzinfo != self.tzinfo else self.tzinfo
-        )
-        return result
+            tzinfo
+        ))
 
     def astimezone(self, tz):
         """
@@ -448,11 +480,7 @@ class JalaliDatetime(khayyam.JalaliDate):
         :return: A Copy of the current instance.
         :rtype: :py:class:`khayyam.JalaliDatetime`
         """
-        return JalaliDatetime(
-            self.year, self.month, self.day,
-            self.hour, self.minute, self.second, self.microsecond,
-            tzinfo=self.tzinfo
-        )
+        return JalaliDatetime._from_fields(self.year, self.month, self.day, self._time)
 
     def isoformat(self, sep='T'):
         """
@@ -632,14 +660,6 @@ class JalaliDatetime(khayyam.JalaliDate):
         """
         return self.tzname() or ''
 
-    def dayofyear(self):
-        """
-        Return the day of year (1-[365, 366]).
-
-        :rtype: int
-        """
-        return (self.date() - khayyam.JalaliDate(self.year, 1, 1)).days + 1
-
     def __unicode__(self):
         """
         Return the default :py:class:`khayyam.JalaliDatetime` representation.
@@ -679,13 +699,13 @@ class JalaliDatetime(khayyam.JalaliDate):
 
     def __add__(self, x):
         if isinstance(x, timedelta):
-            return JalaliDatetime(x + self.todatetime())
+            return self._from_datetime(self.todatetime() + x)
 
         raise TypeError('JalaliDatetime object can added by timedelta or JalaliDate object')
 
     def __sub__(self, x):
         if isinstance(x, timedelta):
-            return JalaliDatetime(self.todatetime() - x)
+            return self._from_datetime(self.todatetime() - x)
         elif isinstance(x, JalaliDatetime):
             return self.todatetime() - x.todatetime()
         elif isinstance(x, khayyam.JalaliDate):
@@ -694,13 +714,31 @@ class JalaliDatetime(khayyam.JalaliDate):
         raise TypeError('JalaliDatetime object can added by timedelta, JalaliDatetime or JalaliDate object')
 
     def __lt__(self, x):
+        if isinstance(x, JalaliDatetime) and self._time.tzinfo is x._time.tzinfo:
+            day_number, other = self.tojulianday(), x.tojulianday()
+            return day_number < other or day_number == other and self._time < x._time
         self._ensure_jalali_datetime(x)
         return self.todatetime() < x.todatetime()
 
     def __le__(self, x):
+        if isinstance(x, JalaliDatetime) and self._time.tzinfo is x._time.tzinfo:
+            day_number, other = self.tojulianday(), x.tojulianday()
+            return day_number < other or day_number == other and self._time <= x._time
         self._ensure_jalali_datetime(x)
         return self.todatetime() <= x.todatetime()
 
+    def __reduce__(self):
+        return type(self), (
+            self.year,
+            self.month,
+            self.day,
+            self.hour,
+            self.minute,
+            self.second,
+            self.microsecond,
+            self.tzinfo
+        )
+
     def __hash__(self):
         return hash((
             self.year,
@@ -719,19 +757,39 @@ class JalaliDatetime(khayyam.JalaliDate):
         if isinstance(x, datetime):
             return self.todatetime().__eq__(x)
         elif isinstance(x, JalaliDatetime):
-            return hash(self) == hash(x)
+            # The fields and the tzinfo are compared, the same as the hash
+            if self.tojulianday() != x.tojulianday():
+                return False
+            if self._time.tzinfo is x._time.tzinfo:
+                return self._time == x._time
+            return hash(self._time.tzinfo) == hash(x._time.tzinfo) and \
+                (self.hour, self.minute, self.second, self.microsecond) == \
+                (x.hour, x.minute, x.second, x.microsecond)
         else:
             raise TypeError('Comparison only allowed with JalaliDatetime and datetime.datetime objects.')
 
+    def __ne__(self, x):
+        return not self.__eq__(x)
+
     def __gt__(self, x):
+        if isinstance(x, JalaliDatetime) and self._time.tzinfo is x._time.tzinfo:
+            day_number, other = self.tojulianday(), x.tojulianday()
+            return day_number > other or day_number == other and self._time > x._time
         self._ensure_jalali_datetime(x)
         return self.todatetime() > x.todatetime()
 
     def __ge__(self, x):
+        if isinstance(x, JalaliDatetime) and self._time.tzinfo is x._time.tzinfo:
+            day_number, other = self.tojulianday(), x.tojulianday()
+            return day_number > other or day_number == other and self._time >= x._time
         self._ensure_jalali_datetime(x)
         return self.todatetime() >= x.todatetime()
 
 
 # # Class attributes
-JalaliDatetime.min = JalaliDatetime(*JalaliDatetime.min)
-JalaliDatetime.max = JalaliDatetime(*JalaliDatetime.max)
+JalaliDatetime.min = JalaliDatetime._from_fields(
+    JalaliDatetime.min[0], JalaliDatetime.min[1], JalaliDatetime.min[2], time()
+)
+JalaliDatetime.max = JalaliDatetime._from_fields(
+    JalaliDatetime.max[0], JalaliDatetime.max[1], JalaliDatetime.max[2], time(*JalaliDatetime.max[3:])
+)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+The precomputed leap years of the supported range, to be selected by :py:func:`khayyam.algorithms.use_leap_rule`.
+
+The astronomical leap years follow the vernal equinox, as observed at Tehran, which is the rule of the official
+Iranian calendar. They are generated offline, using the leap year breaks of the Borkowski's algorithm (the same as
+the jalaali-js, jalaali-python and the other libraries), so nothing is computed astronomically at runtime. The breaks
+are valid until the year 3177, so the flag of the year 3178 is taken from the arithmetic rule.
+
+Both rules agree on the first day of the year 1 and of the year 3179, and the first day of any year between them
+differs by at most a day.
+"""
+from binascii import unhexlify
+
+__author__ = 'vahid'
+
+
+#: The leap flags of the years :py:data:`khayyam.MINYEAR` to :py:data:`khayyam.MAXYEAR` by the astronomical rule,
+#: one bit per year: the least significant bit of the first byte is the year 1.
+ASTRONOMICAL_LEAP_YEARS = unhexlify(
+    b'081111112122222242444444848888880811111111222222424444448488888808111111112222222244444444888888'
+    b'881011111122222222444444448888888810111111212222224244444484888888081111112122222242444444448888'
+    b'888810111111222222224444444488888888101111112122222242444444848888880811111111222222424444448488'
+    b'888888101111112222222244444444888888881011111121222222424444448488888808111111112222222244444444'
+    b'888888881011111121222222444444448888888810111111212222224244444484888888081111111122222222444444'
+    b'448888888810111111212222224244444488888888081111111122222222444444848888880811111111212222224244'
+    b'444488888888101111111122222222444444848888880811111111222222224444444488888888101111112122222242'
+    b'444444848888880811111111222222224444444488888888101111112122222242444444848888880811111111222222'
+    b'2244444444888888881011111100'
+)
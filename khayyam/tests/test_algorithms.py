@@ -1,13 +1,45 @@
 # -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+import sysconfig
+import threading
 import unittest
+from array import array
+from datetime import date, datetime, timedelta
+from khayyam import algorithms
 from khayyam import algorithms_c as alg_c
 from khayyam import algorithms_pure as alg_p
+from khayyam import algorithms_table as alg_t
+from khayyam import MINYEAR, MAXYEAR
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import _interpreters
+except ImportError:  # pragma: no cover
+    _interpreters = None
+
 __author__ = 'vahid'
 
 
 # TODO: test with negative values
 class TestCAlgorithms(unittest.TestCase):
 
+    def setUp(self):
+        # The backend, the leap rule and the memoization may be selected by the environment
+        self.backend = algorithms.backend
+        self.leap_rule = algorithms.leap_rule
+        self.memoization_size = algorithms.memoization_size
+
+    def tearDown(self):
+        algorithms.use_backend(self.backend)
+        algorithms.use_leap_rule(self.leap_rule)
+        algorithms.use_memoization(self.memoization_size)
+
     def test_get_julian_day_from_gregorian(self):
         self.assertRaises(ValueError, alg_p.get_julian_day_from_gregorian_date, 2016, 2, 30)
         self.assertRaises(ValueError, alg_p.get_julian_day_from_gregorian_date, 2015, 2, 29)
@@ -91,6 +123,332 @@ class TestCAlgorithms(unittest.TestCase):
 
             self.assertEqual(c, p, 'jd: %s c: %s py: %s cdate: %s pydate: %s' % (jd, c, p, cd, pd))
 
+    def test_day_number_from_jalali_date(self):
+        self.assertEqual(alg_c.get_day_number_from_jalali_date(1361, 6, 15), 2445218)
+        self.assertEqual(alg_p.get_day_number_from_jalali_date(1361, 6, 15), 2445218)
+        for y in range(-10, 303):
+            for m in range(1, 13):
+                for d in range(1, alg_c.get_days_in_jalali_month(y, m) + 1):
+                    c = alg_c.get_day_number_from_jalali_date(y, m, d)
+                    self.assertEqual(c, alg_p.get_day_number_from_jalali_date(y, m, d))
+                    self.assertEqual(c, int(alg_c.get_julian_day_from_jalali_date(y, m, d)))
+
+    def test_jalali_date_from_day_number(self):
+        for n in range(1948320 - 1000, 1948320 + 365 * 1000):
+            c = alg_c.get_jalali_date_from_day_number(n)
+            p = alg_p.get_jalali_date_from_day_number(n)
+            self.assertEqual(c, p, "Day number: %s\t%s <> %s" % (n, c, p))
+            self.assertEqual(alg_c.get_day_number_from_jalali_date(*c), n)
+
+    def test_day_number_from_gregorian_date(self):
+        self.assertRaises(ValueError, alg_p.get_day_number_from_gregorian_date, 2016, 2, 30)
+        self.assertRaises(ValueError, alg_p.get_day_number_from_gregorian_date, 2015, 2, 29)
+        self.assertRaises(ValueError, alg_c.get_day_number_from_gregorian_date, 2016, 2, 30)
+        self.assertRaises(ValueError, alg_c.get_day_number_from_gregorian_date, 2015, 2, 29)
+
+        # The day number is the proleptic gregorian ordinal with a constant offset
+        for ordinal in range(1, 365 * 3000, 7):
+            d = date.fromordinal(ordinal)
+            self.assertEqual(alg_c.get_day_number_from_gregorian_date(d.year, d.month, d.day), ordinal + 1721424)
+            self.assertEqual(alg_p.get_day_number_from_gregorian_date(d.year, d.month, d.day), ordinal + 1721424)
+
+    def test_gregorian_date_from_day_number(self):
+        for n in range(-1000, 365 * 200):
+            self.assertEqual(
+                alg_c.get_gregorian_date_from_day_number(n),
+                alg_p.get_gregorian_date_from_day_number(n)
+            )
+
+        for ordinal in range(1, 365 * 3000, 7):
+            d = date.fromordinal(ordinal)
+            self.assertEqual(alg_c.get_gregorian_date_from_day_number(ordinal + 1721424), (d.year, d.month, d.day))
+            self.assertEqual(alg_p.get_gregorian_date_from_day_number(ordinal + 1721424), (d.year, d.month, d.day))
+
+    def test_gregorian_date_from_jalali_date(self):
+        self.assertEqual(alg_c.get_gregorian_date_from_jalali_date(1361, 6, 15), (1982, 9, 6))
+        self.assertEqual(alg_p.get_gregorian_date_from_jalali_date(1361, 6, 15), (1982, 9, 6))
+        for y in range(1, 3178, 7):
+            for m in range(1, 13):
+                for d in (1, alg_c.get_days_in_jalali_month(y, m)):
+                    c = alg_c.get_gregorian_date_from_jalali_date(y, m, d)
+                    self.assertEqual(c, alg_p.get_gregorian_date_from_jalali_date(y, m, d))
+                    self.assertEqual(alg_c.get_jalali_date_from_gregorian_date(*c), (y, m, d))
+
+    def test_arguments(self):
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_gregorian_date, 1982, 9)
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_gregorian_date, 1982, 9, 6, 1)
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_gregorian_date, 1982, 9, 6.)
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_gregorian_date, 1982, 9, '6')
+        self.assertRaises(OverflowError, alg_c.get_day_number_from_jalali_date, 2 ** 40, 1, 1)
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_julian_day)
+        self.assertRaises(TypeError, alg_c.get_jalali_date_from_julian_day, '2445218.5')
+        self.assertEqual(alg_c.get_jalali_date_from_julian_day(2445218), (1361, 6, 15))
+        self.assertRaises(TypeError, alg_c.get_jalali_dates_from_gregorian_dates, array('i'))
+
+        # Out of the cached integers
+        self.assertEqual(alg_c.get_jalali_date_from_day_number(3000000), alg_p.get_jalali_date_from_day_number(3000000))
+        self.assertEqual(alg_c.get_jalali_date_from_day_number(0), alg_p.get_jalali_date_from_day_number(0))
+
+    def test_large_years(self):
+        # The same as the python implementation to the limits, and out of them the int arithmetic would overflow
+        for year in (-5000000, -4999999, 4999999, 5000000):
+            for name in ('get_day_number_from_jalali_date', 'get_day_number_from_gregorian_date',
+                         'get_julian_day_from_jalali_date', 'get_jalali_date_from_gregorian_date',
+                         'get_gregorian_date_from_jalali_date'):
+                self.assertEqual(getattr(alg_c, name)(year, 12, 29), getattr(alg_p, name)(year, 12, 29))
+
+        for day_number in (-1800000000, 1800000000):
+            self.assertEqual(
+                alg_c.get_jalali_date_from_day_number(day_number),
+                alg_p.get_jalali_date_from_day_number(day_number)
+            )
+            self.assertEqual(
+                alg_c.get_gregorian_date_from_day_number(day_number),
+                alg_p.get_gregorian_date_from_day_number(day_number)
+            )
+
+        self.assertRaises(OverflowError, alg_c.get_day_number_from_jalali_date, 5000001, 1, 1)
+        self.assertRaises(OverflowError, alg_c.get_day_number_from_gregorian_date, -5000001, 1, 1)
+        self.assertRaises(OverflowError, alg_c.get_julian_day_from_gregorian_date, 2 ** 31 - 1, 1, 1)
+        self.assertRaises(OverflowError, alg_c.get_gregorian_date_from_jalali_date, -2 ** 31, 1, 1)
+        self.assertRaises(OverflowError, alg_c.get_jalali_date_from_day_number, 1800000001)
+        self.assertRaises(OverflowError, alg_c.get_gregorian_date_from_day_number, -2 ** 31)
+        self.assertRaises(OverflowError, alg_c.get_jalali_date_from_julian_day, 1e30)
+        self.assertEqual(alg_c.is_jalali_leap_year(-2 ** 31), alg_p.is_jalali_leap_year(-2 ** 31))
+        with self.assertRaises(OverflowError) as context:
+            alg_c.get_jalali_dates_from_gregorian_dates(
+                array('i', [1982, 2 ** 31 - 1]), array('i', [9, 9]), array('i', [6, 6]),
+                *[array('i', [0, 0]) for _ in range(3)]
+            )
+        self.assertTrue(str(context.exception).endswith('at row: 1'))
+
+    def test_jalali_date_base(self):
+        for base in (alg_c.JalaliDateBase, alg_p.JalaliDateBase):
+            class Date(base):
+                pass
+
+            d = Date(1361, 6, 15)
+            self.assertEqual((d.year, d.month, d.day), (1361, 6, 15))
+            self.assertEqual(d.tojulianday(), 2445218)
+            self.assertEqual(d.toordinal(), 496899)
+            self.assertEqual(Date(1, 1, 1).toordinal(), 1)
+            self.assertEqual(Date('1361', 6.0, 15).tojulianday(), 2445218)
+            self.assertEqual(Date().tojulianday(), 1948320)
+            self.assertEqual(Date(date(1982, 9, 6)).tojulianday(), 2445218)
+            self.assertEqual(Date(datetime(1982, 9, 6, 1)).tojulianday(), 2445218)
+            self.assertEqual(Date(julian_day=2445218.5).tojulianday(), 2445218)
+            self.assertEqual(Date(d).tojulianday(), 2445218)
+            self.assertEqual(Date(year=1361, day=2).tojulianday(), 2445218 - 168)
+            self.assertRaises(ValueError, Date, julian_day=1)
+            self.assertEqual(Date(julian_day=2445218.0).tojulianday(), 2445218)
+            self.assertRaises(ValueError, Date, julian_day=2445218.9)
+            self.assertRaises(ValueError, Date, julian_day=2445218.25)
+            self.assertRaises(TypeError, Date, julian_day='2445218')
+            self.assertRaises(ValueError, Date, date(1, 1, 1))
+            self.assertEqual(base._validate('1361', 6, 15), (1361, 6, 15))
+            self.assertEqual(d.__reduce__(), (Date, (1361, 6, 15)))
+            self.assertRaises(ValueError, Date, 0, 1, 1)
+            self.assertRaises(ValueError, Date, 2 ** 80, 1, 1)
+            self.assertRaises(ValueError, Date, 1361, 13, 1)
+            self.assertRaises(ValueError, Date, 1361, 12, 30)
+            self.assertRaises(ValueError, Date, 1375, 12, 31)
+
+            # Arithmetic
+            self.assertIsInstance(d + timedelta(days=1), Date)
+            self.assertEqual((d + timedelta(days=200)).tojulianday(), 2445418)
+            self.assertEqual((d - timedelta(days=1)).day, 14)
+            self.assertEqual(d - Date(1361, 1, 1), timedelta(days=169))
+            self.assertRaises(ValueError, d.__sub__, timedelta(days=496899))
+            self.assertRaises(ValueError, d.__add__, timedelta(days=700000))
+            self.assertRaises(TypeError, d.__add__, 1)
+            self.assertRaises(TypeError, d.__sub__, 1)
+
+            # The trusted constructors
+            self.assertIsInstance(Date._from_fields(1361, 6, 15), Date)
+            self.assertEqual(Date._from_fields(1361, 6, 15).tojulianday(), 2445218)
+            self.assertIsInstance(Date._from_day_number(2445218), Date)
+            self.assertEqual((Date._from_day_number(2445218).year, Date._from_day_number(2445218).day), (1361, 15))
+            self.assertRaises(ValueError, Date._from_day_number, 1)
+
+            # Comparison
+            self.assertTrue(d == Date(1361, 6, 15))
+            self.assertTrue(d != Date(1361, 6, 16))
+            self.assertTrue(d < Date(1361, 6, 16) <= Date(1361, 6, 16))
+            self.assertTrue(d > Date(1361, 6, 14) >= Date(1361, 6, 14))
+            self.assertTrue(d == date(1982, 9, 6))
+            self.assertTrue(d != date(1982, 9, 7))
+            self.assertFalse(d == datetime(1982, 9, 6))
+            self.assertFalse(d == 0)
+            self.assertFalse(d == None)
+            self.assertRaises(TypeError, d.__eq__, dict(a=1))
+            self.assertRaises(TypeError, d.__lt__, date(1982, 9, 6))
+            self.assertEqual(hash(d), hash(Date(1361, 6, 15)))
+            self.assertEqual(len({d, Date(1361, 6, 15), Date(1361, 6, 16)}), 2)
+
+            # The fields are writable
+            d.year, d.month = 1375, 12
+            self.assertEqual(d.tojulianday(), Date(1375, 12, 15).tojulianday())
+            self.assertRaises(ValueError, setattr, d, 'year', 0)
+            self.assertRaises(ValueError, setattr, d, 'month', 13)
+            self.assertRaises(ValueError, setattr, d, 'day', 32)
+
+            # The day is checked against the month of the new year and month
+            d = Date(1395, 12, 30)
+            self.assertRaises(ValueError, setattr, d, 'year', 1394)
+            self.assertEqual((d.year, d.tojulianday()), (1395, Date(1395, 12, 30).tojulianday()))
+            d.month, d.day = 6, 31
+            self.assertRaises(ValueError, setattr, d, 'month', 7)
+            self.assertEqual(d.tojulianday(), Date(1395, 6, 31).tojulianday())
+
+    def test_batch_conversions(self):
+        ordinals = range(date(622, 3, 22).toordinal(), date(3000, 1, 1).toordinal(), 13)
+        dates = [date.fromordinal(o) for o in ordinals]
+        expected = [alg_p.get_jalali_date_from_day_number(o + 1721424) for o in ordinals]
+
+        for alg in (alg_c, alg_p):
+            years = array('i', [d.year for d in dates])
+            months = array('i', [d.month for d in dates])
+            days = array('i', [d.day for d in dates])
+            out_years, out_months, out_days = array('i', years), array('i', months), array('i', days)
+
+            self.assertEqual(
+                alg.get_jalali_dates_from_gregorian_dates(years, months, days, out_years, out_months, out_days),
+                len(dates)
+            )
+            self.assertEqual(list(zip(out_years, out_months, out_days)), expected)
+
+            # In place, and raw bytes as the input
+            self.assertEqual(
+                alg.get_gregorian_dates_from_jalali_dates(
+                    out_years.tobytes(), out_months, out_days, out_years, out_months, out_days),
+                len(dates)
+            )
+            self.assertEqual(list(zip(out_years, out_months, out_days)), [(d.year, d.month, d.day) for d in dates])
+
+            self.assertRaises(
+                ValueError, alg.get_jalali_dates_from_gregorian_dates,
+                array('i', [2015]), array('i', [2]), array('i', [29]), array('i', [0]), array('i', [0]), array('i', [0])
+            )
+            self.assertRaises(
+                ValueError, alg.get_jalali_dates_from_gregorian_dates,
+                years, months, days, array('i', [0]), out_months, out_days
+            )
+            self.assertRaises(
+                TypeError, alg.get_jalali_dates_from_gregorian_dates,
+                array('d', [1.0]), array('i', [2]), array('i', [1]), array('i', [0]), array('i', [0]), array('i', [0])
+            )
+
+    def test_batch_conversions_invalid_rows(self):
+        invalid_rows = {
+            'get_jalali_dates_from_gregorian_dates': [
+                (2015, 0, 1), (2015, 13, 1), (2015, 1, 0), (2015, 1, 32), (2015, 4, 31), (2015, 2, 29)],
+            'get_gregorian_dates_from_jalali_dates': [
+                (1394, 0, 1), (1394, 13, 1), (1394, 1, 0), (1394, 1, 32), (1394, 7, 31), (1394, 12, 30)],
+        }
+        for name, rows in invalid_rows.items():
+            for row in rows:
+                # The invalid row is the second one
+                columns = [array('i', [v, v]) for v in (1394, 1, 1)]
+                for column, value in zip(columns, row):
+                    column[1] = value
+                messages = set()
+                for alg in (alg_c, alg_p, alg_t):
+                    outputs = [array('i', [0, 0]) for _ in range(3)]
+                    with self.assertRaises(ValueError) as context:
+                        getattr(alg, name)(*columns + outputs)
+                    messages.add(str(context.exception))
+                self.assertEqual(len(messages), 1, messages)
+                self.assertTrue(messages.pop().endswith('at row: 1'))
+
+    def test_batch_conversion_threads(self):
+        ordinals = range(date(622, 3, 22).toordinal(), date(3000, 1, 1).toordinal(), 7)
+        dates = [date.fromordinal(o) for o in ordinals]
+        expected = [alg_p.get_jalali_date_from_day_number(o + 1721424) for o in ordinals]
+        years = array('i', [d.year for d in dates])
+        months = array('i', [d.month for d in dates])
+        days = array('i', [d.day for d in dates])
+        outputs = [array('i', [0]) * len(dates) for _ in range(3)]
+        columns = [memoryview(c) for c in [years, months, days] + outputs]
+        chunk_size = len(dates) // 4 + 1
+
+        def convert(start):
+            alg_c.get_jalali_dates_from_gregorian_dates(*[c[start:start + chunk_size] for c in columns])
+
+        threads = [threading.Thread(target=convert, args=(i, )) for i in range(0, len(dates), chunk_size)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(list(zip(*outputs)), expected)
+
+        # The invalid row is reported after the loop, which runs without the GIL
+        months[-1], days[-1] = 2, 30
+        self.assertRaises(ValueError, alg_c.get_jalali_dates_from_gregorian_dates, years, months, days, *outputs)
+
+    @unittest.skipIf(sys.version_info.major < 3, 'The array.array does not provide the new buffer on python 2')
+    def test_leap_rule_swap_threads(self):
+        from khayyam import algorithms
+        from khayyam.leap_years import ASTRONOMICAL_LEAP_YEARS
+        ordinals = range(date(1900, 1, 1).toordinal(), date(2100, 1, 1).toordinal())
+        dates = [date.fromordinal(o) for o in ordinals]
+        columns = [array('i', [getattr(d, f) for d in dates]) for f in ('year', 'month', 'day')]
+        arithmetic = [alg_c.get_jalali_date_from_day_number(o + 1721424) for o in ordinals]
+        done = threading.Event()
+        errors = []
+
+        def convert():
+            outputs = [array('i', [0]) * len(dates) for _ in range(3)]
+            try:
+                while not done.is_set():
+                    alg_c.get_jalali_dates_from_gregorian_dates(*columns + outputs)
+                    for row, valid in zip(zip(*outputs), expected):
+                        assert row in valid, row
+            except Exception as ex:  # pragma: no cover
+                errors.append(ex)
+
+        # Each row is converted by one of the rules, while the rule is swapped by another thread
+        threads = []
+        algorithms.use_leap_rule('astronomical')
+        try:
+            expected = [
+                (a, alg_c.get_jalali_date_from_day_number(o + 1721424)) for o, a in zip(ordinals, arithmetic)
+            ]
+            threads = [threading.Thread(target=convert) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for _ in range(2000):
+                alg_c.set_leap_years(None)
+                alg_c.set_leap_years(ASTRONOMICAL_LEAP_YEARS)
+        finally:
+            done.set()
+            for t in threads:
+                t.join()
+            algorithms.use_leap_rule('arithmetic')
+
+        self.assertEqual(errors, [])
+        self.assertNotEqual([e[0] for e in expected], [e[1] for e in expected])
+
+    def test_table_backend(self):
+        self.assertEqual(len(alg_t.YEAR_STARTS), MAXYEAR - MINYEAR + 2)
+
+        for n in range(alg_t.YEAR_STARTS[0] - 400, alg_t.YEAR_STARTS[-1] + 400):
+            c = alg_c.get_jalali_date_from_day_number(n)
+            self.assertEqual(c, alg_t.get_jalali_date_from_day_number(n), "Day number: %s" % n)
+            self.assertEqual(alg_t.get_day_number_from_jalali_date(*c), n)
+
+        for y in range(MINYEAR - 10, MAXYEAR + 10):
+            self.assertEqual(alg_c.is_jalali_leap_year(y), alg_t.is_jalali_leap_year(y))
+            self.assertEqual(alg_c.get_days_in_jalali_month(y, 12), alg_t.get_days_in_jalali_month(y, 12))
+
+        for jd in range(1948320, 1948320 + 365 * 200, 3):
+            self.assertEqual(alg_c.get_jalali_date_from_julian_day(jd), alg_t.get_jalali_date_from_julian_day(jd))
+            self.assertEqual(alg_c.get_julian_day_from_jalali_date(*alg_t.get_jalali_date_from_julian_day(jd)),
+                             alg_t.get_julian_day_from_jalali_date(*alg_t.get_jalali_date_from_julian_day(jd)))
+
+        self.assertEqual(alg_t.get_jalali_date_from_gregorian_date(1982, 9, 6), (1361, 6, 15))
+        self.assertEqual(alg_t.get_gregorian_date_from_jalali_date(1361, 6, 15), (1982, 9, 6))
+
     def test_algorithm_import(self):
         from khayyam import algorithms
         self.assertTrue(hasattr(algorithms, 'is_jalali_leap_year'))
@@ -100,7 +458,274 @@ class TestCAlgorithms(unittest.TestCase):
         self.assertTrue(hasattr(algorithms, 'get_julian_day_from_jalali_date'))
         self.assertTrue(hasattr(algorithms, 'get_jalali_date_from_julian_day'))
         self.assertTrue(hasattr(algorithms, 'get_jalali_date_from_gregorian_date'))
+        self.assertTrue(hasattr(algorithms, 'get_gregorian_date_from_jalali_date'))
         self.assertTrue(hasattr(algorithms, 'get_gregorian_date_from_julian_day'))
+        self.assertTrue(hasattr(algorithms, 'get_day_number_from_gregorian_date'))
+        self.assertTrue(hasattr(algorithms, 'get_gregorian_date_from_day_number'))
+        self.assertTrue(hasattr(algorithms, 'get_day_number_from_jalali_date'))
+        self.assertTrue(hasattr(algorithms, 'get_jalali_date_from_day_number'))
+        self.assertTrue(hasattr(algorithms, 'get_jalali_dates_from_gregorian_dates'))
+        self.assertTrue(hasattr(algorithms, 'get_gregorian_dates_from_jalali_dates'))
+
+    def test_backends(self):
+        from khayyam import JalaliDate
+        modules = {'c': alg_c, 'table': alg_t, 'pure': alg_p}
+        self.assertEqual(
+            algorithms.backend,
+            os.environ.get(algorithms.BACKEND_ENVIRON) or algorithms.available_backends()[0]
+        )
+        self.assertEqual(algorithms.available_backends(), [n for n in algorithms.BACKENDS if n in modules])
+
+        algorithms.use_memoization(0)
+        for name in algorithms.available_backends():
+            algorithms.use_backend(name)
+            self.assertEqual(algorithms.backend, name)
+            for function_name in algorithms.FUNCTIONS:
+                self.assertIs(getattr(algorithms, function_name), getattr(modules[name], function_name))
+            self.assertEqual(JalaliDate(1361, 6, 15).todate(), date(1982, 9, 6))
+
+        self.assertRaises(ValueError, algorithms.use_backend, 'invalid')
+        self.assertEqual(algorithms.backend, name)
+
+    def test_backend_environ(self):
+        env = dict(os.environ, KHAYYAM_ALGORITHMS_BACKEND='pure', PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'from khayyam import algorithms; print(algorithms.backend)'],
+            env=env
+        )
+        self.assertEqual(output.decode().strip(), 'pure')
+
+    def test_leap_rules(self):
+        from khayyam import algorithms, JalaliDate
+        from khayyam.leap_years import ASTRONOMICAL_LEAP_YEARS
+        self.assertEqual(algorithms.leap_rule, 'arithmetic')
+        self.assertEqual(JalaliDate(1404, 1, 1).todate(), date(2025, 3, 20))
+        arithmetic_starts = alg_p.create_year_starts()
+        self.assertEqual(alg_t.YEAR_STARTS, arithmetic_starts)
+
+        try:
+            algorithms.use_leap_rule('astronomical')
+            self.assertEqual(algorithms.leap_rule, 'astronomical')
+
+            # The official calendar
+            self.assertEqual(
+                [y for y in range(1370, 1420) if algorithms.is_jalali_leap_year(y)],
+                [1370, 1375, 1379, 1383, 1387, 1391, 1395, 1399, 1403, 1408, 1412, 1416]
+            )
+            self.assertEqual(JalaliDate(1404, 1, 1).todate(), date(2025, 3, 21))
+            self.assertEqual(JalaliDate(1403, 12, 30).todate(), date(2025, 3, 20))
+            self.assertRaises(ValueError, JalaliDate, 1404, 12, 30)
+            self.assertEqual(JalaliDate.strptime('1403/12/30', '%Y/%m/%d').strftime(u'%x'), u'پنجشنبه ۳۰ اسفند ۱۴۰۳')
+
+            year_starts = alg_p.create_year_starts(ASTRONOMICAL_LEAP_YEARS)
+            self.assertEqual(alg_t.YEAR_STARTS, year_starts)
+            self.assertEqual((year_starts[0], year_starts[-1]), (arithmetic_starts[0], arithmetic_starts[-1]))
+            for y in range(MINYEAR, MAXYEAR + 1):
+                leap = year_starts[y] - year_starts[y - 1] == 366
+                for alg in (alg_c, alg_t, alg_p):
+                    self.assertEqual(alg.is_jalali_leap_year(y), leap)
+                    self.assertEqual(alg.get_day_number_from_jalali_date(y, 1, 1), year_starts[y - 1])
+                    self.assertEqual(alg.get_days_in_jalali_month(y, 12), 30 if leap else 29)
+                    self.assertEqual(alg.get_jalali_date_from_day_number(year_starts[y] - 1)[:2], (y, 12))
+                    self.assertEqual(alg.get_jalali_date_from_julian_day(year_starts[y - 1] + .5), (y, 1, 1))
+                    self.assertEqual(alg.get_julian_day_from_jalali_date(y, 1, 1), year_starts[y - 1] + .5)
+
+            for n in range(year_starts[0] - 400, year_starts[-1] + 400, 7):
+                expected = alg_c.get_jalali_date_from_day_number(n)
+                self.assertEqual(alg_t.get_jalali_date_from_day_number(n), expected)
+                self.assertEqual(alg_p.get_jalali_date_from_day_number(n), expected)
+                self.assertEqual(alg_c.get_day_number_from_jalali_date(*expected), n)
+
+            self.assertRaises(ValueError, alg_c.set_leap_years, b'\x00')
+            self.assertRaises(TypeError, alg_c.set_leap_years, 1)
+        finally:
+            algorithms.use_leap_rule('arithmetic')
+
+        self.assertEqual(JalaliDate(1404, 1, 1).todate(), date(2025, 3, 20))
+        self.assertEqual(alg_t.YEAR_STARTS, arithmetic_starts)
+        self.assertRaises(ValueError, algorithms.use_leap_rule, 'invalid')
+
+        env = dict(os.environ, KHAYYAM_LEAP_RULE='astronomical', PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'from khayyam import JalaliDate; print(JalaliDate(1403, 12, 30).todate())'],
+            env=env
+        )
+        self.assertEqual(output.decode().strip(), '2025-03-20')
+
+    def test_bulk_leap_years(self):
+        from khayyam import algorithms
+        leap_years = algorithms.get_jalali_leap_years()
+        days_in_years = algorithms.get_days_in_jalali_years()
+        days_in_months = algorithms.get_days_in_jalali_months()
+        self.assertEqual((len(leap_years), len(days_in_years), len(days_in_months)), (3178, 3178, 3178 * 12))
+        for y in range(MINYEAR, MAXYEAR + 1):
+            index = y - MINYEAR
+            self.assertEqual(leap_years[index], alg_c.is_jalali_leap_year(y))
+            self.assertEqual(days_in_years[index], alg_c.get_days_in_jalali_year(y))
+            self.assertEqual(
+                list(days_in_months[index * 12:index * 12 + 12]),
+                [alg_c.get_days_in_jalali_month(y, m) for m in range(1, 13)]
+            )
+
+        self.assertEqual(list(algorithms.get_jalali_leap_years(1394, 1400)), [0, 1, 0, 0, 0, 1])
+        self.assertEqual(list(algorithms.get_days_in_jalali_years(1395, 1397)), [366, 365])
+        self.assertEqual(list(algorithms.get_days_in_jalali_months(1395, 1396)), [31] * 6 + [30] * 6)
+        self.assertEqual(len(algorithms.get_days_in_jalali_months(1395, 1395)), 0)
+        self.assertRaises(ValueError, algorithms.get_jalali_leap_years, 0, 10)
+        self.assertRaises(ValueError, algorithms.get_days_in_jalali_months, 1, MAXYEAR + 2)
+        self.assertRaises(ValueError, algorithms.get_days_in_jalali_years, 10, 1)
+
+        # The results are copies of the cached table
+        days_in_months[0] = 0
+        self.assertEqual(algorithms.get_days_in_jalali_months(1, 2)[0], 31)
+
+        try:
+            algorithms.use_leap_rule('astronomical')
+            self.assertEqual(list(algorithms.get_jalali_leap_years(1403, 1405)), [1, 0])
+            self.assertRaises(ValueError, alg_p.JalaliDateBase._validate, 1404, 12, 30)
+            self.assertEqual(alg_p.JalaliDateBase._validate(1403, 12, 30), (1403, 12, 30))
+        finally:
+            algorithms.use_leap_rule('arithmetic')
+        self.assertEqual(list(algorithms.get_jalali_leap_years(1403, 1405)), [0, 1])
+
+    @unittest.skipUnless(numpy, 'Requires the numpy')
+    def test_bulk_leap_years_numpy(self):  # pragma: no cover
+        from khayyam import algorithms
+        days_in_months = algorithms.get_days_in_jalali_months(1394, 1396, numpy=True)
+        self.assertEqual(days_in_months.shape, (2, 12))
+        self.assertEqual(days_in_months[1].tolist(), [31] * 6 + [30] * 6)
+        self.assertEqual(algorithms.get_days_in_jalali_years(1395, 1397, numpy=True).tolist(), [366, 365])
+        self.assertEqual(algorithms.get_jalali_leap_years(1395, 1397, numpy=True).tolist(), [1, 0])
+
+    def test_ordinals(self):
+        from khayyam import algorithms, JalaliDate
+        self.assertEqual(algorithms.from_gregorian_ordinal(date(622, 3, 22).toordinal()), 1)
+        self.assertEqual(algorithms.to_gregorian_ordinal(1), date(622, 3, 22).toordinal())
+        self.assertEqual(algorithms.from_epoch_day(0), JalaliDate(1348, 10, 11).toordinal())
+        self.assertEqual(algorithms.to_epoch_day(JalaliDate(1348, 10, 11).toordinal()), 0)
+        self.assertEqual(algorithms.to_epoch_day(JalaliDate(1348, 10, 10).toordinal()), -1)
+
+        d = date(622, 3, 22)
+        while d.year < 3790:
+            ordinal = algorithms.from_gregorian_ordinal(d.toordinal())
+            j = JalaliDate(d)
+            self.assertEqual(ordinal, j.toordinal())
+            self.assertEqual(algorithms.to_gregorian_ordinal(ordinal), d.toordinal())
+            self.assertEqual(algorithms.from_epoch_day((d - date(1970, 1, 1)).days), ordinal)
+            self.assertEqual(j.todate(), d)
+            self.assertEqual(j, d)
+            d += timedelta(days=97)
+
+    def test_memoization(self):
+        from khayyam.helpers import _lru_cache
+        algorithms.use_memoization(0)
+        self.assertEqual(algorithms.cache_info(), {})
+        self.assertRaises(ValueError, algorithms.use_memoization, -1)
+        try:
+            algorithms.use_memoization(2)
+            for _ in range(3):
+                self.assertEqual(algorithms.get_jalali_date_from_gregorian_date(1982, 9, 6), (1361, 6, 15))
+            self.assertEqual(algorithms.get_gregorian_date_from_julian_day(2445218.5), (1982, 9, 6))
+            self.assertEqual(algorithms.get_julian_day_from_jalali_date(1361, 6, 15), 2445218.5)
+            self.assertRaises(ValueError, algorithms.get_jalali_date_from_gregorian_date, 2015, 2, 30)
+            info = algorithms.cache_info()
+            self.assertEqual(list(info), list(algorithms.MEMOIZED_FUNCTIONS))
+            # The interpreters disagree on counting the call which raises as a miss
+            jalali_info = info['get_jalali_date_from_gregorian_date']
+            self.assertEqual((jalali_info.hits, jalali_info.maxsize, jalali_info.currsize), (2, 2, 1))
+            self.assertEqual(info['get_gregorian_date_from_julian_day'], (0, 1, 2, 1))
+            self.assertEqual(info['get_julian_day_from_jalali_date'], (0, 1, 2, 1))
+
+            # The caches are kept by switching the backends, and cleared by switching the leap rules
+            algorithms.use_backend('pure')
+            self.assertEqual(algorithms.get_jalali_date_from_gregorian_date(1982, 9, 6), (1361, 6, 15))
+            self.assertEqual(algorithms.cache_info()['get_jalali_date_from_gregorian_date'].currsize, 1)
+            algorithms.use_leap_rule('arithmetic')
+            self.assertEqual(algorithms.cache_info()['get_jalali_date_from_gregorian_date'], (0, 0, 2, 0))
+        finally:
+            algorithms.use_memoization(0)
+        self.assertEqual(algorithms.cache_info(), {})
+        self.assertIs(algorithms.get_julian_day_from_jalali_date, alg_p.get_julian_day_from_jalali_date)
+
+        # The fallback of the interpreters without the functools.lru_cache
+        cached = _lru_cache(2)(alg_p.get_jalali_date_from_day_number)
+        for n in (2445218, 2445218, 2445219, 2445220, 2445218):
+            self.assertEqual(cached(n), alg_p.get_jalali_date_from_day_number(n))
+        self.assertEqual(cached.cache_info(), (1, 4, 2, 2))
+        self.assertRaises(ValueError, _lru_cache(2)(alg_p.get_gregorian_date_from_julian_day), 0)
+        cached.cache_clear()
+        self.assertEqual(cached.cache_info(), (0, 0, 2, 0))
+
+    def test_threads_stress(self):
+        from khayyam import JalaliDate
+        day_numbers = range(1948320, 1948320 + 365 * 3177, 997)
+        expected = [
+            (alg_p.get_jalali_date_from_day_number(n), alg_p.get_gregorian_date_from_day_number(n))
+            for n in day_numbers
+        ]
+        shared = JalaliDate(1361, 6, 15)
+        barrier = threading.Event()
+        errors = []
+
+        def work(index):
+            barrier.wait()
+            try:
+                for _ in range(3):
+                    for n, (jalali, gregorian) in zip(day_numbers, expected):
+                        d = JalaliDate(*jalali)
+                        assert alg_c.get_jalali_date_from_day_number(n) == jalali
+                        assert alg_c.get_gregorian_date_from_jalali_date(*jalali) == gregorian
+                        assert d.tojulianday() == n
+                        assert (d > shared) == (n > 2445218)
+                        assert d.strftime('%Y/%m/%d') == '%.4d/%.2d/%.2d' % jalali
+            except Exception as ex:  # pragma: no cover
+                errors.append((index, ex))
+
+        threads = [threading.Thread(target=work, args=(i, )) for i in range(8)]
+        for t in threads:
+            t.start()
+        barrier.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+
+    @unittest.skipUnless(sysconfig.get_config_var('Py_GIL_DISABLED'), 'Requires a free-threaded python build')
+    def test_free_threading(self):  # pragma: no cover
+        # The thread tests are run by a new interpreter, which must not enable the GIL when importing the extension.
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        env.pop('PYTHON_GIL', None)
+        tests = ['TestCAlgorithms.%s' % name for name in (
+            'test_threads_stress', 'test_batch_conversion_threads', 'test_leap_rule_swap_threads'
+        )]
+        output = subprocess.check_output(
+            [sys.executable, '-c', (
+                'import sys, unittest, khayyam\n'
+                'result = unittest.main(module="khayyam.tests.test_algorithms", argv=["test"] + %r, exit=False).result\n'
+                'print(sys._is_gil_enabled(), result.wasSuccessful())'
+            ) % tests],
+            env=env
+        )
+        self.assertEqual(output.decode().split(), ['False', 'True'])
+
+    @unittest.skipUnless(_interpreters, 'Requires the sub-interpreters of python 3.13')
+    def test_sub_interpreters(self):  # pragma: no cover
+        # The state of the extension is shared by the process, so it's refused by the interpreters with their own GIL.
+        script = (
+            'import sys\n'
+            'sys.path[:] = %r\n'
+            'try:\n'
+            '    import khayyam.algorithms_c\n'
+            'except ImportError:\n'
+            '    raise SystemExit("refused")\n'
+        ) % sys.path
+        for config, expected in (('isolated', 'refused'), ('legacy', None)):
+            interpreter = _interpreters.create(config)
+            try:
+                error = _interpreters.exec(interpreter, script)
+            finally:
+                _interpreters.destroy(interpreter)
+            self.assertEqual(error and error.msg, expected)
 
 
 if __name__ == '__main__':  # pragma: no cover
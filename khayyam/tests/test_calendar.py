@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import timedelta
+from khayyam import JalaliDate, SATURDAY, SUNDAY, FRIDAY, MAXYEAR, calendar
+
+__author__ = 'vahid'
+
+
+class TestCalendar(unittest.TestCase):
+
+    def test_monthrange(self):
+        self.assertEqual(calendar.monthrange(1395, 12), (1, 30))
+        self.assertEqual(calendar.monthrange(1394, 12), (0, 29))
+        self.assertEqual(calendar.monthrange(1361, 6), (2, 31))
+        self.assertRaises(ValueError, calendar.monthrange, 1395, 13)
+        self.assertRaises(ValueError, calendar.monthrange, 0, 1)
+
+    def test_iterweekdays(self):
+        self.assertEqual(list(calendar.iterweekdays()), [0, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(list(calendar.iterweekdays(FRIDAY)), [6, 0, 1, 2, 3, 4, 5])
+
+    def test_monthcalendar(self):
+        self.assertEqual(calendar.monthcalendar(1395, 12), (
+            (0, 1, 2, 3, 4, 5, 6),
+            (7, 8, 9, 10, 11, 12, 13),
+            (14, 15, 16, 17, 18, 19, 20),
+            (21, 22, 23, 24, 25, 26, 27),
+            (28, 29, 30, 0, 0, 0, 0),
+        ))
+        self.assertEqual(calendar.monthcalendar(1395, 12, SUNDAY)[0], (1, 2, 3, 4, 5, 6, 7))
+        self.assertEqual(calendar.monthcalendar(1395, 12, SUNDAY)[-1], (29, 30, 0, 0, 0, 0, 0))
+        self.assertEqual(len(calendar.monthcalendar(1394, 3, SATURDAY)), 6)
+        self.assertEqual(len(calendar.monthcalendar(1394, 12, SATURDAY)), 5)
+        self.assertRaises(ValueError, calendar.monthcalendar, 1395, 0)
+        self.assertRaises(ValueError, calendar.monthcalendar, 1395, 1, 7)
+
+        # The grids agree with the dates
+        for year in range(1, MAXYEAR + 1, 97):
+            for month in range(1, 13):
+                for firstweekday in range(7):
+                    weeks = calendar.monthcalendar(year, month, firstweekday)
+                    days = [d for d in calendar.itermonthdays(year, month, firstweekday) if d]
+                    self.assertEqual(days, list(range(1, JalaliDate(year, month, 1).daysinmonth + 1)))
+                    for week in weeks:
+                        self.assertEqual(len(week), 7)
+                        for i, day in enumerate(week):
+                            if day:
+                                self.assertEqual(JalaliDate(year, month, day).weekday(), (firstweekday + i) % 7)
+
+    def test_dates(self):
+        weeks = calendar.monthdatescalendar(1395, 1)
+        self.assertEqual(weeks[0][0], JalaliDate(1394, 12, 29))
+        self.assertEqual(weeks[-1][-1], JalaliDate(1395, 2, 3))
+        self.assertEqual(list(calendar.itermonthdates(1395, 1)), [d for week in weeks for d in week])
+        self.assertEqual(
+            [d.day if d.month == 1 else 0 for week in weeks for d in week],
+            list(calendar.itermonthdays(1395, 1)))
+        self.assertTrue(all(b - a == timedelta(days=1) for a, b in zip(weeks[0], weeks[0][1:])))
+        self.assertIsNot(calendar.monthdatescalendar(1395, 1)[0][0], weeks[0][0])
+
+        # The days out of the supported range
+        self.assertEqual(calendar.monthdatescalendar(1, 1)[0], [None] * 6 + [JalaliDate(1, 1, 1)])
+        self.assertEqual(calendar.monthdatescalendar(MAXYEAR, 12)[-1][-2:], [None, None])
+        self.assertEqual(next(calendar.itermonthdates(1, 1)), JalaliDate(1, 1, 1))
+        self.assertEqual(list(calendar.itermonthdates(MAXYEAR, 12))[-1], JalaliDate.max)
+
+    def test_cache(self):
+        calendar.cache_clear()
+        self.assertEqual(calendar.cache_info()[:2], (0, 0))
+        first = calendar.monthcalendar(1395, 12)
+        self.assertIs(calendar.monthcalendar(1395, 12), first)
+        calendar.monthdatescalendar(1395, 12)
+        calendar.monthcalendar(1395, 12, SUNDAY)
+        self.assertEqual(calendar.cache_info()[:2], (2, 2))
+        calendar.cache_clear()
+        self.assertEqual(calendar.cache_info().currsize, 0)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
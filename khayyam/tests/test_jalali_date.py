@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import pickle
 import time
 import unittest
-from khayyam import JalaliDate, MAXYEAR
+from khayyam import JalaliDate, JalaliDatetime, MAXYEAR, SATURDAY, WEDNESDAY, FRIDAY
+from khayyam import jalali_date, algorithms
 from datetime import timedelta, date
 __author__ = 'vahid'
 
@@ -10,6 +12,12 @@ class TestJalaliDate(unittest.TestCase):
     
     def setUp(self):
         self.leap_year = 1375
+        # The instance cache may be enabled by the environment
+        cache_info = jalali_date.instance_cache_info()
+        self.instance_cache_size = cache_info.maxsize if cache_info else 0
+
+    def tearDown(self):
+        jalali_date.use_instance_cache(self.instance_cache_size)
     
     def test_instantiate(self):
         
@@ -25,6 +33,13 @@ class TestJalaliDate(unittest.TestCase):
         self.assertRaises(ValueError, JalaliDate, MAXYEAR, 13, 23)
         self.assertRaises(ValueError, JalaliDate, MAXYEAR, 12, 30)
 
+        # The subclasses may still call the base __init__
+        class Date(JalaliDate):
+            def __init__(self, year, month, day):
+                super(Date, self).__init__(year, month, day)
+
+        self.assertEqual(Date(1394, 1, 1), JalaliDate(1394, 1, 1))
+
     def test_repr(self):
         jdate = JalaliDate(1376, 5, 23)
         self.assertEqual(repr(jdate), 'khayyam.JalaliDate(1376, 5, 23, Panjshanbeh)')
@@ -41,6 +56,9 @@ class TestJalaliDate(unittest.TestCase):
         jdate = JalaliDate(self.leap_year, 12, 23)
         jdate2 = JalaliDate(julian_day=jdate.tojulianday())
         self.assertEqual(jdate, jdate2)
+        self.assertEqual(JalaliDate(1361, 6, 15).tojulianday(), 2445218)
+        self.assertEqual(JalaliDate(julian_day=2445218.5), JalaliDate(1361, 6, 15))
+        self.assertRaises(ValueError, JalaliDate, julian_day=2445218.9)
         
     def test_to_from_date(self):
         jdate = JalaliDate(self.leap_year, 12, 23)
@@ -96,6 +114,14 @@ class TestJalaliDate(unittest.TestCase):
         self.assertEqual(min_.day, 1)
         self.assertEqual(min_, JalaliDate.min)
         self.assertEqual(max_, JalaliDate.max)
+        self.assertRaises(ValueError, JalaliDate.fromordinal, 0)
+        self.assertRaises(ValueError, JalaliDate.fromordinal, JalaliDate.max.toordinal() + 1)
+        self.assertIs(type(JalaliDate.fromordinal(1)), JalaliDate)
+
+        for ordinal in range(1, JalaliDate.max.toordinal() + 1, 97):
+            d = JalaliDate.min + timedelta(days=ordinal - 1)
+            self.assertEqual(JalaliDate.fromordinal(ordinal), d)
+            self.assertEqual(d.toordinal(), ordinal)
 
     def test_algorithm(self):
         min = date(623, 1, 1)
@@ -138,6 +164,114 @@ class TestJalaliDate(unittest.TestCase):
             JalaliDate(1361, 6, 15).timetuple(),
             time.struct_time((1361, 6, 15, 0, 0, 0, 2, 170, -1)))
 
+    def test_calendar_facts(self):
+        d = JalaliDate(1394, 1, 1)
+        for _ in range(800):
+            first_day_of_year = JalaliDate(d.year, 1, 1)
+            self.assertEqual(d.weekday(), (d.todate().weekday() + 2) % 7)
+            self.assertEqual(d.dayofyear(), (d - first_day_of_year).days + 1)
+            self.assertEqual(d.isleap, d.year == 1395)
+            for first_day_of_week in range(7):
+                offset = (first_day_of_week - first_day_of_year.weekday()) % 7
+                days = d.dayofyear() - 1
+                self.assertEqual(d.weekofyear(first_day_of_week), 0 if days < offset else (days - offset) // 7 + 1)
+            d += timedelta(days=1)
+
+        # The closed forms agree with the conversions over the whole range
+        for ordinal in range(1, JalaliDate.max.toordinal() + 1, 47):
+            d = JalaliDate.fromordinal(ordinal)
+            first_day_number = algorithms.get_day_number_from_jalali_date(d.year, 1, 1)
+            weekday = (d.todate().weekday() + 2) % 7
+            self.assertEqual((d.weekday(), d.dayofyear()), (weekday, d.tojulianday() - first_day_number + 1))
+            self.assertEqual(d.timetuple()[6:8], (d.weekday(), d.dayofyear()))
+            self.assertEqual(d.isleap, algorithms.get_days_in_jalali_year(d.year) == 366)
+            next_month = (d.year, d.month + 1) if d.month < 12 else (d.year + 1, 1)
+            self.assertEqual(
+                d.daysinmonth,
+                algorithms.get_day_number_from_jalali_date(next_month[0], next_month[1], 1) -
+                algorithms.get_day_number_from_jalali_date(d.year, d.month, 1)
+            )
+
+        # The derived fields follow the changes
+        d = JalaliDate(1395, 12, 30)
+        self.assertEqual((d.weekday(), d.dayofyear(), d.daysinmonth), (2, 366, 30))
+        self.assertRaises(ValueError, setattr, d, 'year', 1394)
+        d.day, d.year = 29, 1394
+        self.assertEqual((d.weekday(), d.dayofyear(), d.daysinmonth, d.isleap), (0, 365, 29, False))
+
+    def test_navigation(self):
+        d = JalaliDate(1394, 6, 31)
+        self.assertEqual(d.add_months(1), JalaliDate(1394, 7, 30))
+        self.assertEqual(d.add_months(6), JalaliDate(1394, 12, 29))
+        self.assertEqual(d.add_months(-7), JalaliDate(1393, 11, 30))
+        self.assertEqual(d.add_months(0), d)
+        self.assertEqual(d.add_months(12), JalaliDate(1395, 6, 31))
+        self.assertEqual(JalaliDate(1395, 12, 30).add_years(1), JalaliDate(1396, 12, 29))
+        self.assertEqual(JalaliDate(1395, 12, 30).add_years(-4), JalaliDate(1391, 12, 30))
+        self.assertRaises(ValueError, JalaliDate.max.add_months, 1)
+        self.assertRaises(ValueError, JalaliDate.min.add_years, -1)
+
+        d = JalaliDate(1394, 3, 24)
+        self.assertEqual(d.next(SATURDAY), JalaliDate(1394, 3, 30))
+        self.assertEqual(d.next(d.weekday()), JalaliDate(1394, 3, 31))
+        self.assertEqual(d.previous(WEDNESDAY), JalaliDate(1394, 3, 20))
+        self.assertEqual(d.previous(d.weekday()), JalaliDate(1394, 3, 17))
+        self.assertEqual(d.startofmonth(), JalaliDate(1394, 3, 1))
+        self.assertEqual(d.endofmonth(), JalaliDate(1394, 3, 31))
+        self.assertEqual(JalaliDate(1395, 12, 4).endofmonth(), JalaliDate(1395, 12, 30))
+        self.assertEqual(d.startofweek(), JalaliDate(1394, 3, 23))
+        self.assertEqual(d.startofweek(FRIDAY), JalaliDate(1394, 3, 22))
+        self.assertEqual(JalaliDate(1394, 3, 23).startofweek(), JalaliDate(1394, 3, 23))
+        self.assertRaises(ValueError, JalaliDate.max.next, SATURDAY)
+
+        for weekday in range(7):
+            self.assertEqual(d.next(weekday).weekday(), weekday)
+            self.assertTrue(0 < (d.next(weekday) - d).days <= 7)
+            self.assertEqual(d.previous(weekday).weekday(), weekday)
+            self.assertTrue(0 < (d - d.previous(weekday)).days <= 7)
+            self.assertEqual(d.startofweek(weekday).weekday(), weekday)
+            self.assertTrue(0 <= (d - d.startofweek(weekday)).days < 7)
+
+    def test_range(self):
+        start, stop = JalaliDate(1394, 12, 28), JalaliDate(1395, 1, 2)
+        self.assertEqual(
+            list(JalaliDate.range(start, stop)),
+            [JalaliDate(1394, 12, 28), JalaliDate(1394, 12, 29), JalaliDate(1395, 1, 1)])
+        self.assertEqual(
+            list(JalaliDate.range(stop, start, -2)),
+            [JalaliDate(1395, 1, 2), JalaliDate(1394, 12, 29)])
+        self.assertEqual(list(JalaliDate.range(start, stop, timedelta(days=3))), [start])
+        self.assertEqual(list(JalaliDate.range(stop, start)), [])
+        self.assertEqual(list(JalaliDate.range(start, start)), [])
+        self.assertEqual(list(JalaliDate.range(date(2016, 3, 18), date(2016, 3, 19))), [start])
+        self.assertEqual(
+            list(JalaliDate.range(JalaliDate(1394, 1, 31), JalaliDate(1395, 1, 1), 3, 'months')),
+            [JalaliDate(1394, 1, 31), JalaliDate(1394, 4, 31), JalaliDate(1394, 7, 30), JalaliDate(1394, 10, 30)])
+        self.assertEqual(
+            list(JalaliDate.range(JalaliDate(1395, 12, 30), JalaliDate(1390, 1, 1), -2, 'years')),
+            [JalaliDate(1395, 12, 30), JalaliDate(1393, 12, 29), JalaliDate(1391, 12, 30)])
+        self.assertEqual(
+            [d.weekday() for d in JalaliDate.range(start, JalaliDate(1395, 2, 1), unit='weeks')], [6] * 5)
+        self.assertEqual(
+            list(JalaliDate.range(JalaliDate.max - timedelta(days=1), JalaliDate.max, 1, 'months')),
+            [JalaliDate.max - timedelta(days=1)])
+        self.assertRaises(ValueError, JalaliDate.range, start, stop, 0)
+        self.assertRaises(ValueError, JalaliDate.range, start, stop, timedelta(hours=1))
+        self.assertRaises(ValueError, JalaliDate.range, start, stop, 1, 'hours')
+
+        # The same days as adding a timedelta, over the whole range
+        for step in (1, 3, 7, 29, 31, 367, -1, -6, -30, -400):
+            start, stop = (JalaliDate.min, JalaliDate.max) if step > 0 else (JalaliDate.max, JalaliDate.min)
+            count = (stop - start).days // step + ((stop - start).days % step != 0)
+            expected = [start + timedelta(days=i * step) for i in range(0, count, max(1, count // 1000))]
+            items = list(JalaliDate.range(start, stop, step))
+            self.assertEqual(len(items), count)
+            self.assertEqual(items[::max(1, count // 1000)], expected)
+            self.assertEqual(
+                [(d.year, d.month, d.day) for d in items[::max(1, count // 1000)]],
+                [(d.year, d.month, d.day) for d in expected])
+            self.assertTrue(all(type(d) is JalaliDate for d in items[:10]))
+
     def test_fromtimestamp(self):
         self.assertEqual(JalaliDate.fromtimestamp(1471628912.749938), JalaliDate(1395, 5, 29))
 
@@ -177,9 +311,70 @@ class TestJalaliDate(unittest.TestCase):
         self.assertFalse(d1 > d2)
         self.assertTrue(d1 >= d1.copy())
 
+    def test_pickle(self):
+        d = JalaliDate(1361, 6, 15)
+        self.assertEqual(pickle.loads(pickle.dumps(d)), d)
+        self.assertEqual(pickle.loads(pickle.dumps(d, 2)), d)
+        self.assertIs(type(pickle.loads(pickle.dumps(d))), JalaliDate)
+
     def test_hash(self):
         self.assertNotEqual(JalaliDate(1389, 2, 18), JalaliDate(1391, 12, 30))
 
+    def test_instance_cache(self):
+        jalali_date.use_instance_cache(0)
+        self.assertIsNone(jalali_date.instance_cache_info())
+        self.assertIsNot(JalaliDate.interned(1361, 6, 15), JalaliDate.interned(1361, 6, 15))
+        self.assertRaises(ValueError, jalali_date.use_instance_cache, -1)
+
+        jalali_date.use_instance_cache(2)
+        d = JalaliDate.interned(1361, 6, 15)
+        self.assertIs(JalaliDate.interned(1361, 6, 15), d)
+        self.assertIs(JalaliDate.interned('1361', 6, 15.0), d)
+        self.assertIs(JalaliDate.interned(date(1982, 9, 6)), d)
+        self.assertIs(JalaliDate.interned(julian_day=2445218), d)
+        self.assertRaises(ValueError, JalaliDate.interned, julian_day=2445218.9)
+        self.assertIs(JalaliDate.interned(d), d)
+        self.assertIs(JalaliDate.fromordinal(d.toordinal()), d)
+        self.assertIs(JalaliDate.today(), JalaliDate.today())
+        self.assertIs(JalaliDate.fromtimestamp(0), JalaliDate.interned(1348, 10, 11))
+        self.assertEqual(jalali_date.instance_cache_info(), (7, 3, 2, 2))
+        self.assertIsNot(JalaliDate.interned(1361, 6, 15), d)
+
+        # The interned instances are read-only, and the constructor is not affected
+        d = JalaliDate.interned(1361, 6, 15)
+        self.assertRaises(AttributeError, setattr, d, 'day', 16)
+        self.assertRaises(AttributeError, setattr, d, 'year', 1362)
+        self.assertEqual(JalaliDate.interned(1361, 6, 15).day, 15)
+        self.assertIsNot(JalaliDate(1361, 6, 15), d)
+        copied = JalaliDate(d)
+        copied.day = 16
+        self.assertEqual(copied.day, 16)
+        copied = pickle.loads(pickle.dumps(d))
+        self.assertEqual(copied, d)
+        copied.day = 16
+        self.assertEqual(d.day, 15)
+
+        self.assertRaises(ValueError, JalaliDate.interned, 1361, 12, 30)
+        self.assertRaises(ValueError, JalaliDate.fromordinal, 0)
+
+        # The subclasses are not interned
+        self.assertIsNot(JalaliDatetime.today(), JalaliDatetime.today())
+        self.assertIsNot(JalaliDatetime.interned(1361, 6, 15), JalaliDatetime.interned(1361, 6, 15))
+        self.assertEqual(JalaliDatetime(1361, 6, 15, 1).hour, 1)
+
+        jalali_date.use_instance_cache(0)
+        self.assertIsNone(jalali_date.instance_cache_info())
+        self.assertIsNot(JalaliDate.today(), JalaliDate.today())
+
+    def test_slots(self):
+        d = JalaliDate(1361, 6, 15)
+        self.assertEqual(d.weekday(), 2)
+        self.assertFalse(hasattr(d, '__dict__'))
+        self.assertRaises(AttributeError, setattr, d, 'hour', 1)
+        d.day = 16
+        self.assertEqual(d.weekday(), 3)
+        self.assertEqual(d.tojulianday(), 2445219)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
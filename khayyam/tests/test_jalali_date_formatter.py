@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 import unittest
 from datetime import timedelta
-from khayyam import JalaliDate
-from khayyam.formatting import constants as c
+from khayyam import JalaliDate, MINYEAR, MAXYEAR, algorithms
+from khayyam.formatting import constants as c, JalaliDateFormatter, formatters
 from rtl import rtl
 __author__ = 'vahid'
 
@@ -260,6 +260,60 @@ class JalaliDateFormatterTestCase(unittest.TestCase):
         self.assertEqual(JalaliDate(1375, 1, 31).strftime("%Y %%"), "1375 %")
         self.assertEqual(JalaliDate.strptime("1375 %", "%Y %%"), JalaliDate(1375, 1, 1))
 
+    @unittest.skipIf(algorithms.format_jalali_date is None, 'The C extension is not available')
+    def test_native(self):
+        format_string = \
+            u'%Y %y %N %O %n %u %R %P %m %b %B %g %G %d %D %K %j %J %V %w %W %U %a %A %e %E %T %x %% ' \
+            u'%H %z %Q %%Y سال % %'
+        python_formatter = JalaliDateFormatter(format_string)
+        python_formatter.native = False
+        native_formatter = JalaliDateFormatter(format_string)
+        self.assertTrue(native_formatter.native)
+
+        for d in [JalaliDate.min, JalaliDate.max, JalaliDate(1375, 12, 30), JalaliDate(1361, 6, 15)]:
+            self.assertEqual(native_formatter.format(d), python_formatter.format(d))
+
+        d = JalaliDate(MINYEAR, 1, 1)
+        while d.year < MAXYEAR:
+            self.assertEqual(native_formatter.format(d), python_formatter.format(d))
+            d += timedelta(days=97)
+
+        self.assertEqual(JalaliDate(1394, 1, 1).strftime(u''), u'')
+        self.assertEqual(JalaliDate(1394, 1, 1).strftime(u'%Y' * 200), u'1394' * 200)
+        self.assertFalse(JalaliDateFormatter('%Y', directive_db=formatters.DATE_FORMAT_DIRECTIVES[:1]).native)
+        self.assertIsNone(algorithms.format_jalali_date(u'%Y', 1394, 12, 30))
+        self.assertIsNone(algorithms.format_jalali_date(u'%Y', 1394, 13, 1))
+        self.assertRaises(TypeError, algorithms.format_jalali_date, u'%Y', 1394, 12)
+
+        # The setters do not make an invalid date
+        d = JalaliDate(1394, 7, 1)
+        self.assertRaises(ValueError, setattr, d, 'day', 31)
+        d = JalaliDate(1395, 12, 30)
+        self.assertRaises(ValueError, setattr, d, 'year', 1394)
+        self.assertEqual(d.isoformat(), u'1395-12-30')
+
+        # But the dates made before switching the leap rule are formatted by the python directives
+        leap_rule = algorithms.leap_rule
+        try:
+            algorithms.use_leap_rule('astronomical')
+            d = JalaliDate(1403, 12, 30)
+            algorithms.use_leap_rule('arithmetic')
+            self.assertEqual(str(d), u'1403-12-30')
+            self.assertEqual(d.strftime(u'%Y/%m/%d'), u'1403/12/30')
+        finally:
+            algorithms.use_leap_rule(leap_rule)
+
+    def test_native_backend(self):
+        # The native formatter follows the selected backend
+        backend = algorithms.backend
+        try:
+            algorithms.use_backend('pure')
+            self.assertIsNone(algorithms.format_jalali_date)
+            self.assertIsNone(algorithms.format_jalali_datetime)
+            self.assertEqual(JalaliDate(1394, 7, 1).strftime(u'%Y/%m/%d %A'), u'1394/07/01 چهارشنبه')
+        finally:
+            algorithms.use_backend(backend)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
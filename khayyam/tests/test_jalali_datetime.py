@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
+import pickle
 import unittest
 
-from khayyam import JalaliDatetime, teh_tz, Timezone
+from khayyam import JalaliDatetime, teh_tz, Timezone, SATURDAY
 from datetime import datetime, timedelta, time, tzinfo
 from khayyam.timezones import TehranTimezone
 from khayyam.jalali_date import JalaliDate
@@ -109,6 +110,30 @@ class TestJalaliDateTime(unittest.TestCase):
         self.assertFalse(jalali_time1 > jalali_time2)
         self.assertTrue(jalali_time2 == jalali_time3)
 
+    def test_comparison_timezones(self):
+        utc = Timezone(timedelta(0))
+        d1 = JalaliDatetime(1361, 6, 15, 10, 1, tzinfo=utc)
+        d2 = JalaliDatetime(1361, 6, 15, 13, 31, tzinfo=Timezone(timedelta(hours=3, minutes=30)))
+        d3 = JalaliDatetime(1361, 6, 16, 0, 0, tzinfo=utc)
+        d4 = JalaliDatetime(1361, 6, 15, 10, 1, 0, 1, tzinfo=utc)
+        values = [d3, d4, d1, d2]
+
+        # The same tzinfo is ordered by the fields, and the others in UTC
+        self.assertEqual(sorted(values), [d1, d2, d4, d3])
+        self.assertTrue(d1 <= d2 <= d1 and d1 >= d2 >= d1)
+        self.assertFalse(d1 < d2 or d1 > d2)
+        self.assertTrue(d1 < d3 and d3 > d2 and d1 <= d3 and d3 >= d2)
+        self.assertFalse(JalaliDatetime(1361, 6, 16, tzinfo=utc) < d3)
+
+        # The equality compares the fields and the tzinfo, the same as the hash
+        self.assertNotEqual(d1, d2)
+        self.assertEqual(d1, JalaliDatetime(1361, 6, 15, 10, 1, tzinfo=Timezone(timedelta(0))))
+        self.assertEqual(
+            hash(d1), hash(JalaliDatetime(1361, 6, 15, 10, 1, tzinfo=Timezone(timedelta(0))))
+        )
+        self.assertNotEqual(d1, d1.replace(tzinfo=None))
+        self.assertNotEqual(d1, d4)
+
     def test_replace(self):
         d1 = JalaliDatetime(1391, 12, 30)
         self.assertEqual(d1.replace(year=1395), JalaliDatetime(1395, 12, 30))
@@ -164,6 +189,52 @@ class TestJalaliDateTime(unittest.TestCase):
         self.assertEqual(min_.day, 1)
         self.assertEqual(min_, JalaliDatetime.min)
         self.assertEqual(max_, JalaliDatetime.max.replace(hour=0, minute=0, second=0, microsecond=0))
+        self.assertRaises(ValueError, JalaliDatetime.fromordinal, 0)
+        self.assertRaises(ValueError, JalaliDatetime.fromordinal, 1160740)
+        d = JalaliDatetime.fromordinal(496899)
+        self.assertIs(type(d), JalaliDatetime)
+        self.assertEqual(d, JalaliDatetime(1361, 6, 15))
+        self.assertEqual(JalaliDatetime(1361, 6, 15, 23, 59, tzinfo=teh_tz).toordinal(), 496899)
+
+    def test_navigation(self):
+        d = JalaliDatetime(1394, 6, 31, 10, 11, 12, 13, tzinfo=teh_tz)
+        for result, expected in (
+                (d.add_months(1), (1394, 7, 30)),
+                (d.add_years(-1), (1393, 6, 31)),
+                (d.next(SATURDAY), (1394, 7, 4)),
+                (d.previous(SATURDAY), (1394, 6, 28)),
+                (d.startofmonth(), (1394, 6, 1)),
+                (d.endofmonth(), (1394, 6, 31)),
+                (d.startofweek(), (1394, 6, 28))):
+            self.assertIs(type(result), JalaliDatetime)
+            self.assertEqual(result, JalaliDatetime(*expected + (10, 11, 12, 13), tzinfo=teh_tz))
+            self.assertIs(result.tzinfo, teh_tz)
+
+    def test_range(self):
+        start = JalaliDatetime(1394, 12, 28, 10, 11, tzinfo=teh_tz)
+        self.assertEqual(
+            list(JalaliDatetime.range(start, JalaliDatetime(1395, 1, 1, 10, 12, tzinfo=teh_tz))),
+            [start,
+             JalaliDatetime(1394, 12, 29, 10, 11, tzinfo=teh_tz),
+             JalaliDatetime(1395, 1, 1, 10, 11, tzinfo=teh_tz)])
+        self.assertEqual(
+            list(JalaliDatetime.range(start, JalaliDatetime(1395, 1, 1, 10, 11, tzinfo=teh_tz))),
+            [start, JalaliDatetime(1394, 12, 29, 10, 11, tzinfo=teh_tz)])
+        self.assertEqual(
+            list(JalaliDatetime.range(start, JalaliDatetime(1394, 12, 26, 10, 10, tzinfo=teh_tz), -1)),
+            [start,
+             JalaliDatetime(1394, 12, 27, 10, 11, tzinfo=teh_tz),
+             JalaliDatetime(1394, 12, 26, 10, 11, tzinfo=teh_tz)])
+        self.assertEqual(
+            list(JalaliDatetime.range(start, JalaliDatetime(1395, 1, 28, 10, 11, tzinfo=teh_tz), 1, 'months')),
+            [start])
+        for d in JalaliDatetime.range(start, JalaliDatetime(1396, 1, 1, tzinfo=teh_tz), 5):
+            self.assertIs(type(d), JalaliDatetime)
+            self.assertIs(d.tzinfo, teh_tz)
+            self.assertEqual(d.time(), time(10, 11))
+        self.assertEqual(
+            list(JalaliDatetime.range(JalaliDate(1361, 6, 15), JalaliDate(1361, 6, 16))),
+            [JalaliDatetime(1361, 6, 15)])
 
     def test_combine(self):
         dt = JalaliDate(1361, 11, 6)
@@ -205,6 +276,33 @@ class TestJalaliDateTime(unittest.TestCase):
         d1 = JalaliDatetime(1395, 5, 29, 22, 18, 32, 749938, tzinfo=teh_tz)
         self.assertEqual(d1.dayofyear(), 153)
 
+    def test_pickle(self):
+        d = JalaliDatetime(1361, 6, 15, 19, 34, 2, 10)
+        self.assertEqual(pickle.loads(pickle.dumps(d)), d)
+        self.assertIs(type(pickle.loads(pickle.dumps(d))), JalaliDatetime)
+
+    def test_trusted_constructors(self):
+        d = JalaliDatetime(1361, 6, 15, 19, 34, 2, 10, tzinfo=teh_tz)
+        self.assertEqual(d + timedelta(hours=5), JalaliDatetime(1361, 6, 16, 0, 34, 2, 10, tzinfo=teh_tz))
+        self.assertEqual(d - timedelta(days=170), JalaliDatetime(1360, 12, 29, 19, 34, 2, 10, tzinfo=teh_tz))
+        self.assertIs((d + timedelta(1)).tzinfo, teh_tz)
+        self.assertIs(d.copy().tzinfo, teh_tz)
+        self.assertIs(type(d.date()), JalaliDate)
+        self.assertEqual(d.date(), JalaliDate(1361, 6, 15))
+        self.assertEqual(d.replace(day=31, hour=1, tzinfo=teh_tz), JalaliDatetime(1361, 6, 31, 1, 34, 2, 10, teh_tz))
+        self.assertRaises(ValueError, d.replace, month=12, day=31)
+        self.assertRaises(ValueError, d.replace, hour=24)
+        self.assertRaises(ValueError, d.__add__, timedelta(days=700000))
+        self.assertEqual(JalaliDatetime.min, JalaliDatetime(1, 1, 1))
+        self.assertEqual(JalaliDatetime.max.timetz(), time(23, 59, 59, 999999))
+
+    def test_slots(self):
+        d = JalaliDatetime(1361, 6, 15, 19, 34, 2, 10, tzinfo=teh_tz)
+        self.assertFalse(hasattr(d, '__dict__'))
+        self.assertRaises(AttributeError, setattr, d, 'name', 'now')
+        self.assertEqual(d.weekday(), 2)
+        self.assertEqual(d.copy(), d)
+
     def test_str(self):
         d1 = JalaliDatetime(1361, 6, 15)
         self.assertEqual(
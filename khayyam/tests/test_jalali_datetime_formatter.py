@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from khayyam import JalaliDatetime, Timezone, teh_tz
+from khayyam import JalaliDatetime, Timezone, teh_tz, algorithms
+from khayyam.formatting import JalaliDatetimeFormatter, formatters
 from datetime import timedelta
 import unittest
 __author__ = 'vahid'
@@ -248,6 +249,36 @@ class JalaliDatetimeFormatterTestCase(unittest.TestCase):
             self.assert_parse_and_format(d_test, '%Q')
             self.assert_parse_and_format(d_test, '%Y-%m-%d %X')
 
+    @unittest.skipIf(algorithms.format_jalali_datetime is None, 'The C extension is not available')
+    def test_native(self):
+        format_string = \
+            u'%Y-%m-%d %j %W %A %x %H %k %h %I %l %i %M %v %r %S %L %s %f %F %p %t %c %C %q %Q %X %% %y %J'
+        python_formatter = JalaliDatetimeFormatter(format_string)
+        python_formatter.native = False
+        native_formatter = JalaliDatetimeFormatter(format_string)
+        self.assertTrue(native_formatter.native)
+
+        d = JalaliDatetime(self.leap_year, 12, 29, 0, 0, 0, 1)
+        for i in range(0, 2 * 24 * 60, 7):
+            d_test = d + timedelta(minutes=i, microseconds=i)
+            self.assertEqual(native_formatter.format(d_test), python_formatter.format(d_test))
+
+        # The timezone directives are formatted by the python directives
+        d = JalaliDatetime(1361, 6, 15, 19, 34, 2, tzinfo=Timezone(timedelta(hours=3, minutes=30)))
+        self.assertIsNone(algorithms.format_jalali_datetime(u'%z', 1361, 6, 15, 19, 34, 2, 0))
+        self.assertEqual(d.strftime(u'%H:%M %z %Z %o'), python_formatter.__class__(u'%H:%M %z %Z %o').format(d))
+        self.assertEqual(d.strftime(u'%H:%M %z'), u'19:34 +03:30')
+        self.assertIsNone(algorithms.format_jalali_datetime(u'%H', 1361, 6, 15, 24, 0, 0, 0))
+
+        leap_rule = algorithms.leap_rule
+        try:
+            algorithms.use_leap_rule('astronomical')
+            d = JalaliDatetime(1403, 12, 30, 10, 11)
+            algorithms.use_leap_rule('arithmetic')
+            self.assertEqual(str(d), u'1403-12-30 10:11:00.000000')
+        finally:
+            algorithms.use_leap_rule(leap_rule)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()